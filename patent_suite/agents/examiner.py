@@ -1,27 +1,97 @@
+import re
+from patent_suite.tools.claim_parser import parse_claims
+from patent_suite.tools.claim_mapper import map_claims_batch
+from patent_suite.tools.combination_finder import find_claim_combinations
+
+def _limitations(claim):
+    # "of Claim 1" is not a limitation to be found in the art
+    return re.sub(r'\s+of\s+claim\s+\d+', '', claim.text, flags=re.IGNORECASE)
+
+def split_claims(claims_text):
+    """Numbered claims of a claim set, without their numbers; the dependency phrase is removed."""
+    return [_limitations(claim) for claim in parse_claims(claims_text).claims if claim.number is not None]
+
+def claim_charts(claims_text):
+    """
+    (claim number, text to chart) per numbered claim. A dependent claim
+    includes every limitation of its parents, so its text is its whole
+    dependency chain, root first.
+    """
+    claim_set = parse_claims(claims_text)
+    return [
+        (claim.number, "; ".join(_limitations(link) for link in claim_set.chain(claim.number)))
+        for claim in claim_set.claims if claim.number is not None
+    ]
+
 class MockExaminerAgent:
     """
     Role: Adversarial QA / USPTO Examiner.
-    Instruction: You are a USPTO Examiner. You hate granting patents. 
-    Read the draft and the prior art found by the Searcher. 
+    Instruction: You are a USPTO Examiner. You hate granting patents.
+    Read the draft and the prior art found by the Searcher.
     Write a rejection argument that is difficult to overcome.
     """
     def __init__(self):
         pass
 
+    def find_rejections(self, draft_claims, prior_art_results):
+        """
+        Charts every numbered claim (with the limitations of the claims it
+        depends on) against every reference and returns, per claim, the
+        anticipating references (102) and the minimal 2-3 reference
+        combinations that together disclose all of its elements (103).
+        """
+        claims = claim_charts(draft_claims)
+        if not claims or not prior_art_results:
+            return []
+        chart = map_claims_batch([text for _, text in claims], prior_art_results)
+        return [dict(find_claim_combinations(chart, i), claim=number) for i, (number, _) in enumerate(claims)]
+
     def examine(self, draft_claims, prior_art_results):
         print("MockExaminerAgent: Commencing adversarial review (Searching for reasons to reject)...")
-        
+        titles = {res.get("id"): res.get("title") for res in prior_art_results}
+        findings = self.find_rejections(draft_claims, prior_art_results)
+
+        anticipated = [f for f in findings if f["anticipating"]]
+        obvious = [f for f in findings if not f["anticipating"] and f["combinations"]]
+        rejected = len(anticipated) + len(obvious)
+
         rejections = "--- NON-FINAL OFFICE ACTION ---\n"
-        rejections += "SUMMARY: ALL CLAIMS ARE REJECTED.\n\n"
-        rejections += "Rejection under 35 U.S.C. 103 (Obviousness):\n"
-        rejections += "Claims 1-X are rejected as being unpatentable over the prior art cited by the Applicant.\n\n"
-        
-        for i, res in enumerate(prior_art_results[:3], 1):
-            rejections += f"DETAILED BASIS: Reference {res['id']} ({res['title']}) discloses basic 'toasting' and 'precision heating' concepts.\n"
-            rejections += f"While the reference might not explicitly mention '{draft_claims[:20].strip()}', "
-            rejections += "it would have been obvious to a POSITA (Person of Ordinary Skill in the Art) to combine these teachings "
-            rejections += "to arrive at the claimed invention without undue experimentation.\n\n"
-            
-        rejections += "CONCLUSION: The application is rejected. The Applicant is encouraged to cancel all claims.\n"
-            
+        if not findings:
+            rejections += "SUMMARY: NO CLAIMS COULD BE CHARTED AGAINST THE CITED ART.\n\n"
+            rejections += "CONCLUSION: No rejection is made. Numbered claims and cited prior art are both required for examination.\n"
+            return rejections
+        if rejected == len(findings):
+            rejections += "SUMMARY: ALL CLAIMS ARE REJECTED.\n\n"
+        else:
+            rejections += f"SUMMARY: {rejected} OF {len(findings)} CLAIMS ARE REJECTED.\n\n"
+
+        for finding in anticipated:
+            ref = finding["anticipating"][0]
+            rejections += "Rejection under 35 U.S.C. 102 (Anticipation):\n"
+            rejections += f"Claim {finding['claim']} is rejected as anticipated by {ref} ({titles.get(ref)}), "
+            rejections += f"which discloses each of its {finding['elements']} elements.\n\n"
+
+        for finding in obvious:
+            refs = finding["combinations"][0]
+            rejections += "Rejection under 35 U.S.C. 103 (Obviousness):\n"
+            rejections += f"Claim {finding['claim']} is rejected as being unpatentable over "
+            rejections += " in view of ".join(f"{ref} ({titles.get(ref)})" for ref in refs) + ".\n"
+            rejections += "DETAILED BASIS: Together these references disclose every element of the claim, "
+            rejections += "and it would have been obvious to a POSITA (Person of Ordinary Skill in the Art) to combine these teachings "
+            rejections += "to arrive at the claimed invention without undue experimentation.\n"
+            if len(finding["combinations"]) > 1:
+                alternatives = "; ".join(" + ".join(map(str, refs)) for refs in finding["combinations"][1:4])
+                rejections += f"Alternative combinations: {alternatives}.\n"
+            rejections += "\n"
+
+        allowable = [f["claim"] for f in findings if not f["anticipating"] and not f["combinations"]]
+        if allowable:
+            rejections += f"Claims {', '.join(map(str, allowable))}: no combination of up to three cited references discloses every element.\n\n"
+            if rejected:
+                rejections += "CONCLUSION: The rejected claims stand rejected. The Applicant is encouraged to narrow them toward the elements the art does not disclose.\n"
+            else:
+                rejections += "CONCLUSION: No claim is rejected over the cited art.\n"
+        else:
+            rejections += "CONCLUSION: The application is rejected. The Applicant is encouraged to cancel all claims.\n"
+
         return rejections
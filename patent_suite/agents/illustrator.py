@@ -1,6 +1,7 @@
 import os
-import requests
 from typing import Dict, List, Any
+from patent_suite.tools.http_client import get_http_client
+from patent_suite.tools.response_cache import RESPONSE_CACHE, caching_enabled
 from .base import BaseAgent
 
 class IllustratorAgent(BaseAgent):
@@ -20,6 +21,7 @@ class IllustratorAgent(BaseAgent):
     def run(self, task: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """
         Sends the patent claims to the OpenPatent server to generate a technical illustration.
+        Responses are cached by claims text; context["no_cache"] forces a fresh one.
         """
         claims_text = context.get("claims_text", task)
         # We assume the user has configured the server URL and API key
@@ -33,23 +35,38 @@ class IllustratorAgent(BaseAgent):
                 "message": "Premium Feature: OPENPATENT_API_KEY is required for automated illustration."
             }
 
+        payload = {"claims_text": claims_text}
+        use_cache = caching_enabled() and not context.get("no_cache")
+        cache_key = RESPONSE_CACHE.make_key(self.name, payload)
+        if use_cache:
+            cached = RESPONSE_CACHE.get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
-            response = requests.post(
+            # Image generation is slow; one retry keeps the worst case near two timeouts
+            response = get_http_client().post(
                 f"{server_url}/api/v1/agents/illustrator/run",
-                json={"claims_text": claims_text},
+                json=payload,
                 headers={
                     "Authorization": f"Bearer {api_key}",
                     "Content-Type": "application/json"
                 },
-                timeout=60
+                timeout=60,
+                retries=1
             )
             response.raise_for_status()
-            return response.json()
+            result = response.json()
+            if not isinstance(result, dict):
+                raise ValueError(f"expected a JSON object, got {type(result).__name__}")
         except Exception as e:
             return {
                 "status": "error",
                 "message": f"Illustration service failed: {str(e)}"
             }
+        if use_cache and result.get("status") != "error":
+            RESPONSE_CACHE.set(cache_key, result)
+        return result
 
     def get_tools(self) -> List[Any]:
         return []
@@ -1,8 +1,18 @@
+import asyncio
+import json
 import os
 import requests
-from typing import Dict, List, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Iterable, Tuple
+from patent_suite.tools.http_client import get_http_client
+from patent_suite.tools.response_cache import RESPONSE_CACHE, caching_enabled
 from .base import BaseAgent
 
+REMOTE_API_URL = "https://api.openpatent.com"
+
+# Servers without the batch endpoint answer with one of these; we then stop batching
+BATCH_UNSUPPORTED_STATUSES = (404, 405, 501)
+
 class Config:
     @property
     def OPENPATENT_API_KEY(self):
@@ -15,7 +25,7 @@ class RemoteAgent(BaseAgent):
     An agent that looks like a local agent but acts as an API client
     to a remote agent execution service.
     """
-    
+
     @property
     def name(self) -> str:
         return "RemoteAgent"
@@ -24,34 +34,56 @@ class RemoteAgent(BaseAgent):
     def description(self) -> str:
         return "A wrapper for executing agents via the OpenPatent Cloud API."
 
-    def run(self, task: str, context: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Executes the agent remotely via the OpenPatent API.
-        """
+    def _require_api_key(self):
         if not config.OPENPATENT_API_KEY:
             raise PermissionError("Premium Feature: OPENPATENT_API_KEY is required for remote agent access.")
-        
-        # Merge task into context for the API payload
-        payload = context.copy()
+
+    def _payload(self, task: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        # Merge task into context for the API payload; "no_cache" is for us, not the server
+        payload = {key: value for key, value in context.items() if key != "no_cache"}
         payload["task"] = task
-        
+        return payload
+
+    def _cacheable(self, result) -> bool:
+        return isinstance(result, dict) and result.get("status") != "error"
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {config.OPENPATENT_API_KEY}",
+            "Content-Type": "application/json"
+        }
+
+    def run(self, task: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Executes the agent remotely via the OpenPatent API. Responses are
+        cached by payload; context["no_cache"] forces a fresh one.
+        """
+        self._require_api_key()
+        payload = self._payload(task, context)
+        use_cache = caching_enabled() and not context.get("no_cache")
+        cache_key = RESPONSE_CACHE.make_key(self.name, payload)
+        if use_cache:
+            cached = RESPONSE_CACHE.get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
-            response = requests.post(
-                "https://api.openpatent.com/agents/run",
+            response = get_http_client().post(
+                f"{REMOTE_API_URL}/agents/run",
                 json=payload,
-                headers={
-                    "Authorization": f"Bearer {config.OPENPATENT_API_KEY}",
-                    "Content-Type": "application/json"
-                },
+                headers=self._headers(),
                 timeout=30
             )
             response.raise_for_status()
-            return response.json()
+            result = response.json()
         except requests.exceptions.RequestException as e:
             return {
                 "status": "error",
                 "message": f"Remote agent execution failed: {str(e)}"
             }
+        if use_cache and self._cacheable(result):
+            RESPONSE_CACHE.set(cache_key, result)
+        return result
 
     def get_tools(self) -> List[Any]:
         """
@@ -59,10 +91,121 @@ class RemoteAgent(BaseAgent):
         """
         return []
 
+class AsyncRemoteAgent(RemoteAgent):
+    """
+    asyncio variant of RemoteAgent for batch jobs. run_many() keeps at most
+    max_concurrency requests in flight, sends identical payloads once, and
+    packs payloads of up to max_batch_bytes into batches of batch_size per
+    request to /agents/run_batch when the server supports it. Wall time is
+    then about N / (max_concurrency x batch_size) round trips instead of N.
+    """
+    def __init__(self, max_concurrency: int = 8, batch_size: int = 16, max_batch_bytes: int = 4096,
+                 base_url: str = REMOTE_API_URL, client=None):
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.max_batch_bytes = max_batch_bytes
+        self.base_url = base_url
+        self.client = client or get_http_client()
+        # None until the first batch request tells us whether the endpoint exists
+        self.batching_supported = None
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="remote-agent")
+
+    def _error(self, e) -> Dict[str, Any]:
+        return {
+            "status": "error",
+            "message": f"Remote agent execution failed: {str(e)}"
+        }
+
+    def _send_one(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            response = self.client.post(f"{self.base_url}/agents/run", json=payload,
+                                        headers=self._headers(), timeout=30)
+            response.raise_for_status()
+            return response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            return self._error(e)
+
+    def _send_batch(self, payloads: List[Dict[str, Any]]):
+        """Results in payload order, or None if the server has no batch endpoint."""
+        try:
+            response = self.client.post(f"{self.base_url}/agents/run_batch", json={"tasks": payloads},
+                                        headers=self._headers(), timeout=30)
+            if response.status_code in BATCH_UNSUPPORTED_STATUSES:
+                self.batching_supported = False
+                return None
+            response.raise_for_status()
+            results = response.json().get("results", [])
+            if len(results) != len(payloads):
+                raise ValueError(f"batch returned {len(results)} results for {len(payloads)} tasks")
+            self.batching_supported = True
+            return results
+        except (requests.exceptions.RequestException, ValueError) as e:
+            return [self._error(e)] * len(payloads)
+
+    def _groups(self, unique: Dict[str, Dict[str, Any]]) -> List[List[str]]:
+        small = [key for key in unique if len(key) <= self.max_batch_bytes]
+        if self.batch_size <= 1 or self.batching_supported is False or len(small) < 2:
+            return [[key] for key in unique]
+        groups = [small[i:i + self.batch_size] for i in range(0, len(small), self.batch_size)]
+        small_keys = set(small)
+        return groups + [[key] for key in unique if key not in small_keys]
+
+    async def run_many(self, tasks: Iterable[Tuple[str, Dict[str, Any]]], use_cache: bool = True) -> List[Dict[str, Any]]:
+        """
+        Runs (task, context) pairs remotely; returns their results in order.
+        Failed tasks yield {"status": "error", ...} like run() does. Cached
+        responses are reused (and new ones stored) unless use_cache is False.
+        """
+        self._require_api_key()
+        keys, unique = [], {}
+        for task, context in tasks:
+            payload = self._payload(task, context)
+            key = json.dumps(payload, sort_keys=True, default=str)
+            keys.append(key)
+            unique.setdefault(key, payload)
+
+        use_cache = use_cache and caching_enabled()
+        results = {}
+        if use_cache:
+            for key, payload in list(unique.items()):
+                cached = RESPONSE_CACHE.get(RESPONSE_CACHE.make_key(self.name, payload))
+                if cached is not None:
+                    results[key] = cached
+                    del unique[key]
+
+        loop = asyncio.get_running_loop()
+        in_flight = asyncio.Semaphore(self.max_concurrency)
+
+        async def send_one(key):
+            async with in_flight:
+                results[key] = await loop.run_in_executor(self._executor, self._send_one, unique[key])
+
+        async def send_group(group):
+            if len(group) > 1 and self.batching_supported is not False:
+                async with in_flight:
+                    batch = await loop.run_in_executor(self._executor, self._send_batch, [unique[k] for k in group])
+                if batch is not None:
+                    results.update(zip(group, batch))
+                    return
+            await asyncio.gather(*(send_one(key) for key in group))
+
+        await asyncio.gather(*(send_group(group) for group in self._groups(unique)))
+        if use_cache:
+            for key, payload in unique.items():
+                if self._cacheable(results[key]):
+                    RESPONSE_CACHE.set(RESPONSE_CACHE.make_key(self.name, payload), results[key])
+        return [results[key] for key in keys]
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
 if __name__ == "__main__":
     # Internal test/usage example
     os.environ["OPENPATENT_API_KEY"] = "mock-key"
     agent = RemoteAgent()
     print(f"Running {agent.name}...")
-    # This will fail with a real request if the key is invalid, 
+    # This will fail with a real request if the key is invalid,
     # but shows the interface works.
+    batch_agent = AsyncRemoteAgent(max_concurrency=4)
+    results = asyncio.run(batch_agent.run_many([("analyze claims", {"claims": "1. A device..."})] * 3))
+    print(f"{len(results)} results, first: {results[0]}")
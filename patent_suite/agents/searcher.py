@@ -1,18 +1,40 @@
 import os
-import requests
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from typing import Dict, List, Any
+from patent_suite.tools.http_client import get_http_client
 from .base import BaseAgent
 
+# Remote calls of hedged searches run here. The pool is shared and never shut
+# down, so a straggling remote call never holds up a response. The calls only
+# wait on the network, so the pool is sized for many stragglers at once.
+_HEDGE_POOL = ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedged-search")
+# Local hedges get a pool of their own: slow remote calls filling _HEDGE_POOL
+# must not queue the hedges meant to cover for them.
+_LOCAL_HEDGE_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedged-local-search")
+
 class SearcherAgent(BaseAgent):
     """
     Expert in boolean logic and classification codes (CPC/IPC).
     Role: Senior Search Specialist.
     If premium: Uses OpenPatent Deep Search for superior indexing.
-    If free: Uses standard mock search tool (Google Patents simulation).
+    If free: Uses the local search tool, or hybrid BM25 + vector retrieval
+    when a hybrid_search_tool is configured (or context["retrieval"] == "hybrid").
+    Hedged (premium): starts the local search hedge_delay seconds after the
+    remote call (0 = together) and returns whichever succeeds first.
     """
-    def __init__(self, search_tool=None):
+    def __init__(self, search_tool=None, hybrid_search_tool=None, hedge_delay=None, merge_window=0.0,
+                 batch_search_tool=None):
         # search_tool is the local fallback (e.g. Google Patents)
         self.local_search_tool = search_tool
+        # batch_search_tool(keyword_list, date_cutoff=...) -> one result list per query (run_batch)
+        self.batch_search_tool = batch_search_tool
+        # hybrid_search_tool(keywords, text=...) -> {"results": [...], "signals": {...}}
+        self.hybrid_search_tool = hybrid_search_tool
+        # None disables hedging unless a run's context sets "hedge_delay"
+        self.hedge_delay = hedge_delay
+        # Seconds to wait after the winner for the other side's results to merge in
+        self.merge_window = merge_window
 
     @property
     def name(self) -> str:
@@ -30,15 +52,93 @@ class SearcherAgent(BaseAgent):
         api_key = os.getenv("OPENPATENT_API_KEY")
 
         if api_key:
+            hedge_delay = context.get("hedge_delay", self.hedge_delay)
+            if hedge_delay is not None:
+                print(f"SearcherAgent: [Premium] Hedging Deep Search with local search after {hedge_delay:.2f}s...")
+                return self._run_hedged_search(disclosure, api_key, context, hedge_delay)
             print(f"SearcherAgent: [Premium] Routing to Deep Search Proxy...")
             return self._run_remote_search(disclosure, api_key)
         else:
-            print(f"SearcherAgent: [Free] Using local search tool (Google Patents)...")
-            return self._run_local_search(disclosure)
+            return self._run_free_search(disclosure, context)
+
+    def run_batch(self, disclosures: List[str], context: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        Searches prior art for many disclosures (e.g. a portfolio review) and
+        returns one run()-style result per disclosure, in input order. Free
+        mode sends every query to batch_search_tool in one call. Without that
+        tool, and in premium mode, the disclosures run in parallel.
+        """
+        context = context or {}
+        disclosures = list(disclosures)
+        if not os.getenv("OPENPATENT_API_KEY") and self.batch_search_tool and not (
+                self.hybrid_search_tool or context.get("retrieval") == "hybrid"):
+            print(f"SearcherAgent: [Free] Batch search for {len(disclosures)} disclosures...")
+            keywords = [self._build_keywords(d) for d in disclosures]
+            batches = self.batch_search_tool(keywords, date_cutoff=context.get("date_cutoff"))
+            return [
+                {"status": "success", "mode": "free", "query": query, "results": results}
+                for query, results in zip(keywords, batches)
+            ]
+        # A pool of its own: hedged runs block on the hedge pools and must not run inside them
+        with ThreadPoolExecutor(max_workers=min(8, max(1, len(disclosures)))) as pool:
+            return list(pool.map(lambda d: self.run(d, dict(context, disclosure=d)), disclosures))
+
+    def _run_free_search(self, disclosure: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        if self.hybrid_search_tool or context.get("retrieval") == "hybrid":
+            print(f"SearcherAgent: [Free] Using hybrid lexical + semantic retrieval...")
+            return self._run_hybrid_search(disclosure, context)
+        print(f"SearcherAgent: [Free] Using local search tool (Google Patents)...")
+        return self._run_local_search(disclosure)
+
+    def _run_hedged_search(self, disclosure: str, api_key: str, context: Dict[str, Any],
+                           hedge_delay: float) -> Dict[str, Any]:
+        """
+        Starts the remote search, then the local one once hedge_delay seconds
+        pass without a successful remote answer (or at once if the remote
+        fails first). The first successful result set wins. If merge_window > 0,
+        the other side gets that long to finish; its new hits are appended.
+        Only if both sides fail is the remote error returned.
+        """
+        started = time.perf_counter()
+        timings = {}
+
+        def timed(name, fn, *args):
+            result = fn(*args)
+            timings[name] = round((time.perf_counter() - started) * 1000, 1)
+            return result
+
+        def succeeded(future):
+            return future.exception() is None and future.result().get("status") == "success"
+
+        remote = _HEDGE_POOL.submit(timed, "remote", self._run_remote_search, disclosure, api_key)
+        futures = {remote: "remote"}
+        wait([remote], timeout=hedge_delay)
+        if not (remote.done() and succeeded(remote)):
+            futures[_LOCAL_HEDGE_POOL.submit(timed, "local", self._run_free_search, disclosure, context)] = "local"
+
+        pending, winner = set(futures), None
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((f for f in done if succeeded(f)), None)
+        if winner is None:
+            return dict(remote.result(), hedge={"winner": None, "merged": False, "ms": dict(timings)})
+
+        result = dict(winner.result())
+        merged = False
+        late = [f for f in futures if f is not winner]
+        if late and self.merge_window > 0:
+            wait(late, timeout=self.merge_window)
+            if late[0].done() and succeeded(late[0]) and isinstance(late[0].result()["results"], list):
+                seen = {hit.get("id") for hit in result["results"]}
+                extra = [hit for hit in late[0].result()["results"] if hit.get("id") not in seen]
+                result["results"] = list(result["results"]) + extra
+                merged = True
+        result["hedge"] = {"winner": futures[winner], "merged": merged, "ms": dict(timings)}
+        return result
 
     def _run_remote_search(self, query: str, api_key: str) -> Dict[str, Any]:
         try:
-            response = requests.post(
+            response = get_http_client().post(
                 "https://api.openpatent.com/search",
                 json={"query": query},
                 headers={"Authorization": f"Bearer {api_key}"},
@@ -56,11 +156,34 @@ class SearcherAgent(BaseAgent):
                 "message": f"Deep Search failed: {str(e)}"
             }
 
-    def _run_local_search(self, disclosure: str) -> Dict[str, Any]:
+    def _build_keywords(self, disclosure: str) -> str:
         # Mocking keyword extraction
         terms = disclosure.lower().split()
-        main_subject = terms[0] if terms else "apparatus"
-        keywords = f"({main_subject} AND toasting) OR (laser AND precision AND heating)"
+        main_subject = terms[0].replace('"', '') if terms else "apparatus"
+        # Quoted, so a disclosure starting with "Not" or "Or" is a word, not an operator
+        return f"(\"{main_subject}\" AND toasting) OR (laser AND precision AND heating)"
+
+    def _run_hybrid_search(self, disclosure: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        BM25 on the boolean keywords plus vector search on the full disclosure,
+        fused by reciprocal rank. Each hit carries per-signal ranks and scores.
+        """
+        hybrid_search = self.hybrid_search_tool
+        if hybrid_search is None:
+            from patent_suite.tools.hybrid_search import hybrid_search_prior_art as hybrid_search
+        keywords = self._build_keywords(disclosure)
+        response = hybrid_search(keywords, text=disclosure, date_cutoff=context.get("date_cutoff"))
+        return {
+            "status": "success",
+            "mode": "free",
+            "retrieval": "hybrid",
+            "query": keywords,
+            "results": response["results"],
+            "signals": response["signals"]
+        }
+
+    def _run_local_search(self, disclosure: str) -> Dict[str, Any]:
+        keywords = self._build_keywords(disclosure)
         
         if self.local_search_tool:
             results = self.local_search_tool(keywords)
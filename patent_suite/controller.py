@@ -4,17 +4,18 @@ from patent_suite.agents.searcher import SearcherAgent
 from patent_suite.agents.drafter import DrafterAgent
 from patent_suite.agents.interrogator import InterrogatorAgent
 from patent_suite.agents.examiner import MockExaminerAgent
-from patent_suite.tools.patents_search import search_prior_art
+from patent_suite.tools.patents_search import search_prior_art, search_prior_art_batch
 from patent_suite.tools.drafting import write_claim_set
 from patent_suite.tools.syntax_check import check_antecedent_basis
 from patent_suite.tools.statutory_linter import check_indefiniteness
+from patent_suite.tools.novelty import assess_novelty
 from patent_suite.utils.exporter import export_patent_application
 from patent_suite.utils import get_style_examples
 
 class PatentController:
     def __init__(self, session_id):
         self.session_id = session_id
-        self.searcher = SearcherAgent(search_tool=search_prior_art)
+        self.searcher = SearcherAgent(search_tool=search_prior_art, batch_search_tool=search_prior_art_batch)
         self.interrogator = InterrogatorAgent()
         self.drafter = DrafterAgent(drafting_tool=write_claim_set)
         self.examiner = MockExaminerAgent()
@@ -38,18 +39,23 @@ class PatentController:
         print(f"--- Starting Workflow for {self.session_id} ---")
         
         # 1. Search Prior Art
-        summary, results = self.searcher.run(disclosure_text)
+        search = self.searcher.run(disclosure_text, {"disclosure": disclosure_text})
+        results = search.get("results", [])
         
         # 2. Novelty Loop (Step 13)
-        # Mocking a 100% overlap check
-        overlap_found = "laser" in disclosure_text.lower() and any("laser" in res['title'].lower() for res in results)
+        # Per-feature overlap against the retrieved references; a single reference
+        # disclosing every feature counts as 100% overlap
+        novelty = assess_novelty(disclosure_text, results)
+        overlap_found = novelty["anticipated"]
         if overlap_found and not bypass_novelty:
             print("--- NOVELTY CHECK FAILURE ---")
             print("Invention appears not novel. Refine features?")
+            coverage = {ref["id"]: ref["coverage"] for ref in novelty["references"]}
             return {
                 "status": "Refine features?",
                 "message": "Invention appears not novel based on 100% overlap with prior art.",
-                "prior_art_matches": results[:2]
+                "prior_art_matches": sorted(results, key=lambda res: coverage.get(res.get("id"), 0.0), reverse=True)[:2],
+                "novelty": novelty
             }
         
         if overlap_found and bypass_novelty:
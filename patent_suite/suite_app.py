@@ -111,6 +111,7 @@ urlpatterns = [
     path('api/save_config/', save_config, name='save_config'),
     path('api/export_config/', export_config, name='export_config'),
     path('api/illustrate/', generate_illustration_view, name='illustrate'),
+    path('api/parse_claims/', parse_claims_view, name='parse_claims'),
 ]
 
 def export_config(request):
@@ -163,15 +164,33 @@ def update_rules(request):
 def generate_illustration_view(request):
     """Local proxy to trigger the IllustratorAgent."""
     from patent_suite.agents.illustrator import IllustratorAgent
-    
+    from patent_suite.tools.response_cache import wants_fresh_response
+
     # Simple hardcoded context for the demo
     # In a real app, this would come from the current editor content
     claims_text = request.GET.get('claims', 'A holographic bread slicing apparatus comprising a laser array.')
     
     agent = IllustratorAgent()
-    result = agent.run("Generate illustration", {"claims_text": claims_text})
+    # Unchanged claims are served from the response cache unless the client opts out
+    result = agent.run("Generate illustration", {
+        "claims_text": claims_text,
+        "no_cache": wants_fresh_response(request.headers)
+    })
     return JsonResponse(result)
 
+def parse_claims_view(request):
+    """Parses the editor's claim set with the same cached parser the claim tools use."""
+    import json
+    from patent_suite.tools.claim_parser import parse_claims
+
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error', 'message': 'Invalid request method'}, status=405)
+    try:
+        claims_text = json.loads(request.body or b'{}').get('claims', '')
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
+    return JsonResponse(dict(parse_claims(claims_text).to_dict(), status='success'))
+
 # --- templates ---
 INDEX_HTML = """
 <!DOCTYPE html>
@@ -1748,7 +1767,7 @@ The present invention relates to thermal processing for food segments.
             }
         };
 
-        function renderPatentTree() {
+        async function renderPatentTree() {
             const container = document.getElementById('tree-canvas');
             container.innerHTML = '';
             const width = container.clientWidth || 800;
@@ -1761,21 +1780,21 @@ The present invention relates to thermal processing for food segments.
                 return;
             }
 
-            const claimsText = claimsMatch[1];
-            const lines = claimsText.split('\n');
-            const claims = [];
-            
-            // Basic Parsing of Claim Dependencies
-            lines.forEach(line => {
-                const match = line.match(/^(\d+)\.\s+(.*)/);
-                if (match) {
-                    const id = match[1];
-                    const text = match[2];
-                    const depMatch = text.match(/claim\s+(\d+)/i);
-                    const parentId = depMatch ? depMatch[1] : null;
-                    claims.push({ id, name: `Claim ${id}`, parent: parentId, text: text });
-                }
+            // Parsed server-side by the same claim parser the antecedent, linter and examiner tools share
+            const response = await fetch('/api/parse_claims/', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json', 'X-CSRFToken': getCookie('csrftoken') },
+                body: JSON.stringify({ claims: claimsMatch[1] })
             });
+            const parsed = await response.json();
+            const claims = (parsed.claims || [])
+                .filter(claim => claim.number !== null)
+                .map(claim => ({
+                    id: String(claim.number),
+                    name: `Claim ${claim.number}`,
+                    parent: claim.depends_on !== null ? String(claim.depends_on) : null,
+                    text: claim.text
+                }));
 
             if (claims.length === 0) {
                 container.innerHTML = '<div style="padding: 40px; text-align:center; color: var(--text-muted);">No numbered claims detected.</div>';
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.remote_wrapper import AsyncRemoteAgent
+from tools.http_client import HttpClient
+
+LATENCY = 0.1
+
+
+class AgentServerHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.paths.append(self.path)
+        time.sleep(LATENCY)
+        if self.path == "/agents/run":
+            status, body = 200, {"status": "ok", "task": payload["task"]}
+        elif self.path == "/agents/run_batch" and self.server.batching:
+            status, body = 200, {"results": [{"status": "ok", "task": p["task"]} for p in payload["tasks"]]}
+        else:
+            status, body = 404, {"error": "not found"}
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestAsyncRemoteAgent(unittest.TestCase):
+    def setUp(self):
+        os.environ["OPENPATENT_API_KEY"] = "test-api-key"
+        os.environ["OPENPATENT_RESPONSE_CACHE"] = "0"
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), AgentServerHandler)
+        self.server.paths = []
+        self.server.batching = False
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.client = HttpClient(pool_size=8)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _agent(self, **kwargs):
+        return AsyncRemoteAgent(base_url=self.base_url, client=self.client, **kwargs)
+
+    def test_concurrency_limit_bounds_wall_time(self):
+        agent = self._agent(max_concurrency=8, batch_size=1)
+        tasks = [(f"task {i}", {}) for i in range(16)]
+        started = time.perf_counter()
+        results = asyncio.run(agent.run_many(tasks))
+        elapsed = time.perf_counter() - started
+        self.assertEqual([r["task"] for r in results], [t for t, _ in tasks])
+        # Two waves of 8 rather than 16 sequential round trips
+        self.assertLess(elapsed, 16 * LATENCY * 0.6)
+
+    def test_identical_payloads_sent_once(self):
+        agent = self._agent(batch_size=1)
+        results = asyncio.run(agent.run_many([("same", {"claims": "1. A device"})] * 5))
+        self.assertEqual(len(results), 5)
+        self.assertEqual(len(self.server.paths), 1)
+
+    def test_small_tasks_are_batched(self):
+        self.server.batching = True
+        agent = self._agent(batch_size=10)
+        results = asyncio.run(agent.run_many([(f"task {i}", {}) for i in range(10)]))
+        self.assertEqual(self.server.paths, ["/agents/run_batch"])
+        self.assertEqual(results[3]["task"], "task 3")
+        self.assertTrue(agent.batching_supported)
+
+    def test_falls_back_without_batch_endpoint(self):
+        agent = self._agent(batch_size=10)
+        results = asyncio.run(agent.run_many([(f"task {i}", {}) for i in range(4)]))
+        self.assertEqual([r["task"] for r in results], ["task 0", "task 1", "task 2", "task 3"])
+        self.assertFalse(agent.batching_supported)
+        self.assertEqual(self.server.paths.count("/agents/run"), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
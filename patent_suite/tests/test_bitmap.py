@@ -0,0 +1,32 @@
+import unittest
+import os
+import sys
+import random
+
+# Ensure the parent directory is in path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.bitmap import DocBitmap
+from tools.cpc_classifier import normalize_cpc, cpc_matches
+
+class TestDocBitmap(unittest.TestCase):
+    def test_union_and_round_trip_across_container_kinds(self):
+        rng = random.Random(3)
+        sparse = sorted(rng.sample(range(200000), 300))
+        dense = list(range(65536, 65536 + 10000))
+        union = DocBitmap.from_sorted(sparse) | DocBitmap.from_sorted(dense)
+        expected = sorted(set(sparse) | set(dense))
+        self.assertEqual(list(union.to_array()), expected)
+        self.assertEqual(len(union), len(expected))
+        restored = DocBitmap.from_bytes(union.to_bytes())
+        self.assertEqual(list(restored.to_array(100000)), [d for d in expected if d < 100000])
+
+    def test_cpc_normalization_and_hierarchy(self):
+        self.assertEqual(normalize_cpc("a47j37/08 - Bread toasters"), "A47J 37/08")
+        self.assertIsNone(normalize_cpc("toaster"))
+        self.assertTrue(cpc_matches("H01S 3/0941", "H01S 3/00"))
+        self.assertTrue(cpc_matches("A47J 37/08", "A47J"))
+        self.assertFalse(cpc_matches("A47J 370/08", "A47J 37"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import io
+import unittest
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from array import array
+
+# Ensure the parent directory is in path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.boolean_query import parse_query, execute_query, gallop, intersect, difference, And, Or, Term, Phrase, Near
+from tools.prior_art_index import build_index, PriorArtIndex, SAMPLE_CORPUS
+from agents.searcher import SearcherAgent
+
+class TestQueryParser(unittest.TestCase):
+    def test_searcher_query_shape(self):
+        node = parse_query("(laser AND toasting) OR (laser AND precision AND heating)")
+        self.assertIsInstance(node, Or)
+        self.assertEqual(len(node.children), 2)
+        self.assertTrue(all(isinstance(c, And) for c in node.children))
+        self.assertEqual(node.positive_terms(), ["laser", "toasting", "laser", "precision", "heating"])
+
+    def test_default_operator(self):
+        self.assertIsInstance(parse_query("laser toaster"), Or)
+        self.assertIsInstance(parse_query("laser toaster", default_operator="AND"), And)
+
+    def test_stopwords_and_single_terms_are_simplified(self):
+        node = parse_query("(the AND laser)")
+        self.assertIsInstance(node, Term)
+        self.assertEqual(node.term, "laser")
+
+    def test_unbalanced_parentheses(self):
+        with self.assertRaises(ValueError):
+            parse_query("(laser AND toaster")
+
+    def test_phrase_and_near(self):
+        node = parse_query('"optical browning sensor" AND laser NEAR/5 raster')
+        self.assertIsInstance(node, And)
+        self.assertIsInstance(node.children[0], Phrase)
+        self.assertEqual(node.children[0].terms, ["optical", "browning", "sensor"])
+        self.assertIsInstance(node.children[1], Near)
+        self.assertEqual(node.children[1].distance, 5)
+        with self.assertRaises(ValueError):
+            parse_query("laser NEAR/3 (toaster OR oven)")
+
+    def test_hyphenated_word_is_a_phrase(self):
+        node = parse_query("micro-controller NEAR/5 heating")
+        self.assertIsInstance(node, Near)
+        self.assertIsInstance(node.left, Phrase)
+        self.assertEqual(node.left.terms, ["micro", "controller"])
+
+class TestPostingAlgebra(unittest.TestCase):
+    def test_gallop(self):
+        postings = array('I', [1, 3, 5, 7, 9, 11, 13])
+        self.assertEqual(gallop(postings, 9), 4)
+        self.assertEqual(gallop(postings, 10, 2), 5)
+        self.assertEqual(gallop(postings, 99), len(postings))
+
+    def test_intersect_and_difference(self):
+        a = array('I', [2, 4, 6, 8, 10])
+        b = array('I', range(0, 100, 3))
+        self.assertEqual(list(intersect(a, b)), [6])
+        self.assertEqual(list(difference(a, b)), [2, 4, 8, 10])
+
+class TestExecuteQuery(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        build_index(SAMPLE_CORPUS, self.tmp.name)
+        self.index = PriorArtIndex(self.tmp.name)
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def _ids(self, query):
+        return sorted(self.index.get_document(d)["id"] for d in execute_query(parse_query(query), self.index))
+
+    def test_and_or_not(self):
+        self.assertEqual(self._ids("toaster AND optical"), ["US-1111111-A1", "US-8888888-B1"])
+        self.assertEqual(self._ids("toaster NOT optical"), ["US-5555555-A1"])
+        self.assertEqual(self._ids("(laser AND rastering) OR (infrared AND grid)"), ["US-1234567-A1", "US-6666666-B2"])
+
+    def test_phrase_and_proximity_use_positions(self):
+        # "optical sensors to monitor browning" vs "Optical Sensor for Toaster Safety"
+        self.assertEqual(self._ids('"optical sensors"'), ["US-1111111-A1"])
+        self.assertEqual(self._ids('"sensors optical"'), [])
+        self.assertEqual(self._ids("optical NEAR/3 browning"), ["US-1111111-A1"])
+        self.assertEqual(self._ids("optical NEAR/1 browning"), [])
+        self.assertEqual(self._ids('"laser beams" NEAR/4 substrates'), ["US-7654321-B2"])
+        self.assertEqual(self._ids("laser-beams NEAR/4 substrates"), ["US-7654321-B2"])
+        self.assertEqual(self._ids("beams-laser"), [])
+
+    def test_operators_are_not_search_terms(self):
+        scores = self.index.match("(toaster AND optical)")
+        self.assertEqual(len(scores), 2)
+
+    def test_invalid_query_matches_its_terms(self):
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(self.index.match("toaster NOT"), self.index.match("toaster"))
+            self.assertEqual(self.index.match("OR laser toaster"), self.index.match("laser OR toaster"))
+        for disclosure in ("Not a toaster", "Or maybe a laser", 'A "quoted" toaster'):
+            keywords = SearcherAgent()._build_keywords(disclosure)
+            self.assertIsNotNone(parse_query(keywords))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Ensure the parent directory is in path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.bulk_ingest import parse_uspto_xml, iter_raw_records, ingest_files
+from tools.segments import SegmentedPriorArtIndex
+
+GRANT_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE us-patent-grant SYSTEM "us-patent-grant-v45-2014-04-03.dtd" [ ]>
+<us-patent-grant lang="EN">
+<us-bibliographic-data-grant>
+<publication-reference><document-id><country>US</country><doc-number>{number}</doc-number><kind>B2</kind><date>20150106</date></document-id></publication-reference>
+<classifications-cpc><main-cpc><classification-cpc><section>A</section><class>47</class><subclass>J</subclass><main-group>37</main-group><subgroup>08</subgroup></classification-cpc></main-cpc></classifications-cpc>
+<invention-title>Laser toaster &mdash; {number}</invention-title>
+</us-bibliographic-data-grant>
+<abstract><p>A toaster with a <b>laser</b> raster head.</p></abstract>
+</us-patent-grant>
+"""
+
+class TestBulkIngest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "ipg150106.xml")
+        with open(self.path, "w") as f:
+            for number in range(9000000, 9000025):
+                f.write(GRANT_XML.format(number=number))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parse_grant(self):
+        doc = parse_uspto_xml(GRANT_XML.format(number=9000000))
+        self.assertEqual(doc["id"], "US-9000000-B2")
+        self.assertEqual(doc["date"], "2015-01-06")
+        self.assertEqual(doc["cpc"], ["A47J 37/08"])
+        self.assertEqual(doc["title"], "Laser toaster — 9000000")
+        self.assertEqual(doc["abstract"], "A toaster with a laser raster head.")
+
+    def test_records_are_split_per_declaration(self):
+        self.assertEqual(sum(1 for _ in iter_raw_records(self.path)), 25)
+
+    def test_ingest_writes_searchable_segments(self):
+        index_dir = os.path.join(self.tmp.name, "index")
+        summary = ingest_files([self.path], index_dir, workers=1, batch_size=4, segment_size=10)
+        self.assertEqual(summary["documents"], 25)
+        self.assertEqual(summary["segments"], 3)
+        index = SegmentedPriorArtIndex(index_dir)
+        hits = index.search_documents("laser AND raster", top_k=30)
+        self.assertEqual(len(hits), 25)
+        index.close()
+
+if __name__ == "__main__":
+    unittest.main()
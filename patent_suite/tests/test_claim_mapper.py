@@ -0,0 +1,53 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools import claim_mapper
+from tools.claim_mapper import calculate_similarity, similarity_matrix, map_claims, map_claims_batch
+
+class TestClaimMapper(unittest.TestCase):
+    def test_matrix_matches_pairwise_similarity(self):
+        user = ["a laser pattern radiator", "a bread carriage", ""]
+        prior = ["a heating device", "a bread carriage", "a nichrome wire heating element", "laser"]
+        matrix = similarity_matrix(user, prior)
+        self.assertEqual(matrix.shape, (3, 4))
+        for i, u in enumerate(user):
+            for j, p in enumerate(prior):
+                self.assertEqual(matrix[i, j], calculate_similarity(u, p))
+
+    def test_map_claims_flags_overlap_and_novelty(self):
+        mapping = map_claims(
+            "1. A toaster comprising: a laser pattern radiator; and a bread carriage.",
+            "A heater including a bread carriage; a nichrome wire heating element."
+        )
+        self.assertEqual(mapping[": a laser pattern radiator"]["status"], "NOVELTY DETECTED")
+        self.assertEqual(mapping["and a bread carriage."]["status"], "OVERLAP")
+        self.assertEqual(mapping["and a bread carriage."]["match"], "a bread carriage")
+
+    def test_batch_chart_agrees_with_map_claims(self):
+        claims = ["1. A toaster comprising: a laser pattern radiator; and a bread carriage.",
+                  "2. A heater comprising a nichrome wire heating element."]
+        references = [{"id": "R1", "text": "A heater including a bread carriage; a nichrome wire heating element."},
+                      {"id": "R2", "title": "Laser Toaster", "abstract": "A laser pattern radiator."},
+                      ""]
+        for min_elements in (claim_mapper.PARALLEL_MIN_ELEMENTS, 0):
+            with self.subTest(parallel=min_elements == 0):
+                claim_mapper.PARALLEL_MIN_ELEMENTS = min_elements
+                try:
+                    chart = map_claims_batch(claims, references)
+                finally:
+                    claim_mapper.PARALLEL_MIN_ELEMENTS = 20000
+                self.assertEqual(chart["references"], ["R1", "R2", 2])
+                self.assertEqual(chart["similarity"].shape, (len(chart["elements"]), 3))
+                for row, element in enumerate(chart["elements"]):
+                    for col, ref in enumerate(references[:2]):
+                        expected = map_claims(claims[element["claim"]], claim_mapper._reference_text(ref))[element["text"]]
+                        best = chart["best_element"][row, col]
+                        match = chart["reference_elements"][col][best] if best >= 0 else None
+                        self.assertEqual(match, expected["match"])
+                self.assertTrue((chart["best_element"][:, 2] == -1).all())
+
+if __name__ == "__main__":
+    unittest.main()
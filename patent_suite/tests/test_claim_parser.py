@@ -0,0 +1,60 @@
+import io
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from patent_suite.tools import claim_parser
+from tools.claim_parser import parse_claims
+from tools.claim_mapper import split_into_elements
+from tools.syntax_check import check_antecedent_basis
+from tools.statutory_linter import check_indefiniteness
+from agents.examiner import split_claims
+
+CLAIMS = """1. A toaster comprising: a laser pattern radiator; and a bread carriage.
+
+2. The toaster of Claim 1, further comprising a tray.
+
+3. The toaster of Claim 2, wherein the tray is approximately flat."""
+
+
+class TestClaimParser(unittest.TestCase):
+    def test_structure_and_offsets(self):
+        claim_set = parse_claims(CLAIMS)
+        self.assertEqual([c.number for c in claim_set.claims], [1, 2, 3])
+        self.assertEqual([c.depends_on for c in claim_set.claims], [None, 1, 2])
+        first = claim_set.claims[0]
+        self.assertEqual(first.preamble, "A toaster")
+        self.assertEqual(first.transition, "comprising")
+        self.assertEqual([e.text for e in first.elements], split_into_elements("1. " + first.text))
+        for claim in claim_set.claims:
+            self.assertEqual(CLAIMS[claim.start:claim.end], claim.text)
+            for element in claim.elements:
+                self.assertEqual(claim.text[element.start:element.end], element.text)
+            for token, start in zip(claim.tokens, claim.token_starts):
+                self.assertEqual(claim.text[start:start + len(token)].lower(), token)
+        self.assertEqual([c.number for c in claim_set.chain(3)], [1, 2, 3])
+        self.assertFalse(hasattr(first, "__dict__"))
+
+    def test_unnumbered_heading_is_kept_apart(self):
+        claim_set = parse_claims("# AUTO-FIXED:\n" + CLAIMS)
+        self.assertIsNone(claim_set.claims[0].number)
+        self.assertEqual(len(split_claims("# AUTO-FIXED:\n" + CLAIMS)), 3)
+
+    def test_tools_share_one_parse(self):
+        text = CLAIMS + "\n\n4. The toaster of Claim 1, wherein the lever is red."
+        before = dict(claim_parser.parse_stats)
+        with redirect_stdout(io.StringIO()):
+            syntax = check_antecedent_basis(text)
+            lint = check_indefiniteness(text)
+        split_claims(text)
+        self.assertEqual(claim_parser.parse_stats["parses"] - before["parses"], 1)
+        self.assertEqual(claim_parser.parse_stats["hits"] - before["hits"], 2)
+        self.assertEqual(syntax["errors"], ["Error: Lacks Antecedent Basis - 'the lever'"])
+        self.assertEqual([(e["word"], e["line"], e["claim"]) for e in lint], [("approximately", 5, 3)])
+
+
+if __name__ == "__main__":
+    unittest.main()
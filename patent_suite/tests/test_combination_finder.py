@@ -0,0 +1,73 @@
+import unittest
+import os
+import sys
+from itertools import combinations
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.combination_finder import find_combinations
+from agents.examiner import MockExaminerAgent
+
+def naive_minimal_covers(masks, element_count, max_size=3):
+    full = (1 << element_count) - 1
+    def union(refs):
+        result = 0
+        for r in refs:
+            result |= masks[r]
+        return result
+    found = []
+    for size in range(2, max_size + 1):
+        for refs in combinations(range(len(masks)), size):
+            if union(refs) == full and all(union(sub) != full for sub in combinations(refs, size - 1)):
+                found.append(refs)
+    return found
+
+class TestCombinationFinder(unittest.TestCase):
+    def test_matches_naive_enumeration(self):
+        masks = [0b0011, 0b1100, 0b0110, 0b1001, 0b0011, 0b1111, 0b0001, 0b1110, 0]
+        anticipating, combos = find_combinations(masks, 4)
+        self.assertEqual(anticipating, [5])
+        expected = [c for c in naive_minimal_covers(masks, 4) if 5 not in c]
+        self.assertEqual(combos, sorted(expected, key=lambda refs: (len(refs), refs)))
+        self.assertIn((0, 1), combos)
+        self.assertIn((2, 3), combos)
+        self.assertNotIn((0, 1, 2), combos)
+
+    def test_examiner_cites_combination(self):
+        claims = "1. A toaster comprising: a laser pattern radiator; and a bread carriage.\n\n2. A voice interface with wi-fi connectivity."
+        refs = [
+            {"id": "R1", "title": "Bread Carriage", "abstract": "A heater including a bread carriage; a crumb tray."},
+            {"id": "R2", "title": "Laser Toaster", "abstract": "A toaster; a laser pattern radiator."},
+        ]
+        findings = MockExaminerAgent().find_rejections(claims, refs)
+        self.assertEqual(findings[0]["combinations"], [["R1", "R2"]])
+        self.assertEqual(findings[1]["combinations"], [])
+        report = MockExaminerAgent().examine(claims, refs)
+        self.assertIn("Claim 1 is rejected as being unpatentable over R1 (Bread Carriage) in view of R2 (Laser Toaster)", report)
+        self.assertIn("1 OF 2 CLAIMS ARE REJECTED", report)
+
+    def test_examiner_numbers_claims_and_charts_dependent_chain(self):
+        claims = ("What is claimed is:\n"
+                  "1. A toaster comprising: a laser pattern radiator; and a bread carriage.\n"
+                  "2. The toaster of Claim 1, further comprising a crumb tray.")
+        refs = [{"id": "R3", "title": "Tray", "abstract": "A toaster; a crumb tray."}]
+        findings = MockExaminerAgent().find_rejections(claims, refs)
+        self.assertEqual([f["claim"] for f in findings], [1, 2])
+        # Claim 2 carries claim 1's limitations, which R3 does not disclose
+        self.assertEqual(findings[1]["elements"], findings[0]["elements"] + 2)
+        self.assertEqual(findings[1]["anticipating"], [])
+        report = MockExaminerAgent().examine(claims, refs)
+        self.assertIn("0 OF 2 CLAIMS ARE REJECTED", report)
+        self.assertIn("CONCLUSION: No claim is rejected", report)
+
+    def test_examiner_without_findings_rejects_nothing(self):
+        claims = "1. A toaster comprising a laser."
+        refs = [{"id": "R1", "title": "Laser Toaster", "abstract": "A toaster; a laser."}]
+        for draft, art in ((claims, []), ("A toaster comprising a laser.", refs)):
+            report = MockExaminerAgent().examine(draft, art)
+            self.assertIn("NO CLAIMS COULD BE CHARTED", report)
+            self.assertNotIn("REJECTED", report)
+            self.assertNotIn("The application is rejected", report)
+
+if __name__ == "__main__":
+    unittest.main()
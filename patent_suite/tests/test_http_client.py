@@ -0,0 +1,118 @@
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from tools.http_client import HttpClient, CircuitOpenError
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so the client can keep the connection alive between requests
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server.requests.append(self.client_address)
+        time.sleep(server.delay)
+        if server.failures_left > 0:
+            server.failures_left -= 1
+            status, body = server.failure_status, b'{"error": "overloaded"}'
+        else:
+            status, body = 200, json.dumps({"ok": True, "calls": len(server.requests)}).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHttpClient(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.requests = []
+        self.server.failures_left = 0
+        self.server.failure_status = 503
+        self.server.delay = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/search"
+        self.host = f"127.0.0.1:{self.server.server_address[1]}"
+        self.client = HttpClient(backoff_base=0.01, failure_threshold=2, reset_timeout=60)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_keep_alive_reuses_connection(self):
+        for _ in range(3):
+            self.assertEqual(self.client.post(self.url, json={"q": "x"}, timeout=5).status_code, 200)
+        # Same client port on every request: one pooled connection
+        self.assertEqual(len(set(self.server.requests)), 1)
+        self.assertEqual(self.client.stats()[self.host]["calls"], 3)
+
+    def test_retries_transient_errors(self):
+        self.server.failures_left = 2
+        response = self.client.post(self.url, json={"q": "x"}, timeout=5)
+        self.assertEqual(response.json(), {"ok": True, "calls": 3})
+        stats = self.client.stats()[self.host]
+        self.assertEqual((stats["calls"], stats["retries"], stats["errors"]), (1, 2, 0))
+        self.assertGreater(stats["max_ms"], 0)
+
+    def test_circuit_opens_after_failed_calls(self):
+        self.server.failures_left = 100
+        for _ in range(2):
+            self.assertEqual(self.client.post(self.url, timeout=5, retries=0).status_code, 503)
+        self.assertEqual(self.client.stats()[self.host]["circuit"], "open")
+        with self.assertRaises(CircuitOpenError):
+            self.client.post(self.url, timeout=5)
+        # The open breaker never reached the server
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_internal_server_errors_open_the_circuit(self):
+        self.server.failures_left = 100
+        self.server.failure_status = 500
+        for _ in range(2):
+            # 500 is not retried, but counts as a failed call
+            self.assertEqual(self.client.post(self.url, timeout=5).status_code, 500)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.client.stats()[self.host]["circuit"], "open")
+
+    def test_post_is_not_resent_after_a_read_timeout(self):
+        self.server.delay = 0.3
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            self.client.post(self.url, timeout=0.1)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_retries_share_one_deadline(self):
+        self.server.delay = 0.3
+        started = time.perf_counter()
+        with self.assertRaises(requests.exceptions.Timeout):
+            self.client.get(self.url, timeout=0.2, retries=5)
+        # The first attempt used up the budget, so nothing was retried
+        self.assertLess(time.perf_counter() - started, 0.3)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_post_is_retried_when_the_connection_fails(self):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.client.post(f"http://127.0.0.1:{port}/search", timeout=5)
+        self.assertEqual(self.client.stats()[f"127.0.0.1:{port}"]["retries"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
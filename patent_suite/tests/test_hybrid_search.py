@@ -0,0 +1,69 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import threading
+import time
+
+# Ensure the parent directory is in path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tools.hybrid_search as hybrid_search
+from tools.hybrid_search import reciprocal_rank_fusion, hybrid_search_prior_art
+from agents.searcher import SearcherAgent
+
+BM25_HITS = [{"id": "A", "relevance_score": 9.0}, {"id": "B", "relevance_score": 5.0}, {"id": "C", "relevance_score": 1.0}]
+VECTOR_HITS = [{"id": "B", "similarity_score": 0.9}, {"id": "D", "similarity_score": 0.8}, {"id": "A", "similarity_score": 0.1}]
+
+class TestHybridSearch(unittest.TestCase):
+    def test_rrf_rewards_agreement_and_explains_signals(self):
+        fused = reciprocal_rank_fusion({"bm25": BM25_HITS, "vector": VECTOR_HITS}, top_k=4)
+        self.assertEqual([hit["id"] for hit in fused], ["B", "A", "D", "C"])
+        self.assertEqual(fused[0]["signals"]["bm25"], {"rank": 2, "score": 5.0})
+        self.assertEqual(fused[0]["signals"]["vector"], {"rank": 1, "score": 0.9})
+        self.assertNotIn("vector", fused[3]["signals"])
+
+    def test_slow_retriever_is_dropped_after_budget(self):
+        def slow_vector(*args, **kwargs):
+            time.sleep(0.5)
+            return VECTOR_HITS
+        with patch.object(hybrid_search, "search_prior_art", return_value=BM25_HITS), \
+             patch.object(hybrid_search, "semantic_search_prior_art", side_effect=slow_vector):
+            started = time.perf_counter()
+            response = hybrid_search_prior_art("laser", budgets={"bm25": 1.0, "vector": 0.05})
+            self.assertLess(time.perf_counter() - started, 0.4)
+        self.assertEqual(response["signals"]["vector"]["status"], "timeout")
+        self.assertEqual(response["signals"]["bm25"]["status"], "ok")
+        self.assertEqual([hit["id"] for hit in response["results"]], ["A", "B", "C"])
+
+    def test_stalled_vector_retriever_does_not_starve_bm25(self):
+        release = threading.Event()
+        stalled = []
+        def stalled_vector(*args, **kwargs):
+            stalled.append(1)
+            release.wait(5)
+            return VECTOR_HITS
+        with patch.object(hybrid_search, "search_prior_art", return_value=BM25_HITS), \
+             patch.object(hybrid_search, "semantic_search_prior_art", side_effect=stalled_vector):
+            statuses = []
+            # More requests than there are workers, each leaving a vector call behind
+            for _ in range(12):
+                response = hybrid_search_prior_art("laser", budgets={"bm25": 0.2, "vector": 0.01})
+                statuses.append(response["signals"]["bm25"]["status"])
+            release.set()
+            # Let the queued vector calls drain while the patch is still in place
+            deadline = time.perf_counter() + 5
+            while len(stalled) < 12 and time.perf_counter() < deadline:
+                time.sleep(0.01)
+        self.assertEqual(statuses, ["ok"] * 12)
+
+    def test_searcher_agent_hybrid_mode(self):
+        os.environ.pop("OPENPATENT_API_KEY", None)
+        tool = MagicMock(return_value={"results": [{"id": "H1"}], "signals": {"bm25": {"status": "ok"}}})
+        result = SearcherAgent(hybrid_search_tool=tool).run("laser toaster", {})
+        self.assertEqual(result["retrieval"], "hybrid")
+        self.assertEqual(result["results"][0]["id"], "H1")
+        self.assertEqual(tool.call_args.kwargs["text"], "laser toaster")
+
+if __name__ == "__main__":
+    unittest.main()
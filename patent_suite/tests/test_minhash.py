@@ -0,0 +1,49 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Ensure the parent directory is in path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.minhash import minhash_signature, estimated_jaccard
+from tools.prior_art_index import build_index, PriorArtIndex, SAMPLE_CORPUS, tokenize
+
+FAMILY_ABSTRACT = ("A toaster comprising a laser emitter and a galvanometer mirror that rasters the beam across "
+                   "a slice of bread to brown a user-selected image onto its surface, with an optical sensor "
+                   "measuring browning and a controller adjusting laser power in a closed feedback loop.")
+
+class TestFamilyCollapsing(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        family = [
+            {"id": "US-9100000-B2", "title": "Laser image toaster", "abstract": FAMILY_ABSTRACT, "date": "2019-03-01"},
+            {"id": "EP-3100000-A1", "title": "Laser image toaster", "abstract": FAMILY_ABSTRACT.replace("user-selected", "user selected"), "date": "2019-06-01"},
+            {"id": "JP-2019100000-A", "title": "Laser image toaster", "abstract": FAMILY_ABSTRACT + " (Translated)", "date": "2019-09-01"}
+        ]
+        build_index(SAMPLE_CORPUS + family, self.tmp.name)
+        self.index = PriorArtIndex(self.tmp.name)
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def test_signatures_estimate_jaccard(self):
+        a = minhash_signature(tokenize(FAMILY_ABSTRACT))
+        b = minhash_signature(tokenize(FAMILY_ABSTRACT + " (Translated)"))
+        c = minhash_signature(tokenize(SAMPLE_CORPUS[0]["abstract"]))
+        self.assertGreater(estimated_jaccard(a, b), 0.8)
+        self.assertLess(estimated_jaccard(a, c), 0.2)
+
+    def test_family_members_share_one_slot(self):
+        plain = [doc["id"] for _, doc in self.index.search_documents("laser toaster", top_k=5)]
+        collapsed = self.index.search_documents("laser toaster", top_k=5, collapse=True)
+        self.assertEqual(len(collapsed), 5)
+        family_hits = [doc for _, doc in collapsed if doc["family_members"]]
+        self.assertEqual(len(family_hits), 1)
+        self.assertEqual(len(family_hits[0]["family_members"]) + 1, 3)
+        self.assertEqual(collapsed[0][1]["id"], plain[0])
+        self.assertTrue(all("family_members" in doc for _, doc in collapsed))
+
+if __name__ == "__main__":
+    unittest.main()
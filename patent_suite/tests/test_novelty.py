@@ -0,0 +1,31 @@
+import unittest
+import os
+import sys
+
+# Ensure the parent directory is in path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.novelty import extract_features, score_novelty_overlap, assess_novelty
+from tools.prior_art_index import SAMPLE_CORPUS
+
+class TestNoveltyOverlap(unittest.TestCase):
+    def test_feature_extraction(self):
+        features = extract_features("A toaster with optical sensors that monitor browning levels.")
+        self.assertEqual(features, ["A toaster", "optical sensors", "monitor browning levels"])
+
+    def test_overlap_matrix_shape_and_anticipation(self):
+        result = assess_novelty("A toaster with optical sensors that monitor browning levels.", SAMPLE_CORPUS)
+        self.assertEqual(len(result["matrix"]), 3)
+        self.assertEqual(len(result["matrix"][0]), len(SAMPLE_CORPUS))
+        self.assertTrue(result["anticipated"])
+        self.assertEqual(result["best_reference"]["id"], "US-1111111-A1")
+
+    def test_partial_overlap_is_not_anticipation(self):
+        result = score_novelty_overlap(["laser rastering", "voice interface"], SAMPLE_CORPUS)
+        self.assertFalse(result["anticipated"])
+        laser_ref = next(r for r in result["references"] if r["id"] == "US-6666666-B2")
+        self.assertEqual(laser_ref["disclosed_features"], [0])
+        self.assertEqual(score_novelty_overlap([], SAMPLE_CORPUS)["anticipated"], False)
+
+if __name__ == "__main__":
+    unittest.main()
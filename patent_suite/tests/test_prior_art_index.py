@@ -0,0 +1,109 @@
+import unittest
+import os
+import sys
+import tempfile
+from array import array
+
+# Ensure the parent directory is in path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.prior_art_index import build_index, PriorArtIndex, SAMPLE_CORPUS, tokenize, date_key, top_k_hits, PriorArtHit
+
+class TestPriorArtIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        build_index(SAMPLE_CORPUS, self.tmp.name)
+        self.index = PriorArtIndex(self.tmp.name)
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def test_tokenize_drops_stopwords_and_punctuation(self):
+        self.assertEqual(tokenize("A Laser-Based toaster, with (precision)"), ["laser", "based", "toaster", "precision"])
+
+    def test_postings_are_sorted_by_doc_id(self):
+        doc_ids, tfs = self.index.postings("toaster")
+        self.assertEqual(list(doc_ids), sorted(doc_ids))
+        self.assertEqual(len(doc_ids), self.index.doc_freq("toaster"))
+        self.assertTrue(all(tf >= 1 for tf in tfs))
+
+    def test_bm25_ranks_matching_documents_only(self):
+        hits = self.index.search("laser rastering", top_k=10)
+        ids = [self.index.get_document(doc_id)["id"] for _, doc_id in hits]
+        self.assertEqual(ids[0], "US-6666666-B2")
+        self.assertNotIn("US-1234567-A1", ids)
+        scores = [score for score, _ in hits]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_doc_ids_follow_publication_date(self):
+        self.assertEqual(list(self.index.dates), sorted(self.index.dates))
+        self.assertEqual(self.index.get_document(0)["id"], "EP-9876543-A1")
+
+    def test_date_cutoff_prunes_later_art(self):
+        self.assertEqual(date_key("2018"), 20180000)
+        limit = self.index.doc_limit("2018-01-01")
+        doc_ids, _ = self.index.postings("toaster", limit)
+        self.assertTrue(all(doc_id < limit for doc_id in doc_ids))
+        hits = self.index.search("toaster OR laser OR heating", date_cutoff="2018-01-01")
+        dates = [self.index.get_document(doc_id)["date"] for _, doc_id in hits]
+        self.assertTrue(dates)
+        self.assertTrue(all(d < "2018-01-01" for d in dates))
+        self.assertEqual(self.index.search("toaster", date_cutoff="2000-01-01"), [])
+
+    def test_top_k_heap_matches_full_sort(self):
+        scored = [(doc_id, float(doc_id % 7)) for doc_id in range(500)]
+        expected = sorted(((score, doc_id) for doc_id, score in scored), reverse=True)[:10]
+        self.assertEqual(top_k_hits(iter(scored), 10), expected)
+        self.assertEqual(top_k_hits(iter(scored), 0), [])
+
+    def test_hits_are_read_only(self):
+        hit = PriorArtHit(self.index.get_document(0), relevance_score=1.0)
+        with self.assertRaises(TypeError):
+            hit["relevance_score"] = 2.0
+        self.assertNotIn("relevance_score", self.index.get_document(0))
+
+    def test_unknown_term_returns_nothing(self):
+        self.assertEqual(self.index.search("holographic"), [])
+
+    def test_cpc_filter_is_hierarchical(self):
+        ids = lambda hits: {self.index.get_document(doc_id)["id"] for _, doc_id in hits}
+        toasters = ids(self.index.search("toaster OR toasting OR heating", top_k=20, cpc=["A47J 37/08"]))
+        self.assertEqual(toasters, {"US-1234567-A1", "US-1111111-A1", "US-3333333-A1", "US-5555555-A1", "US-8888888-B1"})
+        self.assertEqual(ids(self.index.search("toaster OR toasting OR heating", top_k=20, cpc=["A47J 37"])), toasters)
+        lasers = ids(self.index.search("laser AND NOT toaster", top_k=20, cpc=["H01S 3/00", "A21B"]))
+        self.assertEqual(lasers, {"US-7654321-B2", "US-6666666-B2"})
+        self.assertEqual(self.index.search("laser", cpc=["G06F 8/00"]), [])
+
+    def test_block_packed_postings_round_trip(self):
+        docs = [
+            {"id": f"US-{n}", "title": "laser " * (1 + n % 300) + ("rare" if n % 97 == 0 else ""), "date": "2015-01-06"}
+            for n in range(1000)
+        ]
+        index_dir = os.path.join(self.tmp.name, "large")
+        build_index(docs, index_dir)
+        index = PriorArtIndex(index_dir)
+        doc_ids, tfs = index.postings("laser")
+        self.assertEqual(list(doc_ids), list(range(1000)))
+        self.assertEqual(list(tfs), [1 + n % 300 for n in range(1000)])
+        self.assertEqual(list(index.postings("laser", limit=300)[0]), list(range(300)))
+        rare = index.postings("rare")[0]
+        self.assertEqual(list(rare), list(range(0, 1000, 97)))
+        # Skip pointers: only the blocks holding candidates are decoded
+        self.assertEqual(len(index.postings("laser", candidates=array('I', [0, 5, 600]))[0]), 2 * 128)
+        self.assertEqual(len(index.search("laser AND rare", top_k=20)), len(rare))
+        index.close()
+
+    def test_batch_search_matches_individual_searches(self):
+        specs = [
+            {"query": "laser toaster"},
+            {"query": "laser AND heating", "date_cutoff": "2020-01-01"},
+            {"query": "\"precision heating\" OR toaster", "cpc": ["A47J 37"]},
+        ]
+        batch = self.index.search_documents_batch(specs, top_k=5)
+        for spec, hits in zip(specs, batch):
+            expected = self.index.search_documents(spec["query"], 5, spec.get("date_cutoff"), spec.get("cpc"))
+            self.assertEqual([(round(s, 6), d["id"]) for s, d in hits], [(round(s, 6), d["id"]) for s, d in expected])
+
+if __name__ == "__main__":
+    unittest.main()
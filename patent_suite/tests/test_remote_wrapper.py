@@ -12,8 +12,10 @@ class TestRemoteAgent(unittest.TestCase):
     def setUp(self):
         self.agent = RemoteAgent()
         os.environ["OPENPATENT_API_KEY"] = "test-api-key"
+        # Every test must reach the (mocked) network
+        os.environ["OPENPATENT_RESPONSE_CACHE"] = "0"
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_run_success(self, mock_post):
         # Setup mock response
         mock_response = MagicMock()
@@ -49,7 +51,7 @@ class TestRemoteAgent(unittest.TestCase):
         
         self.assertIn("Premium Feature", str(cm.exception))
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_run_error(self, mock_post):
         # Setup mock for connection error
         import requests
@@ -0,0 +1,71 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.response_cache import ResponseCache, wants_fresh_response
+from agents import illustrator
+from agents.illustrator import IllustratorAgent
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(cache_dir=self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_ignores_payload_key_order(self):
+        a = ResponseCache.make_key("Illustrator", {"claims_text": "1. A toaster", "style": "line"})
+        b = ResponseCache.make_key("Illustrator", {"style": "line", "claims_text": "1. A toaster"})
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, ResponseCache.make_key("RemoteAgent", {"claims_text": "1. A toaster", "style": "line"}))
+
+    def test_round_trip_and_lru_eviction(self):
+        cache = ResponseCache(cache_dir=self.tmp.name, max_bytes=500)
+        old, new = cache.make_key("A", 1), cache.make_key("A", 2)
+        cache.set(old, {"image": os.urandom(150).hex()})
+        cache.set(new, {"image": os.urandom(150).hex()})
+        self.assertIsNotNone(cache.get(new))
+        # Push the total over budget: the least recently read blob goes first
+        os.utime(cache._path(old), (0, 0))
+        cache.set(cache.make_key("A", 3), {"image": os.urandom(150).hex()})
+        self.assertIsNone(cache.get(old))
+        self.assertIsNotNone(cache.get(new))
+        self.assertGreater(cache.stats()["evictions"], 0)
+
+    def test_opt_out_headers(self):
+        self.assertTrue(wants_fresh_response({"Cache-Control": "no-cache"}))
+        self.assertTrue(wants_fresh_response({"X-OpenPatent-No-Cache": "1"}))
+        self.assertFalse(wants_fresh_response({}))
+
+    @patch('requests.Session.post')
+    def test_illustrator_repeat_call_is_cached(self, mock_post):
+        mock_post.return_value = MagicMock(status_code=200, json=MagicMock(return_value={"image_url": "fig1.png"}))
+        with patch.dict(os.environ, {"OPENPATENT_API_KEY": "test-api-key", "OPENPATENT_RESPONSE_CACHE": "1"}), \
+             patch.object(illustrator, "RESPONSE_CACHE", self.cache):
+            agent = IllustratorAgent()
+            first = agent.run("Generate illustration", {"claims_text": "1. A toaster."})
+            second = agent.run("Generate illustration", {"claims_text": "1. A toaster."})
+            agent.run("Generate illustration", {"claims_text": "1. A toaster.", "no_cache": True})
+        self.assertEqual(first, second)
+        self.assertEqual(mock_post.call_count, 2)
+
+    @patch('requests.Session.post')
+    def test_illustrator_rejects_non_object_response(self, mock_post):
+        with patch.dict(os.environ, {"OPENPATENT_API_KEY": "test-api-key", "OPENPATENT_RESPONSE_CACHE": "1"}), \
+             patch.object(illustrator, "RESPONSE_CACHE", self.cache):
+            for body in (["fig1.png"], "fig1.png", None):
+                mock_post.return_value = MagicMock(status_code=200, json=MagicMock(return_value=body))
+                result = IllustratorAgent().run("Generate illustration", {"claims_text": "1. A toaster."})
+                self.assertEqual(result["status"], "error")
+        # Nothing was cached: every run went to the server
+        self.assertEqual(mock_post.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
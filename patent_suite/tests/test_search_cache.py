@@ -0,0 +1,67 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+# Ensure the parent directory is in path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.search_cache import SearchCache, normalize_query
+
+class TestSearchCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = SearchCache("test", max_entries=2, ttl=60, cache_dir=self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_normalized_queries_share_a_key(self):
+        self.assertEqual(normalize_query("  Laser   AND toaster "), normalize_query("laser and TOASTER"))
+
+    def test_memory_then_disk_hits(self):
+        key = SearchCache.make_key("laser", "2020-01-01")
+        self.assertIsNone(self.cache.get(key))
+        self.cache.set(key, [{"id": "US-1"}])
+        self.assertEqual(self.cache.get(key), [{"id": "US-1"}])
+
+        # A fresh process only has the disk tier
+        reopened = SearchCache("test", cache_dir=self.tmp.name)
+        self.assertEqual(reopened.get(key), [{"id": "US-1"}])
+        self.assertEqual(self.cache.stats()["memory_hits"], 1)
+        self.assertEqual(reopened.stats()["disk_hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_lru_eviction(self):
+        for q in ("a", "b", "c"):
+            self.cache.set(SearchCache.make_key(q), q)
+        self.assertEqual(self.cache.stats()["entries"], 2)
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_ttl_expiry(self):
+        key = SearchCache.make_key("expiring")
+        self.cache.set(key, "value")
+        with patch("time.time", return_value=10 ** 12):
+            self.assertIsNone(self.cache.get(key))
+
+    def test_disk_hit_keeps_its_expiry(self):
+        key = SearchCache.make_key("near-expiry")
+        with patch("time.time", return_value=1000.0):
+            self.cache.set(key, "value")
+        reopened = SearchCache("test", ttl=60, cache_dir=self.tmp.name)
+        with patch("time.time", return_value=1050.0):
+            self.assertEqual(reopened.get(key), "value")
+        # Promoted to memory at 1050, but still expires at 1060
+        with patch("time.time", return_value=1070.0):
+            self.assertIsNone(reopened.get(key))
+
+    def test_disk_budget(self):
+        small = SearchCache("small", cache_dir=self.tmp.name, max_disk_bytes=400)
+        for i in range(20):
+            small.set(SearchCache.make_key(i), "x" * 50)
+        files = [f for _, _, fs in os.walk(small.disk_dir) for f in fs]
+        self.assertLess(len(files), 20)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import patch, MagicMock
 import os
 import sys
+import time
 
 # Ensure the parent directory is in path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -25,7 +26,7 @@ class TestSearcherAgentHybrid(unittest.TestCase):
         self.assertEqual(result["results"][0]["id"], "L1")
         self.mock_local_tool.assert_called_once()
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_run_remote_search_premium(self, mock_post):
         # Setup API key
         os.environ["OPENPATENT_API_KEY"] = "op-premium-key"
@@ -49,5 +50,70 @@ class TestSearcherAgentHybrid(unittest.TestCase):
             timeout=30
         )
 
+    def test_run_batch_sends_one_batch_call(self):
+        if "OPENPATENT_API_KEY" in os.environ:
+            del os.environ["OPENPATENT_API_KEY"]
+        batch_tool = MagicMock(side_effect=lambda queries, date_cutoff=None: [[{"id": q}] for q in queries])
+        agent = SearcherAgent(search_tool=self.mock_local_tool, batch_search_tool=batch_tool)
+        results = agent.run_batch(["holographic bread", "laser toaster"], {"date_cutoff": "2024-01-01"})
+        batch_tool.assert_called_once()
+        self.assertEqual([r["query"] for r in results], [r["results"][0]["id"] for r in results])
+        self.assertTrue(results[1]["query"].startswith("(\"laser\" AND"))
+        self.mock_local_tool.assert_not_called()
+
+class TestSearcherAgentHedged(unittest.TestCase):
+    def setUp(self):
+        os.environ["OPENPATENT_API_KEY"] = "op-premium-key"
+        self.local_tool = MagicMock(return_value=[{"id": "L1", "title": "Local 1", "abstract": "abc"}])
+
+    def _remote(self, delay, status="success"):
+        def run(query, api_key):
+            time.sleep(delay)
+            if status != "success":
+                return {"status": "error", "message": "Deep Search failed: 503"}
+            return {"status": "success", "mode": "premium", "results": [{"id": "R1"}, {"id": "L1"}]}
+        return run
+
+    def test_slow_remote_loses_to_local(self):
+        agent = SearcherAgent(search_tool=self.local_tool, hedge_delay=0.05)
+        with patch.object(agent, "_run_remote_search", side_effect=self._remote(1.0)):
+            started = time.perf_counter()
+            result = agent.run("holographic bread cutting", {})
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(result["mode"], "free")
+        self.assertEqual(result["hedge"]["winner"], "local")
+
+    def test_fast_remote_skips_local(self):
+        agent = SearcherAgent(search_tool=self.local_tool, hedge_delay=0.5)
+        with patch.object(agent, "_run_remote_search", side_effect=self._remote(0.0)):
+            result = agent.run("holographic bread cutting", {})
+        self.assertEqual(result["hedge"]["winner"], "remote")
+        self.local_tool.assert_not_called()
+
+    def test_late_results_are_merged(self):
+        agent = SearcherAgent(search_tool=self.local_tool, hedge_delay=0.0, merge_window=1.0)
+        with patch.object(agent, "_run_remote_search", side_effect=self._remote(0.1)):
+            result = agent.run("holographic bread cutting", {})
+        self.assertEqual(result["hedge"]["winner"], "local")
+        self.assertTrue(result["hedge"]["merged"])
+        self.assertEqual([hit["id"] for hit in result["results"]], ["L1", "R1"])
+
+    def test_remote_error_falls_back_to_local(self):
+        agent = SearcherAgent(search_tool=self.local_tool, hedge_delay=5.0)
+        with patch.object(agent, "_run_remote_search", side_effect=self._remote(0.0, status="error")):
+            started = time.perf_counter()
+            result = agent.run("holographic bread cutting", {})
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertEqual(result["hedge"]["winner"], "local")
+
+    def test_batch_of_slow_remotes_still_hedges(self):
+        agent = SearcherAgent(search_tool=self.local_tool, hedge_delay=0.05)
+        with patch.object(agent, "_run_remote_search", side_effect=self._remote(1.0)):
+            started = time.perf_counter()
+            results = agent.run_batch([f"disclosure {i}" for i in range(8)])
+        # The remote calls fill the remote pool; the local hedges must not queue behind them
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual({r["hedge"]["winner"] for r in results}, {"local"})
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Ensure the parent directory is in path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.segments import (
+    SegmentedPriorArtIndex, add_documents, delete_documents, merge_until_stable, plan_merge, read_manifest
+)
+
+def make_docs(start, count, word="laser"):
+    return [
+        {"id": f"US-{n}-B2", "title": f"{word} toaster {n}", "abstract": "Browning by raster scan.", "date": "2015-01-06"}
+        for n in range(start, start + count)
+    ]
+
+class TestSegments(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index_dir = os.path.join(self.tmp.name, "index")
+        for batch in range(4):
+            add_documents(self.index_dir, make_docs(batch * 5, 5))
+        self.index = SegmentedPriorArtIndex(self.index_dir, refresh_interval=0)
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def ids(self, query):
+        return {doc["id"] for _, doc in self.index.search_documents(query, top_k=100)}
+
+    def test_new_segment_visible_after_refresh(self):
+        self.assertEqual(len(self.ids("laser")), 20)
+        add_documents(self.index_dir, make_docs(100, 2, word="plasma"))
+        self.assertEqual(self.ids("plasma"), {"US-100-B2", "US-101-B2"})
+
+    def test_delete_and_replace(self):
+        self.assertEqual(delete_documents(self.index_dir, ["US-3-B2", "US-7-B2"]), 2)
+        self.assertNotIn("US-3-B2", self.ids("laser"))
+        self.assertEqual(len(self.ids("laser")), 18)
+        add_documents(self.index_dir, make_docs(4, 1, word="plasma"), replace=True)
+        self.assertNotIn("US-4-B2", self.ids("laser"))
+        self.assertIn("US-4-B2", self.ids("plasma"))
+
+    def test_merge_drops_tombstones_and_keeps_results(self):
+        delete_documents(self.index_dir, ["US-0-B2"])
+        before = self.ids("laser OR raster")
+        self.assertEqual(len(plan_merge(read_manifest(self.index_dir), merge_factor=4, min_segment_docs=10)), 4)
+        self.assertEqual(merge_until_stable(self.index_dir, merge_factor=4, min_segment_docs=10), 1)
+        manifest = read_manifest(self.index_dir)
+        self.assertEqual(len(manifest["segments"]), 1)
+        self.assertEqual(manifest["segments"][0]["doc_count"], 19)
+        self.assertEqual(self.ids("laser OR raster"), before)
+
+    def test_refresh_leaves_previous_snapshot_untouched(self):
+        old = self.index.refresh()
+        old_scores = [score for score, _ in self.index.search_documents("laser", top_k=100)]
+        delete_documents(self.index_dir, ["US-3-B2"])
+        add_documents(self.index_dir, make_docs(100, 5, word="laser"))
+        new = self.index.refresh()
+        self.assertIsNot(new, old)
+        # A search still holding the old snapshot scores with its own statistics and tombstones
+        self.assertTrue(all(seg.stats is old and not seg.deleted for seg in old.segments))
+        scores = sorted((score for seg in old.segments for score, _ in seg.search_documents("laser", 100)), reverse=True)
+        self.assertEqual(scores, old_scores)
+
+if __name__ == "__main__":
+    unittest.main()
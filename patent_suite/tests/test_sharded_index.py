@@ -0,0 +1,39 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Ensure the parent directory is in path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.prior_art_index import SAMPLE_CORPUS
+from tools.sharded_index import build_sharded_index, ShardedPriorArtIndex, merge_shard_results
+
+class TestShardedPriorArtIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manifest = build_sharded_index(SAMPLE_CORPUS, self.tmp.name, 3)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_every_document_lands_in_one_shard(self):
+        self.assertEqual(self.manifest["doc_count"], len(SAMPLE_CORPUS))
+        self.assertEqual(len(self.manifest["shards"]), 3)
+
+    def test_parallel_fan_out_matches_in_process_search(self):
+        local = ShardedPriorArtIndex(self.tmp.name, parallel=False)
+        fanned = ShardedPriorArtIndex(self.tmp.name, keep_warm=False)
+        expected = local.search_documents("toaster OR heating OR laser", top_k=5)
+        self.assertEqual(len(expected), 5)
+        self.assertEqual(fanned.search_documents("toaster OR heating OR laser", top_k=5), expected)
+
+    def test_merge_keeps_global_order(self):
+        merged = merge_shard_results([
+            [(3.0, {"id": "a", "date": "2010"}), (1.0, {"id": "b", "date": "2010"})],
+            [(2.0, {"id": "c", "date": "2011"}), (1.0, {"id": "d", "date": "2012"})]
+        ], 3)
+        self.assertEqual([doc["id"] for _, doc in merged], ["a", "c", "d"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import io
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools import syntax_check
+from tools.syntax_check import check_antecedent_basis, recheck_antecedent_basis
+
+CLAIMS = """1. A toaster comprising a laser and a lever.
+
+2. The toaster of Claim 1, wherein the laser heats a tray.
+
+3. The toaster of Claim 2, wherein the tray is removable.
+
+4. A method comprising moving the lever and emptying the tray."""
+
+
+def check(text):
+    with redirect_stdout(io.StringIO()):
+        return check_antecedent_basis(text)
+
+
+class TestAntecedentBasis(unittest.TestCase):
+    def test_terms_come_from_the_dependency_chain(self):
+        result = check(CLAIMS)
+        # Claim 4 is independent: claims 1-3 do not introduce its terms
+        self.assertEqual(result["errors"], [
+            "Error: Lacks Antecedent Basis - 'the lever'",
+            "Error: Lacks Antecedent Basis - 'the tray'"
+        ])
+        self.assertEqual(result["claims"][3]["errors"], [])
+        self.assertEqual(result["claims"][2]["introduced"], {"tray"})
+
+    def test_recheck_scans_only_edited_claims_and_descendants(self):
+        previous = check(CLAIMS)
+        edited = CLAIMS.replace("heats a tray", "heats the bread")
+        with patch.object(syntax_check, "_check_claim", wraps=syntax_check._check_claim) as checked:
+            result = recheck_antecedent_basis(edited, previous, [2])
+        self.assertEqual(sorted(call.args[0].number for call in checked.call_args_list), [2, 3])
+        self.assertEqual(result, check(edited))
+        self.assertIn("Error: Lacks Antecedent Basis - 'the bread'", result["errors"])
+
+    def test_recheck_after_deleting_a_parent(self):
+        previous = check(CLAIMS)
+        edited = CLAIMS.replace("2. The toaster of Claim 1, wherein the laser heats a tray.\n\n", "")
+        result = recheck_antecedent_basis(edited, previous, [])
+        self.assertEqual(result, check(edited))
+
+    def test_dependency_cycle_is_reported(self):
+        text = CLAIMS.replace("2. The toaster of Claim 1", "2. The toaster of Claim 3")
+        result = check(text)
+        self.assertIn("Error: Circular Dependency - Claim 2 depends on itself", result["errors"])
+        self.assertIn("Error: Circular Dependency - Claim 3 depends on itself", result["errors"])
+        # Claim 3 still finds 'the tray' introduced by claim 2
+        self.assertNotIn("Error: Lacks Antecedent Basis - 'the tray'", result["claims"][3]["errors"])
+        edited = text.replace("is removable", "is a drawer")
+        self.assertEqual(recheck_antecedent_basis(edited, result, [3]), check(edited))
+
+
+if __name__ == "__main__":
+    unittest.main()
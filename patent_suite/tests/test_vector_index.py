@@ -0,0 +1,64 @@
+import unittest
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# Ensure the parent directory is in path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.embeddings import HashingEmbedder
+from tools.vector_index import build_vector_index, VectorIndex
+from tools.prior_art_index import SAMPLE_CORPUS
+
+class TestVectorIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_embeddings_are_unit_vectors(self):
+        vectors = HashingEmbedder(dim=64).embed(["laser toaster", "", "laser toaster laser"])
+        self.assertEqual(vectors.shape, (3, 64))
+        self.assertAlmostEqual(float(np.linalg.norm(vectors[0])), 1.0, places=5)
+        self.assertFalse(vectors[1].any())
+        self.assertGreater(float(vectors[0] @ vectors[2]), 0.9)
+
+    def test_sample_corpus_search_respects_cutoff(self):
+        build_vector_index(SAMPLE_CORPUS, self.tmp.name)
+        index = VectorIndex(self.tmp.name)
+        hits = index.search_documents("Laser Rastering for Culinary Applications", top_k=3)
+        self.assertEqual(hits[0][1]["id"], "US-6666666-B2")
+        dated = index.search_documents("toaster", top_k=20, date_cutoff="2016-01-01")
+        self.assertTrue(dated)
+        self.assertTrue(all(doc["date"] < "2016-01-01" for _, doc in dated))
+        index.close()
+
+    def test_ivf_batch_search_finds_exact_matches(self):
+        rng = np.random.default_rng(7)
+        words = [f"w{i}" for i in range(2000)]
+        docs = [{"id": str(i), "title": " ".join(rng.choice(words, 10)), "date": "2012-01-01"} for i in range(5000)]
+        meta = build_vector_index(docs, self.tmp.name)
+        self.assertGreater(meta["nlist"], 1)
+        index = VectorIndex(self.tmp.name)
+        results = index.search_documents_batch([doc["title"] for doc in docs[:50]], top_k=3)
+        found = sum(hits[0][1]["id"] == str(i) for i, hits in enumerate(results))
+        self.assertGreaterEqual(found, 48)
+        index.close()
+
+    def test_build_streams_a_generator_and_reads_are_thread_safe(self):
+        docs = ({"id": str(i), "title": f"toaster variant {i}", "date": "2012-01-01"} for i in range(2000))
+        meta = build_vector_index(docs, self.tmp.name)
+        self.assertEqual(meta["count"], 2000)
+        index = VectorIndex(self.tmp.name)
+        expected = [index.get_document(row)["id"] for row in range(index.count)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for _ in range(3):
+                self.assertEqual(list(pool.map(lambda row: index.get_document(row)["id"], range(index.count))), expected)
+        self.assertEqual(sorted(expected, key=int), [str(i) for i in range(2000)])
+        index.close()
+
+if __name__ == "__main__":
+    unittest.main()
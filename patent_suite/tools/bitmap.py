@@ -0,0 +1,124 @@
+from array import array
+
+# Roaring-style compressed bitmap over 32-bit doc ids. Ids are split into a
+# 16-bit container key (high bits) and a 16-bit value (low bits). Each
+# container is stored as a sorted uint16 array while it has at most
+# ARRAY_MAX_SIZE values (2 bytes per id), and as a 65536-bit bitset above that
+# (8 KiB, i.e. under 2 bytes per id), so both sparse and dense classes stay small.
+ARRAY_MAX_SIZE = 4096
+BITSET_BYTES = 8192
+
+ARRAY_CONTAINER = 0
+BITSET_CONTAINER = 1
+
+
+def _bitset_values(bits):
+    """Sorted low values set in a bitset container (a Python int used as 65536 bits)."""
+    values = []
+    data = bits.to_bytes(BITSET_BYTES, 'little')
+    for byte_index, byte in enumerate(data):
+        while byte:
+            low = byte & -byte
+            values.append(byte_index * 8 + low.bit_length() - 1)
+            byte ^= low
+    return values
+
+
+class DocBitmap:
+    """
+    Set of doc ids with fast union and ordered iteration. Containers map a
+    16-bit key to either an array('H') of low values or an int bitset.
+    """
+    __slots__ = ("containers",)
+
+    def __init__(self, containers=None):
+        self.containers = containers or {}
+
+    @classmethod
+    def from_sorted(cls, doc_ids):
+        groups = {}
+        for doc_id in doc_ids:
+            groups.setdefault(doc_id >> 16, array('H')).append(doc_id & 0xFFFF)
+        return cls({key: cls._pack(values) for key, values in groups.items()})
+
+    @classmethod
+    def _pack(cls, values):
+        return values if len(values) <= ARRAY_MAX_SIZE else cls._pack_bits(values)
+
+    @staticmethod
+    def _pack_bits(values):
+        bits = 0
+        for value in values:
+            bits |= 1 << value
+        return bits
+
+    @staticmethod
+    def _values(container):
+        return container if isinstance(container, array) else _bitset_values(container)
+
+    def __len__(self):
+        return sum(len(c) if isinstance(c, array) else bin(c).count("1") for c in self.containers.values())
+
+    def __or__(self, other):
+        containers = dict(self.containers)
+        for key, theirs in other.containers.items():
+            mine = containers.get(key)
+            if mine is None:
+                containers[key] = theirs
+            elif isinstance(mine, array) and isinstance(theirs, array):
+                containers[key] = self._pack(array('H', sorted(set(mine).union(theirs))))
+            else:
+                as_bits = [c if isinstance(c, int) else self._pack_bits(c) for c in (mine, theirs)]
+                containers[key] = as_bits[0] | as_bits[1]
+        return DocBitmap(containers)
+
+    @classmethod
+    def union_all(cls, bitmaps):
+        result = cls()
+        for bitmap in bitmaps:
+            result = result | bitmap
+        return result
+
+    def to_array(self, limit=None):
+        """Sorted doc ids (only those < limit, if given) as array('I')."""
+        out = array('I')
+        for key in sorted(self.containers):
+            base = key << 16
+            if limit is not None and base >= limit:
+                break
+            for value in self._values(self.containers[key]):
+                doc_id = base + value
+                if limit is not None and doc_id >= limit:
+                    break
+                out.append(doc_id)
+        return out
+
+    def to_bytes(self):
+        """Serialises as: container count, then per container (key, kind, size) and its payload."""
+        header = array('I', [len(self.containers)])
+        body = bytearray()
+        for key in sorted(self.containers):
+            container = self.containers[key]
+            if isinstance(container, array):
+                header.extend((key, ARRAY_CONTAINER, len(container)))
+                body += container.tobytes()
+            else:
+                header.extend((key, BITSET_CONTAINER, bin(container).count("1")))
+                body += container.to_bytes(BITSET_BYTES, 'little')
+        return header.tobytes() + bytes(body)
+
+    @classmethod
+    def from_bytes(cls, data):
+        count = array('I', data[:4])[0]
+        header = array('I', data[4:4 + 12 * count])
+        pos = 4 + 12 * count
+        containers = {}
+        for i in range(count):
+            key, kind, size = header[3 * i:3 * i + 3]
+            if kind == ARRAY_CONTAINER:
+                containers[key] = array('H', data[pos:pos + 2 * size])
+                pos += 2 * size
+            else:
+                containers[key] = int.from_bytes(data[pos:pos + BITSET_BYTES], 'little')
+                pos += BITSET_BYTES
+        return cls(containers)
@@ -0,0 +1,439 @@
+import re
+from array import array
+from bisect import bisect_left
+from patent_suite.tools.text_analysis import tokenize
+
+# Boolean search syntax used by the SearcherAgent, e.g.
+#   (laser AND toasting) OR (laser AND precision AND heating)
+#   "optical browning sensor" AND laser NEAR/5 raster
+# Operators are case-insensitive; juxtaposed terms use the parser's default operator.
+# Phrases and NEAR/n are matched on token positions (stopwords are not counted).
+QUERY_TOKEN_RE = re.compile(r'"[^"]*"?|\(|\)|[^\s()"]+')
+NEAR_RE = re.compile(r"NEAR/(\d+)$", re.IGNORECASE)
+OPERATORS = {"AND", "OR", "NOT"}
+
+
+class QueryNode:
+    """Base class for parsed boolean query nodes."""
+    __slots__ = ()
+
+    def positive_terms(self):
+        """Terms that contribute to ranking (everything not under a NOT)."""
+        return []
+
+    def estimated_cost(self, index):
+        """Upper bound on the number of postings this node can produce."""
+        raise NotImplementedError
+
+
+class Term(QueryNode):
+    __slots__ = ("term",)
+
+    def __init__(self, term):
+        self.term = term
+
+    def positive_terms(self):
+        return [self.term]
+
+    def estimated_cost(self, index):
+        return index.doc_freq(self.term)
+
+    def __repr__(self):
+        return f"Term({self.term!r})"
+
+
+class And(QueryNode):
+    __slots__ = ("children",)
+
+    def __init__(self, children):
+        self.children = children
+
+    def positive_terms(self):
+        return [t for child in self.children for t in child.positive_terms()]
+
+    def estimated_cost(self, index):
+        positives = [c.estimated_cost(index) for c in self.children if not isinstance(c, Not)]
+        return min(positives) if positives else index.doc_count
+
+    def __repr__(self):
+        return f"And({self.children!r})"
+
+
+class Or(QueryNode):
+    __slots__ = ("children",)
+
+    def __init__(self, children):
+        self.children = children
+
+    def positive_terms(self):
+        return [t for child in self.children for t in child.positive_terms()]
+
+    def estimated_cost(self, index):
+        return sum(c.estimated_cost(index) for c in self.children)
+
+    def __repr__(self):
+        return f"Or({self.children!r})"
+
+
+class Phrase(QueryNode):
+    """Consecutive terms, e.g. "optical browning sensor"."""
+    __slots__ = ("terms",)
+
+    def __init__(self, terms):
+        self.terms = terms
+
+    def positive_terms(self):
+        return list(self.terms)
+
+    def estimated_cost(self, index):
+        return min(index.doc_freq(t) for t in self.terms)
+
+    def __repr__(self):
+        return f"Phrase({self.terms!r})"
+
+
+class Near(QueryNode):
+    """Two words or phrases at most distance positions apart, in either order."""
+    __slots__ = ("left", "right", "distance")
+
+    def __init__(self, left, right, distance):
+        self.left = left
+        self.right = right
+        self.distance = distance
+
+    def positive_terms(self):
+        return self.left.positive_terms() + self.right.positive_terms()
+
+    def estimated_cost(self, index):
+        return min(self.left.estimated_cost(index), self.right.estimated_cost(index))
+
+    def __repr__(self):
+        return f"Near({self.left!r}, {self.right!r}, {self.distance})"
+
+
+class Not(QueryNode):
+    __slots__ = ("child",)
+
+    def __init__(self, child):
+        self.child = child
+
+    def estimated_cost(self, index):
+        return index.doc_count
+
+    def __repr__(self):
+        return f"Not({self.child!r})"
+
+
+class QueryParser:
+    """
+    Recursive-descent parser for boolean prior-art queries.
+
+        query   := or_expr
+        or_expr := and_expr (OR and_expr)*
+        and_expr:= not_expr ([AND] not_expr)*     (juxtaposition uses default_operator)
+        not_expr:= NOT not_expr | near_expr
+        near_expr:= primary (NEAR/n primary)*    (operands: words or phrases)
+        primary := '(' or_expr ')' | '"' words '"' | word   (a hyphenated word is a phrase)
+    """
+    def __init__(self, default_operator="OR"):
+        if default_operator not in ("AND", "OR"):
+            raise ValueError("default_operator must be 'AND' or 'OR'")
+        self.default_operator = default_operator
+
+    def parse(self, query):
+        self.tokens = QUERY_TOKEN_RE.findall(query)
+        self.pos = 0
+        node = self._parse_or()
+        if self.pos < len(self.tokens):
+            raise ValueError(f"Unexpected '{self.tokens[self.pos]}' at position {self.pos} in query: {query}")
+        return _simplify(node)
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _peek_operator(self):
+        tok = self._peek()
+        if tok and NEAR_RE.match(tok):
+            return "NEAR"
+        return tok.upper() if tok and tok.upper() in OPERATORS else None
+
+    def _parse_or(self):
+        children = [self._parse_and()]
+        while True:
+            if self._peek_operator() == "OR":
+                self.pos += 1
+                children.append(self._parse_and())
+            elif self.default_operator == "OR" and self._starts_operand():
+                children.append(self._parse_and())
+            else:
+                break
+        return Or(children)
+
+    def _parse_and(self):
+        children = [self._parse_not()]
+        while True:
+            if self._peek_operator() == "AND":
+                self.pos += 1
+                children.append(self._parse_not())
+            elif self._peek_operator() == "NOT" or (self.default_operator == "AND" and self._starts_operand()):
+                children.append(self._parse_not())
+            else:
+                break
+        return And(children)
+
+    def _starts_operand(self):
+        tok = self._peek()
+        return tok is not None and tok != ")" and self._peek_operator() is None
+
+    def _parse_not(self):
+        if self._peek_operator() == "NOT":
+            self.pos += 1
+            return Not(self._parse_not())
+        return self._parse_near()
+
+    def _parse_near(self):
+        node = self._parse_primary()
+        while self._peek_operator() == "NEAR":
+            distance = int(NEAR_RE.match(self._peek()).group(1))
+            self.pos += 1
+            right = self._parse_primary()
+            if node is None or right is None:
+                # A stopword operand matches nothing positional; keep the other side
+                node = node or right
+                continue
+            for operand in (node, right):
+                if not isinstance(operand, (Term, Phrase)):
+                    raise ValueError("NEAR operands must be words or quoted phrases")
+            node = Near(node, right, max(distance, 1))
+        return node
+
+    def _parse_primary(self):
+        tok = self._peek()
+        if tok is None:
+            raise ValueError("Unexpected end of query")
+        if tok == "(":
+            self.pos += 1
+            node = self._parse_or()
+            if self._peek() != ")":
+                raise ValueError("Unbalanced parentheses in query")
+            self.pos += 1
+            return node
+        if tok == ")" or self._peek_operator():
+            raise ValueError(f"Unexpected '{tok}' in query")
+        self.pos += 1
+        if tok.startswith('"'):
+            if len(tok) < 2 or not tok.endswith('"'):
+                raise ValueError("Unbalanced quotes in query")
+            terms = tokenize(tok[1:-1])
+            if not terms:
+                return None
+            return Term(terms[0]) if len(terms) == 1 else Phrase(terms)
+        # A word such as "micro-controller" analyzes to several adjacent terms: match it as a phrase
+        terms = tokenize(tok)
+        if not terms:
+            return None
+        return Term(terms[0]) if len(terms) == 1 else Phrase(terms)
+
+
+def _simplify(node):
+    """Drops empty operands (stopwords), flattens nested AND/OR and unwraps singletons."""
+    if node is None or isinstance(node, (Term, Phrase, Near)):
+        return node
+    if isinstance(node, Not):
+        child = _simplify(node.child)
+        return Not(child) if child is not None else None
+
+    kind = type(node)
+    children = []
+    for child in node.children:
+        child = _simplify(child)
+        if child is None:
+            continue
+        if type(child) is kind:
+            children.extend(child.children)
+        else:
+            children.append(child)
+    if not children:
+        return None
+    if len(children) == 1:
+        return children[0]
+    return kind(children)
+
+
+def parse_query(query, default_operator="OR"):
+    """
+    Parses a boolean query string into a QueryNode tree (None if it has no searchable terms).
+    """
+    return QueryParser(default_operator).parse(query)
+
+
+def parse_query_or_terms(query, default_operator="OR"):
+    """
+    Like parse_query(), but a query that is not valid boolean syntax (a stray
+    or trailing operator, unbalanced quotes or parentheses) is matched as a
+    plain OR of its terms instead of raising.
+    """
+    try:
+        return parse_query(query, default_operator)
+    except ValueError as e:
+        print(f"Query parse failed ({e}); matching any of its terms instead")
+        return _simplify(Or([Term(t) for t in tokenize(query)]))
+
+
+def is_term_disjunction(node):
+    """True for a bare term or an OR of bare terms (plain keyword queries)."""
+    return isinstance(node, Term) or (isinstance(node, Or) and all(isinstance(c, Term) for c in node.children))
+
+
+# --- Posting-list algebra over sorted doc id arrays ---
+
+def gallop(postings, target, lo=0):
+    """
+    Returns the smallest index i >= lo with postings[i] >= target (len(postings) if none).
+    Probes lo+1, lo+2, lo+4, ... before a binary search, so skipping ahead costs
+    O(log distance) instead of O(distance).
+    """
+    n = len(postings)
+    if lo >= n or postings[lo] >= target:
+        return lo
+    prev, step = lo, 1
+    hi = lo + 1
+    while hi < n and postings[hi] < target:
+        prev = hi
+        step <<= 1
+        hi = lo + step
+    return bisect_left(postings, target, prev + 1, min(hi, n))
+
+
+def intersect(a, b):
+    """Intersection of two sorted doc id arrays, walking the shorter and galloping in the longer."""
+    if len(a) > len(b):
+        a, b = b, a
+    out = array('I')
+    j, n = 0, len(b)
+    for doc_id in a:
+        j = gallop(b, doc_id, j)
+        if j == n:
+            break
+        if b[j] == doc_id:
+            out.append(doc_id)
+    return out
+
+
+def difference(a, b):
+    """Doc ids in a that are not in b."""
+    if not b:
+        return a
+    out = array('I')
+    j, n = 0, len(b)
+    for doc_id in a:
+        j = gallop(b, doc_id, j)
+        if j == n or b[j] != doc_id:
+            out.append(doc_id)
+    return out
+
+
+def union(lists):
+    merged = set()
+    for postings in lists:
+        merged.update(postings)
+    return array('I', sorted(merged))
+
+
+def phrase_starts(position_lists):
+    """Start positions at which the i-th list contains start + i for every i."""
+    starts = set(position_lists[0])
+    for offset, positions in enumerate(position_lists[1:], start=1):
+        starts.intersection_update(p - offset for p in positions)
+    return sorted(starts)
+
+
+def within_distance(left, right, distance):
+    """
+    True if some (start, end) span in left and some span in right are at
+    most distance positions apart. Both lists are sorted by start and walked
+    once, like a posting-list merge.
+    """
+    i = j = 0
+    while i < len(left) and j < len(right):
+        a, b = left[i], right[j]
+        gap = b[0] - a[1] if a[0] <= b[0] else a[0] - b[1]
+        if gap <= distance:
+            return True
+        if a[0] <= b[0]:
+            i += 1
+        else:
+            j += 1
+    return False
+
+
+def _spans(node, index, doc_ids):
+    """{doc_id: [(start, end)]} occurrences of a Term or Phrase in the given documents."""
+    if isinstance(node, Term):
+        return {d: [(p, p) for p in ps] for d, ps in index.positions(node.term, doc_ids).items()}
+    per_term = [index.positions(t, doc_ids) for t in node.terms]
+    spans = {}
+    length = len(node.terms) - 1
+    for doc_id in doc_ids:
+        lists = [positions.get(doc_id) for positions in per_term]
+        if all(lists):
+            starts = phrase_starts(lists)
+            if starts:
+                spans[doc_id] = [(p, p + length) for p in starts]
+    return spans
+
+
+def execute_query(node, index, limit=None, candidates=None):
+    """
+    Evaluates a query tree to a sorted array of matching doc ids (< limit, if given).
+    AND operands are evaluated cheapest (rarest) first, so the running result
+    never grows beyond the smallest posting list and later operands are only
+    probed by galloping; NOT operands are subtracted last.
+    If candidates (a sorted doc id array, e.g. a CPC filter) is given, the
+    result is restricted to it and term posting lists are only decoded in the
+    blocks that can overlap it.
+    """
+    if limit is None:
+        limit = index.doc_count
+    if node is None:
+        return array('I')
+    universe = array('I', range(limit)) if candidates is None else candidates
+    if isinstance(node, Term):
+        if candidates is None:
+            return index.postings(node.term, limit)[0]
+        return intersect(candidates, index.postings(node.term, limit, candidates)[0])
+    if isinstance(node, Phrase):
+        docs = execute_query(And([Term(t) for t in node.terms]), index, limit, candidates)
+        return array('I', sorted(_spans(node, index, docs))) if docs else docs
+    if isinstance(node, Near):
+        docs = execute_query(And([node.left, node.right]), index, limit, candidates)
+        if not docs:
+            return docs
+        left, right = _spans(node.left, index, docs), _spans(node.right, index, docs)
+        return array('I', (d for d in docs if d in left and d in right and within_distance(left[d], right[d], node.distance)))
+    if isinstance(node, Or):
+        return union(execute_query(c, index, limit, candidates) for c in node.children)
+    if isinstance(node, Not):
+        return difference(universe, execute_query(node.child, index, limit, candidates))
+
+    positives = [c for c in node.children if not isinstance(c, Not)]
+    negatives = [c.child for c in node.children if isinstance(c, Not)]
+    positives.sort(key=lambda c: c.estimated_cost(index))
+
+    if positives:
+        result = execute_query(positives[0], index, limit, candidates)
+    else:
+        result = universe
+    for child in positives[1:]:
+        if not result:
+            return result
+        if isinstance(child, Term):
+            # Only decode the posting blocks that can contain a surviving doc id
+            result = intersect(result, index.postings(child.term, limit, result)[0])
+        else:
+            result = intersect(result, execute_query(child, index, limit, result))
+    for child in negatives:
+        if not result:
+            return result
+        result = difference(result, execute_query(child, index, limit, result))
+    return result
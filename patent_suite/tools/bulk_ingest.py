@@ -0,0 +1,250 @@
+import argparse
+import gzip
+import html.entities
+import io
+import json
+import os
+import re
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from patent_suite.tools.prior_art_index import DEFAULT_INDEX_DIR, document_text
+from patent_suite.tools.segments import SegmentWriter
+from patent_suite.tools.text_analysis import tokenize
+
+# USPTO full-text bulk files concatenate one XML document per grant/application,
+# each starting with its own <?xml ...?> declaration.
+XML_DECLARATION = "<?xml"
+RECORD_TAGS = ("us-patent-grant", "us-patent-application")
+ENTITY_RE = re.compile(r"&([A-Za-z][A-Za-z0-9]*);")
+XML_ENTITIES = {"amp", "lt", "gt", "quot", "apos"}
+
+
+def _replace_entity(match):
+    # USPTO XML uses HTML entities declared in an external DTD that expat does not load
+    name = match.group(1)
+    if name in XML_ENTITIES:
+        return match.group(0)
+    codepoint = html.entities.name2codepoint.get(name)
+    return f"&#{codepoint};" if codepoint else " "
+
+
+def open_text(path):
+    """
+    Opens a bulk file for line-by-line reading: plain, .gz, or the first member
+    of a .zip archive (weekly USPTO files are distributed zipped).
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    if path.endswith(".zip"):
+        archive = zipfile.ZipFile(path)
+        member = next(n for n in archive.namelist() if not n.endswith('/'))
+        return io.TextIOWrapper(archive.open(member), encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+def _record_format(path):
+    name = path[:-3] if path.endswith(".gz") else path
+    if name.endswith(".zip"):
+        with zipfile.ZipFile(path) as archive:
+            name = next(n for n in archive.namelist() if not n.endswith('/'))
+    return "json" if name.endswith((".json", ".jsonl", ".ndjson")) else "xml"
+
+
+def iter_raw_records(path):
+    """
+    Yields (format, raw_text) per document without loading the file: one line
+    per record for JSON lines, one <?xml ...?> chunk per record for USPTO XML.
+    Memory use is bounded by the largest single document.
+    """
+    fmt = _record_format(path)
+    with open_text(path) as f:
+        if fmt == "json":
+            for line in f:
+                if line.strip():
+                    yield fmt, line
+            return
+        chunk = []
+        for line in f:
+            if line.startswith(XML_DECLARATION) and chunk:
+                yield fmt, "".join(chunk)
+                chunk = []
+            chunk.append(line)
+        if chunk:
+            yield fmt, "".join(chunk)
+
+
+def _text(elem):
+    return " ".join(" ".join(elem.itertext()).split()) if elem is not None else ""
+
+
+def _format_date(value):
+    value = (value or "").strip()
+    return f"{value[:4]}-{value[4:6]}-{value[6:8]}" if len(value) == 8 and value.isdigit() else value
+
+
+def _cpc_codes(biblio):
+    codes = []
+    for cls in biblio.iter("classification-cpc"):
+        parts = {child.tag: (child.text or "").strip() for child in cls}
+        if parts.get("section") and parts.get("class") and parts.get("subclass"):
+            code = f"{parts['section']}{parts['class']}{parts['subclass']}"
+            if parts.get("main-group"):
+                code += f" {parts['main-group']}/{parts.get('subgroup') or '00'}"
+            if code not in codes:
+                codes.append(code)
+    return codes
+
+
+def parse_uspto_xml(raw):
+    """
+    Extracts id, title, abstract, publication date and CPC codes from one
+    us-patent-grant / us-patent-application document. Returns None for
+    records of other kinds (e.g. sequence listings) or malformed XML.
+    """
+    raw = ENTITY_RE.sub(_replace_entity, raw)
+    try:
+        root = ET.fromstring(raw)
+    except ET.ParseError:
+        return None
+    if root.tag not in RECORD_TAGS:
+        return None
+
+    biblio = root.find("us-bibliographic-data-grant")
+    if biblio is None:
+        biblio = root.find("us-bibliographic-data-application")
+    if biblio is None:
+        return None
+    doc_id = biblio.find("publication-reference/document-id")
+    if doc_id is None:
+        return None
+    country = (doc_id.findtext("country") or "US").strip()
+    number = (doc_id.findtext("doc-number") or "").strip()
+    kind = (doc_id.findtext("kind") or "").strip()
+    return {
+        "id": "-".join(p for p in (country, number, kind) if p),
+        "title": _text(biblio.find("invention-title")),
+        "abstract": _text(root.find("abstract")),
+        "date": _format_date(doc_id.findtext("date")),
+        "cpc": _cpc_codes(biblio)
+    }
+
+
+# JSON dumps (e.g. PatentsView / Google BigQuery exports) use varying field names
+JSON_FIELD_ALIASES = {
+    "id": ("id", "publication_number", "patent_number", "doc_number"),
+    "title": ("title", "invention_title", "patent_title"),
+    "abstract": ("abstract", "abstract_text", "patent_abstract"),
+    "date": ("date", "publication_date", "patent_date", "grant_date"),
+    "cpc": ("cpc", "cpc_codes", "cpc_subgroups")
+}
+
+def parse_json_record(raw):
+    try:
+        record = json.loads(raw)
+    except ValueError:
+        return None
+    doc = {}
+    for field, aliases in JSON_FIELD_ALIASES.items():
+        for alias in aliases:
+            if record.get(alias) not in (None, ""):
+                doc[field] = record[alias]
+                break
+    if not doc.get("id"):
+        return None
+    doc["title"] = " ".join(str(doc.get("title", "")).split())
+    doc["abstract"] = " ".join(str(doc.get("abstract", "")).split())
+    doc["date"] = _format_date(str(doc.get("date", "")).replace("-", "")) if doc.get("date") else ""
+    return doc
+
+
+def normalize_batch(records):
+    """
+    Worker-side step: parse and analyze a batch of raw records.
+    Returns [(stored_fields, terms)] so the writer only has to append postings.
+    """
+    out = []
+    for fmt, raw in records:
+        doc = parse_json_record(raw) if fmt == "json" else parse_uspto_xml(raw)
+        if doc is not None:
+            out.append((doc, tokenize(document_text(doc))))
+    return out
+
+
+def _batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def bounded_map(executor, fn, iterable, max_in_flight):
+    """
+    Ordered executor.map that keeps at most max_in_flight tasks queued, so a
+    multi-gigabyte input is never read ahead of the workers.
+    """
+    pending = deque()
+    for item in iterable:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def ingest_files(paths, index_dir, workers=None, batch_size=200, segment_size=50000, report_every=10000):
+    """
+    Streams bulk files into index segments. Parsing and text normalization run
+    in a process pool; the main process only splits records and appends
+    postings. Returns a summary with the documents-per-second rate.
+    """
+    workers = workers or os.cpu_count() or 1
+    writer = SegmentWriter(index_dir, segment_size=segment_size)
+    records = (record for path in paths for record in iter_raw_records(path))
+
+    started = time.time()
+    count = 0
+    next_report = report_every
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for batch in bounded_map(pool, normalize_batch, _batched(records, batch_size), workers * 2):
+            for doc, terms in batch:
+                writer.add_document(doc, terms)
+            count += len(batch)
+            if count >= next_report:
+                elapsed = time.time() - started
+                print(f"BulkIngest: {count} documents ({count / elapsed:,.0f} docs/s)")
+                next_report += report_every
+    manifest = writer.commit()
+
+    elapsed = max(time.time() - started, 1e-9)
+    summary = {
+        "documents": count,
+        "seconds": round(elapsed, 2),
+        "docs_per_second": round(count / elapsed, 1),
+        "segments": len(manifest["segments"]),
+        "index_dir": index_dir
+    }
+    print(f"BulkIngest: Ingested {count} documents in {elapsed:.1f}s ({summary['docs_per_second']:,.0f} docs/s) into {index_dir}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream USPTO bulk XML / JSON-lines files into the prior-art index.")
+    parser.add_argument("inputs", nargs="+", help="Bulk files (.xml, .jsonl, optionally .gz or .zip)")
+    parser.add_argument("--index", default=os.getenv("OPENPATENT_PRIOR_ART_INDEX", DEFAULT_INDEX_DIR), help="Index directory")
+    parser.add_argument("--workers", type=int, default=None, help="Normalization processes (default: all cores)")
+    parser.add_argument("--batch-size", type=int, default=200, help="Records per worker task")
+    parser.add_argument("--segment-size", type=int, default=50000, help="Documents per index segment")
+    args = parser.parse_args(argv)
+
+    ingest_files(args.inputs, args.index, workers=args.workers, batch_size=args.batch_size, segment_size=args.segment_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,16 @@
 import re
 import json
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import numpy as np
+from patent_suite.tools.claim_parser import LEADING_NUMBER_RE, split_elements
+
+WORD_RE = re.compile(r'\b\w+\b')
+
+# Similarity at which a prior-art element counts as disclosing a claim element
+MATCH_THRESHOLD = 0.6
+# map_claims_batch switches to a process pool above this many reference elements
+PARALLEL_MIN_ELEMENTS = 20000
 
 def split_into_elements(text):
     """
@@ -7,24 +18,20 @@ def split_into_elements(text):
     Heuristic: split by commas, semicolons, and certain keywords like 'comprising', 'including'.
     """
     # Remove numbering if present (e.g., "1. A method...")
-    text = re.sub(r'^\d+\.\s*', '', text)
-    
-    # Split by major delimiters
-    # Atomic elements are often separated by ", ", "; ", or phrases like "comprising "
-    delimiters = r'[,;]|\bcomprising\b|\bincluding\b|\balso\s+comprising\b|\bfurther\s+comprising\b'
-    raw_elements = re.split(delimiters, text, flags=re.IGNORECASE)
-    
-    # Clean up whitespace and remove empty strings
-    elements = [e.strip() for e in raw_elements if e.strip()]
-    return elements
+    text = LEADING_NUMBER_RE.sub('', text)
+    # Same limitation-level split the claim parser uses for whole claim sets
+    return [element.text for element in split_elements(text)]
+
+def element_words(element):
+    return set(WORD_RE.findall(element.lower()))
 
 def calculate_similarity(element1, element2):
     """
     Mock cosine similarity using word overlap.
     In a real app, this would use sentence-transformers or embedding models.
     """
-    words1 = set(re.findall(r'\b\w+\b', element1.lower()))
-    words2 = set(re.findall(r'\b\w+\b', element2.lower()))
+    words1 = element_words(element1)
+    words2 = element_words(element2)
     
     if not words1 or not words2:
         return 0.0
@@ -34,6 +41,31 @@ def calculate_similarity(element1, element2):
     similarity = len(intersection) / max(len(words1), len(words2))
     return similarity
 
+def similarity_matrix(user_elements, prior_elements):
+    """
+    calculate_similarity for every (user element, prior-art element) pair at
+    once. Each element is tokenized once and encoded as a 0/1 row over the
+    words the two sides share (no other word can add to an intersection), so
+    one matrix product gives every intersection size. Returns an
+    len(user_elements) x len(prior_elements) float64 array.
+    """
+    user_words = [element_words(e) for e in user_elements]
+    prior_words = [element_words(e) for e in prior_elements]
+    shared = set().union(*user_words) & set().union(*prior_words)
+    vocab = {word: i for i, word in enumerate(shared)}
+
+    def encode(word_sets):
+        rows = np.zeros((len(word_sets), len(vocab)), dtype=np.float32)
+        for r, words in enumerate(word_sets):
+            rows[r, [vocab[w] for w in words if w in vocab]] = 1.0
+        return rows
+
+    # Exact integer counts: float32 represents them without rounding
+    intersections = encode(user_words) @ encode(prior_words).T
+    sizes = np.maximum.outer(np.array([len(w) for w in user_words], dtype=np.float64),
+                             np.array([len(w) for w in prior_words], dtype=np.float64))
+    return np.divide(intersections, sizes, out=np.zeros(sizes.shape), where=sizes > 0)
+
 def map_claims(user_claim_text, prior_art_text):
     """
     Maps atomic elements of a user claim to a prior art reference.
@@ -44,17 +76,18 @@ def map_claims(user_claim_text, prior_art_text):
     prior_elements = split_into_elements(prior_art_text)
     
     mapping = {}
-    threshold = 0.6  # Similarity threshold
+    threshold = MATCH_THRESHOLD
+    scores = similarity_matrix(user_elements, prior_elements)
     
-    for u_el in user_elements:
+    for row, u_el in enumerate(user_elements):
         best_match = None
         best_score = 0.0
-        
-        for p_el in prior_elements:
-            score = calculate_similarity(u_el, p_el)
-            if score > best_score:
-                best_score = score
-                best_match = p_el
+        if prior_elements:
+            # argmax keeps the first of equal scores, as the strict ">" scan did
+            col = int(scores[row].argmax())
+            if scores[row, col] > 0:
+                best_score = float(scores[row, col])
+                best_match = prior_elements[col]
                 
         if best_score >= threshold:
             mapping[u_el] = {
@@ -71,6 +104,107 @@ def map_claims(user_claim_text, prior_art_text):
             
     return mapping
 
+@lru_cache(maxsize=8192)
+def _analyzed_elements(text):
+    """(elements, word sets) of a claim or reference, computed once per distinct text."""
+    elements = tuple(split_into_elements(text))
+    return elements, tuple(frozenset(element_words(e)) for e in elements)
+
+def _reference_text(reference):
+    if isinstance(reference, dict):
+        return reference.get("text") or f"{reference.get('title', '')}. {reference.get('abstract', '')}"
+    return reference
+
+def _best_matches(claim_rows, claim_sizes, vocab, reference_words):
+    """
+    Best score and element index per (claim element, reference) for a chunk of
+    references. All their elements are stacked into one matrix, so the chunk
+    costs a single product; per-reference maxima come from reduceat.
+    """
+    sizes, columns, starts = [], [], []
+    for words in reference_words:
+        starts.append(len(sizes))
+        for element in words:
+            sizes.append(len(element))
+            columns.append([vocab[w] for w in element if w in vocab])
+    scores = np.zeros((claim_rows.shape[0], len(reference_words)), dtype=np.float32)
+    best = np.full(scores.shape, -1, dtype=np.int32)
+    if not sizes or not claim_rows.shape[0]:
+        return scores, best
+
+    encoded = np.zeros((len(sizes), claim_rows.shape[1]), dtype=np.float32)
+    for r, cols in enumerate(columns):
+        encoded[r, cols] = 1.0
+    denom = np.maximum.outer(claim_sizes, np.array(sizes, dtype=np.float64))
+    matrix = np.divide(claim_rows @ encoded.T, denom, out=np.zeros(denom.shape), where=denom > 0)
+
+    nonempty = [i for i, words in enumerate(reference_words) if words]
+    offsets = [starts[i] for i in nonempty]
+    scores[:, nonempty] = np.maximum.reduceat(matrix, offsets, axis=1)
+    for i in nonempty:
+        best[:, i] = matrix[:, starts[i]:starts[i] + len(reference_words[i])].argmax(axis=1)
+    return scores, best
+
+def map_claims_batch(claims, references, threshold=MATCH_THRESHOLD, workers=None):
+    """
+    Claim chart of every claim against every reference (texts, or dicts with
+    "text" or "title" / "abstract" and an optional "id").
+
+    Each distinct claim and reference is split and tokenized once. The
+    vocabulary is the claim words, shared by every pair (other words cannot
+    add to an overlap). Each chunk of references is scored with one matrix
+    product. Chunks go to a process pool once the references hold more than
+    PARALLEL_MIN_ELEMENTS elements.
+
+    Returns:
+        elements            - [{"claim": claim index, "text": element}] (matrix rows)
+        references          - reference ids (or indexes), the matrix columns
+        reference_elements  - per reference, its element texts
+        similarity          - float32 [element x reference]: best overlap in that reference
+        best_element        - int32 [element x reference]: index into reference_elements of
+                              the best match, -1 when below threshold (novel vs. that reference)
+    """
+    print(f"ClaimMapper: Charting {len(claims)} claims against {len(references)} references...")
+    rows = []
+    for c, claim in enumerate(claims):
+        elements, words = _analyzed_elements(claim)
+        rows.extend((c, element, element_set) for element, element_set in zip(elements, words))
+    vocab = {}
+    for _, _, element_set in rows:
+        for word in element_set:
+            vocab.setdefault(word, len(vocab))
+    claim_rows = np.zeros((len(rows), len(vocab)), dtype=np.float32)
+    for r, (_, _, element_set) in enumerate(rows):
+        claim_rows[r, [vocab[w] for w in element_set]] = 1.0
+    claim_sizes = np.array([len(element_set) for _, _, element_set in rows], dtype=np.float64)
+
+    analyzed = [_analyzed_elements(_reference_text(ref)) for ref in references]
+    reference_words = [words for _, words in analyzed]
+    total = sum(len(words) for words in reference_words)
+
+    if total > PARALLEL_MIN_ELEMENTS and len(references) > 1:
+        chunks = max(2, min(workers or 4, len(references)))
+        bounds = [len(references) * i // chunks for i in range(chunks + 1)]
+        with ProcessPoolExecutor(max_workers=chunks) as pool:
+            parts = list(pool.map(
+                _best_matches,
+                [claim_rows] * chunks, [claim_sizes] * chunks, [vocab] * chunks,
+                [reference_words[bounds[i]:bounds[i + 1]] for i in range(chunks)]
+            ))
+        scores = np.concatenate([p[0] for p in parts], axis=1)
+        best = np.concatenate([p[1] for p in parts], axis=1)
+    else:
+        scores, best = _best_matches(claim_rows, claim_sizes, vocab, reference_words)
+    best[scores < threshold] = -1
+
+    return {
+        "elements": [{"claim": c, "text": element} for c, element, _ in rows],
+        "references": [ref.get("id", i) if isinstance(ref, dict) else i for i, ref in enumerate(references)],
+        "reference_elements": [list(elements) for elements, _ in analyzed],
+        "similarity": scores,
+        "best_element": best
+    }
+
 if __name__ == "__main__":
     # Test case
     user_claim = "1. A toaster comprising: a laser pattern radiator; and a bread carriage."
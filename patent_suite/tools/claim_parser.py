@@ -0,0 +1,191 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+# A claim starts with its number at the beginning of a line: "1. A toaster..."
+CLAIM_START_RE = re.compile(r'(?:^|\n)[ \t]*(\d+)\.\s+')
+LEADING_NUMBER_RE = re.compile(r'^\d+\.\s*')
+# Limitation-level delimiters (shared with claim_mapper.split_into_elements)
+ELEMENT_DELIMITER_RE = re.compile(
+    r'[,;]|\bcomprising\b|\bincluding\b|\balso\s+comprising\b|\bfurther\s+comprising\b', re.IGNORECASE
+)
+TRANSITION_RE = re.compile(
+    r'\b(consisting\s+essentially\s+of|consisting\s+of|comprising|including|having|wherein)\b', re.IGNORECASE
+)
+DEPENDENCY_RE = re.compile(r'\bclaim\s+(\d+)', re.IGNORECASE)
+WORD_RE = re.compile(r'\b\w+\b')
+
+# Parsed claim sets kept in memory (least recently used are dropped first)
+PARSE_CACHE_SIZE = 64
+# Analyzed claim bodies kept; an edit re-analyzes only the claims it touched
+CLAIM_CACHE_SIZE = 4096
+
+
+class ClaimElement:
+    """One limitation-level segment; start / end are offsets into the claim text."""
+    __slots__ = ("text", "start", "end")
+
+    def __init__(self, text, start, end):
+        self.text = text
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"ClaimElement({self.text!r}, {self.start}, {self.end})"
+
+
+class Claim:
+    """
+    One parsed claim. text excludes the number; start / end locate it in the
+    claim set. number is None for unnumbered text before the first claim
+    (headings, or a single claim pasted without its number). elements are
+    the limitation-level segments (the preamble is the first), tokens the
+    lowercased words with their start offsets in token_starts. Element and
+    token offsets are relative to text, so they survive edits elsewhere.
+    """
+    __slots__ = ("number", "depends_on", "preamble", "transition", "text", "start", "end",
+                 "elements", "tokens", "token_starts")
+
+    def __init__(self, number, depends_on, preamble, transition, text, start, end, elements, tokens, token_starts):
+        self.number = number
+        self.depends_on = depends_on
+        self.preamble = preamble
+        self.transition = transition
+        self.text = text
+        self.start = start
+        self.end = end
+        self.elements = elements
+        self.tokens = tokens
+        self.token_starts = token_starts
+
+    def to_dict(self):
+        return {
+            "number": self.number,
+            "depends_on": self.depends_on,
+            "preamble": self.preamble,
+            "transition": self.transition,
+            "text": self.text,
+            "start": self.start,
+            "end": self.end,
+            "elements": [{"text": e.text, "start": e.start, "end": e.end} for e in self.elements]
+        }
+
+    def __repr__(self):
+        return f"Claim({self.number}, depends_on={self.depends_on}, elements={len(self.elements)})"
+
+
+class ClaimSet:
+    """Parsed claim set: claims in document order plus lookup by claim number."""
+    __slots__ = ("text", "claims", "by_number")
+
+    def __init__(self, text, claims):
+        self.text = text
+        self.claims = claims
+        self.by_number = {claim.number: claim for claim in claims}
+
+    def chain(self, number):
+        """The claim and its ancestors, root first. Stops at missing parents and cycles."""
+        chain, seen = [], set()
+        claim = self.by_number.get(number)
+        while claim is not None and claim.number not in seen:
+            seen.add(claim.number)
+            chain.append(claim)
+            claim = self.by_number.get(claim.depends_on) if claim.depends_on is not None else None
+        return chain[::-1]
+
+    def claim_at(self, offset):
+        """The claim containing a character offset, or None."""
+        for claim in self.claims:
+            if claim.start <= offset < claim.end:
+                return claim
+        return None
+
+    def to_dict(self):
+        return {"claims": [claim.to_dict() for claim in self.claims]}
+
+
+def split_elements(text):
+    """Limitation-level segments of text as ClaimElements."""
+    elements = []
+    start = 0
+    for match in list(ELEMENT_DELIMITER_RE.finditer(text)) + [None]:
+        end = match.start() if match else len(text)
+        raw = text[start:end]
+        stripped = raw.strip()
+        if stripped:
+            lead = start + len(raw) - len(raw.lstrip())
+            elements.append(ClaimElement(stripped, lead, lead + len(stripped)))
+        if match:
+            start = match.end()
+    return elements
+
+
+@lru_cache(maxsize=CLAIM_CACHE_SIZE)
+def _analyze_claim(text):
+    depends = DEPENDENCY_RE.search(text)
+    transition = TRANSITION_RE.search(text)
+    words = [(m.group().lower(), m.start()) for m in WORD_RE.finditer(text)]
+    return (
+        int(depends.group(1)) if depends else None,
+        text[:transition.start()].strip().rstrip(',:;') if transition else text.strip(),
+        transition.group(1).lower() if transition else None,
+        tuple(split_elements(text)),
+        tuple(w for w, _ in words),
+        tuple(s for _, s in words)
+    )
+
+
+def _parse_claim(number, text, start):
+    depends_on, preamble, transition, elements, tokens, token_starts = _analyze_claim(text)
+    return Claim(number, depends_on, preamble, transition, text, start, start + len(text),
+                 elements, tokens, token_starts)
+
+
+def _parse(text):
+    claims = []
+    matches = list(CLAIM_START_RE.finditer(text))
+    leading = text[:matches[0].start()] if matches else text
+    if leading.strip():
+        start = len(leading) - len(leading.lstrip())
+        claims.append(_parse_claim(None, leading.strip(), start))
+    for i, match in enumerate(matches):
+        body_end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        body = text[match.end():body_end].rstrip()
+        if body:
+            claims.append(_parse_claim(int(match.group(1)), body, match.end()))
+    return ClaimSet(text, tuple(claims))
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+parse_stats = {"parses": 0, "hits": 0}
+
+
+def parse_claims(text):
+    """
+    Parses a numbered claim set. Results are cached by content hash, so every
+    tool checking the same text (antecedent basis, linter, mapper, examiner,
+    claim tree) shares a single parse. Claim objects must be treated as read-only.
+    """
+    key = hashlib.sha1(text.encode('utf-8')).hexdigest()
+    with _cache_lock:
+        parsed = _cache.get(key)
+        if parsed is not None:
+            _cache.move_to_end(key)
+            parse_stats["hits"] += 1
+            return parsed
+    parsed = _parse(text)
+    with _cache_lock:
+        parse_stats["parses"] += 1
+        _cache[key] = parsed
+        while len(_cache) > PARSE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return parsed
+
+
+if __name__ == "__main__":
+    sample = "1. A toaster comprising: a laser; and a bread carriage.\n2. The toaster of Claim 1, wherein the laser is pulsed."
+    for claim in parse_claims(sample).claims:
+        print(claim, claim.preamble, claim.transition, [e.text for e in claim.elements])
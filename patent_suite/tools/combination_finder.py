@@ -0,0 +1,127 @@
+# Largest combination considered for an obviousness (103) rejection
+MAX_COMBINATION_SIZE = 3
+# Combinations reported per claim
+MAX_COMBINATIONS = 10
+
+
+def coverage_masks(chart, claim_index):
+    """
+    Per reference of a map_claims_batch chart, a bitmask over the elements of
+    one claim: bit e is set when the reference discloses element e.
+    Returns (masks, element_rows), element_rows being the chart rows of the claim.
+    """
+    rows = [r for r, element in enumerate(chart["elements"]) if element["claim"] == claim_index]
+    best = chart["best_element"]
+    masks = []
+    for col in range(len(chart["references"])):
+        mask = 0
+        for bit, row in enumerate(rows):
+            if best[row, col] >= 0:
+                mask |= 1 << bit
+        masks.append(mask)
+    return masks, rows
+
+
+def find_combinations(masks, element_count, max_size=MAX_COMBINATION_SIZE):
+    """
+    Minimal sets of references whose masks OR to all element_count bits.
+
+    Returns (anticipating, combinations): references covering every element
+    on their own, and tuples of 2..max_size reference indexes (ascending)
+    that cover everything together while no smaller subset does.
+
+    References with identical masks are searched once and expanded at the
+    end. A partial union only continues with references that add a missing
+    element, and the last member must cover everything still missing, so
+    only unions that can still become a minimal cover are formed instead of
+    all C(n, 3) triples.
+    """
+    full = (1 << element_count) - 1
+    if element_count == 0:
+        return [], []
+    groups = {}
+    for ref, mask in enumerate(masks):
+        if mask:
+            groups.setdefault(mask, []).append(ref)
+    anticipating = sorted(groups.pop(full, []))
+    distinct = sorted(groups, key=lambda m: bin(m).count("1"), reverse=True)
+
+    found = []
+
+    def covers_without(chosen):
+        # Minimal only if dropping any one member leaves an element uncovered
+        for skip in range(len(chosen)):
+            union = 0
+            for i, mask in enumerate(chosen):
+                if i != skip:
+                    union |= mask
+            if union == full:
+                return True
+        return False
+
+    def extend(chosen, union, start):
+        missing = full & ~union
+        if len(chosen) == max_size - 1:
+            # Last slot: it alone must fill every gap
+            needed = bin(missing).count("1")
+            for mask in distinct[start:]:
+                if bin(mask).count("1") < needed:
+                    break  # sorted by popcount: no later mask can fill the gap
+                if mask & missing == missing and not covers_without(chosen + [mask]):
+                    found.append(chosen + [mask])
+            return
+        for k in range(start, len(distinct)):
+            mask = distinct[k]
+            if not mask & missing:
+                continue  # adds nothing: any set containing it is not minimal
+            if union | mask == full:
+                if not covers_without(chosen + [mask]):
+                    found.append(chosen + [mask])
+                continue  # supersets of a covering set are not minimal
+            extend(chosen + [mask], union | mask, k + 1)
+
+    for i, mask in enumerate(distinct):
+        if max_size >= 2:
+            extend([mask], mask, i + 1)
+
+    results = set()
+    for chosen in found:
+        for refs in _expand([groups[mask] for mask in chosen]):
+            results.add(tuple(sorted(refs)))
+    return anticipating, sorted(results, key=lambda refs: (len(refs), refs))
+
+
+def _expand(ref_lists):
+    if not ref_lists:
+        yield ()
+        return
+    for ref in ref_lists[0]:
+        for rest in _expand(ref_lists[1:]):
+            yield (ref,) + rest
+
+
+def rank_combinations(combos, similarity, rows, limit=MAX_COMBINATIONS):
+    """
+    Orders combinations by size, then by how strongly they teach the claim:
+    the mean over its elements of the best similarity among their references.
+    """
+    def strength(refs):
+        if not rows:
+            return 0.0
+        return float(similarity[rows][:, list(refs)].max(axis=1).mean())
+    return sorted(combos, key=lambda refs: (len(refs), -strength(refs)))[:limit]
+
+
+def find_claim_combinations(chart, claim_index, max_size=MAX_COMBINATION_SIZE, limit=MAX_COMBINATIONS):
+    """
+    Anticipating references and ranked minimal combinations for one claim of
+    a map_claims_batch chart, as reference ids.
+    """
+    masks, rows = coverage_masks(chart, claim_index)
+    anticipating, combos = find_combinations(masks, len(rows), max_size)
+    ids = chart["references"]
+    return {
+        "elements": len(rows),
+        "anticipating": [ids[r] for r in anticipating],
+        "combinations": [[ids[r] for r in refs] for refs in rank_combinations(combos, chart["similarity"], rows, limit)]
+    }
@@ -1,3 +1,45 @@
+import re
+
+# Section, class, subclass, then optional main group and subgroup, e.g. "A47J 37/08"
+CPC_RE = re.compile(r"^\s*([A-HY])\s*(\d{2})\s*([A-Z])(?:\s*(\d{1,4})(?:\s*/\s*(\d{2,6}))?)?", re.IGNORECASE)
+
+
+def normalize_cpc(code):
+    """
+    Canonical form of a CPC symbol or prefix: 'a47j37/08 - Bread toasters' ->
+    'A47J 37/08', 'A47J 37' -> 'A47J 37', 'A47J' -> 'A47J'. Returns None if the
+    value does not start with a CPC symbol.
+    """
+    match = CPC_RE.match(str(code))
+    if not match:
+        return None
+    section, cls, subclass, group, subgroup = match.groups()
+    symbol = f"{section}{cls}{subclass}".upper()
+    if group:
+        symbol += f" {int(group)}"
+        if subgroup:
+            symbol += f"/{subgroup}"
+    return symbol
+
+
+def cpc_matches(code, prefix):
+    """
+    True if the normalized code falls under the normalized prefix in the CPC
+    hierarchy: a subclass ('A47J') covers its groups, a main group ('A47J 37'
+    or 'A47J 37/00') covers all its subgroups, and a subgroup covers the
+    subgroups that extend its digits ('A47J 37/08' covers 'A47J 37/0807').
+    """
+    if prefix.endswith("/00"):
+        prefix = prefix[:-3]
+    if code == prefix:
+        return True
+    if "/" in prefix:
+        return code.startswith(prefix)
+    if " " in prefix:
+        return code.startswith(prefix + "/")
+    return code.startswith(prefix + " ")
+
+
 def classify_invention(keywords_or_text):
     """
     Automatically identify the Cooperative Patent Classification (CPC) code.
@@ -0,0 +1,109 @@
+import json
+import math
+import os
+import zlib
+from functools import lru_cache
+import numpy as np
+from patent_suite.tools.text_analysis import tokenize
+
+# Embedders turn texts into L2-normalised float32 vectors, so a dot product is
+# a cosine similarity. Anything with the same interface (name, dim, fit,
+# embed, save, load) can be registered, e.g. a sentence-transformers wrapper;
+# the default works offline.
+DEFAULT_EMBEDDER = "hashing"
+
+
+@lru_cache(maxsize=262144)
+def _hash_term(term):
+    return zlib.crc32(term.encode('utf-8'))
+
+
+class HashingEmbedder:
+    """
+    TF-IDF projected into a fixed number of dimensions with the hashing trick:
+    each term adds a signed, sublinear-tf weighted contribution to one bucket
+    (crc32 of the term), weighted by the bucket's IDF once fit() has seen a
+    corpus. Needs no vocabulary, model download or network access.
+    """
+    name = "hashing"
+
+    def __init__(self, dim=256, idf=None):
+        self.dim = dim
+        self.idf = idf if idf is not None else np.ones(dim, dtype=np.float32)
+
+    def _features(self, text):
+        counts = {}
+        for term in tokenize(text):
+            counts[term] = counts.get(term, 0) + 1
+        buckets, weights = [], []
+        for term, tf in counts.items():
+            h = _hash_term(term)
+            buckets.append(h % self.dim)
+            weights.append((1.0 + math.log(tf)) * (1.0 if h & 0x80000000 else -1.0))
+        return buckets, weights
+
+    def fit(self, texts):
+        """Learns per-bucket IDF weights from a corpus. Returns self."""
+        df = np.zeros(self.dim, dtype=np.float64)
+        n = 0
+        for text in texts:
+            df[sorted(set(self._features(text)[0]))] += 1
+            n += 1
+        self.idf = (np.log((1.0 + n) / (1.0 + df)) + 1.0).astype(np.float32)
+        return self
+
+    def embed(self, texts):
+        """Returns an (len(texts), dim) float32 matrix of unit vectors (zero rows for empty texts)."""
+        rows, cols, vals = [], [], []
+        count = 0
+        for row, text in enumerate(texts):
+            buckets, weights = self._features(text)
+            rows.extend([row] * len(buckets))
+            cols.extend(buckets)
+            vals.extend(weights)
+            count = row + 1
+        matrix = np.zeros((count, self.dim), dtype=np.float32)
+        np.add.at(matrix, (rows, cols), vals)
+        matrix *= self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    def save(self, directory):
+        np.save(os.path.join(directory, 'idf.npy'), self.idf)
+        return {"name": self.name, "dim": self.dim}
+
+    @classmethod
+    def load(cls, directory, config):
+        return cls(dim=config["dim"], idf=np.load(os.path.join(directory, 'idf.npy')))
+
+
+EMBEDDERS = {HashingEmbedder.name: HashingEmbedder}
+
+
+def register_embedder(embedder_cls):
+    """Makes an embedder class loadable by name from a saved vector index."""
+    EMBEDDERS[embedder_cls.name] = embedder_cls
+    return embedder_cls
+
+
+def get_embedder(name=None, **kwargs):
+    """Creates an (unfitted) embedder; name defaults to OPENPATENT_EMBEDDER or 'hashing'."""
+    name = name or os.getenv("OPENPATENT_EMBEDDER", DEFAULT_EMBEDDER)
+    if name not in EMBEDDERS:
+        raise ValueError(f"Unknown embedder '{name}'. Registered: {', '.join(sorted(EMBEDDERS))}")
+    return EMBEDDERS[name](**kwargs)
+
+
+def save_embedder(embedder, directory):
+    config = embedder.save(directory)
+    with open(os.path.join(directory, 'embedder.json'), 'w') as f:
+        json.dump(config, f, indent=4)
+
+
+def load_embedder(directory):
+    with open(os.path.join(directory, 'embedder.json'), 'r') as f:
+        config = json.load(f)
+    if config["name"] not in EMBEDDERS:
+        raise ValueError(f"Vector index {directory} needs the unregistered embedder '{config['name']}'")
+    return EMBEDDERS[config["name"]].load(directory, config)
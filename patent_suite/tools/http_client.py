@@ -0,0 +1,245 @@
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+# Responses worth retrying: rate limiting and transient gateway / overload errors
+RETRY_STATUSES = (429, 502, 503, 504)
+# Transport errors worth retrying; anything else (bad URL, invalid JSON body...) fails fast
+RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+# Methods safe to send twice. Others (POST) are only retried when the server
+# never saw the request: a failed connect, or a status refusing the work.
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+UNPROCESSED_STATUSES = (429, 503)
+
+# Latency samples kept per host for the percentile figures in stats()
+LATENCY_WINDOW = 1000
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised without touching the network while a host's circuit breaker is open."""
+
+
+def _is_connect_error(error):
+    """True if the request failed before a connection was made (nothing was sent)."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(error, requests.exceptions.ConnectionError) and isinstance(reason, NewConnectionError)
+
+
+def _capped_timeout(timeout, remaining):
+    # A (connect, read) tuple is capped element-wise
+    if isinstance(timeout, tuple):
+        return tuple(None if t is None else min(t, remaining) for t in timeout)
+    return min(timeout, remaining)
+
+
+class CircuitBreaker:
+    """
+    Per-host breaker: after failure_threshold consecutive failed calls the
+    host is skipped for reset_timeout seconds, then a single trial call is
+    let through (half-open). A success closes the breaker again.
+    """
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self):
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+
+class HttpClient:
+    """
+    Shared HTTP client for the OpenPatent services: one requests.Session with a
+    keep-alive connection pool, bounded retries with jittered exponential
+    backoff, a circuit breaker per host and per-host latency metrics.
+
+    Methods mirror requests.post / requests.get and return the final
+    requests.Response; callers keep using raise_for_status() and json().
+    """
+    def __init__(self, max_retries=2, backoff_base=0.2, backoff_cap=5.0, pool_size=10,
+                 failure_threshold=5, reset_timeout=30.0):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.session = requests.Session()
+        # Retries are handled here (so they can see the breaker), not by urllib3
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._lock = threading.Lock()
+        self._breakers = {}
+        self._metrics = {}
+
+    def _breaker(self, host):
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return breaker
+
+    def _backoff(self, attempt):
+        # "Full jitter": spreads retries from many callers instead of synchronising them
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def _record(self, host, elapsed_ms, ok, retries):
+        metrics = self._metrics.get(host)
+        if metrics is None:
+            metrics = self._metrics[host] = {
+                "calls": 0, "errors": 0, "retries": 0, "latencies_ms": deque(maxlen=LATENCY_WINDOW)
+            }
+        metrics["calls"] += 1
+        metrics["retries"] += retries
+        metrics["latencies_ms"].append(elapsed_ms)
+        if not ok:
+            metrics["errors"] += 1
+
+    def request(self, method, url, retries=None, **kwargs):
+        """
+        Sends a request, retrying connection errors, timeouts and RETRY_STATUSES
+        up to `retries` times (default max_retries). Non-idempotent methods
+        are only retried after connect errors and UNPROCESSED_STATUSES.
+        timeout is the budget for all attempts together (for a (connect, read)
+        tuple, their sum); no retry starts once it is spent. Raises
+        CircuitOpenError if the host's breaker is open, otherwise the last
+        transport error; a response with a retryable status is returned once
+        retries run out.
+        Transport errors, 429 and any 5xx count as failures for the breaker.
+        """
+        host = urlsplit(url).netloc
+        retries = self.max_retries if retries is None else retries
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        timeout = kwargs.pop("timeout", None)
+        budget = timeout
+        if isinstance(timeout, tuple):
+            budget = None if None in timeout else sum(timeout)
+        with self._lock:
+            if not self._breaker(host).allow():
+                raise CircuitOpenError(f"Circuit open for {host}; skipping request")
+
+        send = getattr(self.session, method.lower())
+        started = time.perf_counter()
+        deadline = None if budget is None else started + budget
+        attempt = 0
+        while True:
+            attempt_timeout = timeout
+            if attempt and deadline is not None:
+                attempt_timeout = _capped_timeout(timeout, max(deadline - time.perf_counter(), 0.001))
+            try:
+                response = send(url, timeout=attempt_timeout, **kwargs)
+                error = None
+            except RETRY_EXCEPTIONS as e:
+                response, error = None, e
+            except Exception:
+                self._finish(host, started, attempt, ok=False)
+                raise
+            # Every transport error, 429 and 5xx counts against the breaker, retried or not
+            if error is not None:
+                failed = True
+                retryable = idempotent or _is_connect_error(error)
+            else:
+                failed = response.status_code in RETRY_STATUSES or response.status_code >= 500
+                retryable = response.status_code in (RETRY_STATUSES if idempotent else UNPROCESSED_STATUSES)
+            if not retryable or attempt >= retries:
+                break
+            delay = self._backoff(attempt)
+            if deadline is not None and time.perf_counter() + delay >= deadline:
+                break
+            time.sleep(delay)
+            attempt += 1
+
+        self._finish(host, started, attempt, ok=not failed)
+        if error is not None:
+            raise error
+        return response
+
+    def _finish(self, host, started, retries, ok):
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        with self._lock:
+            breaker = self._breaker(host)
+            if ok:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+            self._record(host, elapsed_ms, ok, retries)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def stats(self):
+        """Per-host call / error / retry counts, p50 / p95 / max latency (ms) and breaker state."""
+        with self._lock:
+            report = {}
+            for host, metrics in self._metrics.items():
+                latencies = sorted(metrics["latencies_ms"])
+                report[host] = {
+                    "calls": metrics["calls"],
+                    "errors": metrics["errors"],
+                    "retries": metrics["retries"],
+                    "p50_ms": latencies[len(latencies) // 2] if latencies else 0.0,
+                    "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0,
+                    "max_ms": latencies[-1] if latencies else 0.0,
+                    "circuit": self._breaker(host).state
+                }
+            return report
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_http_client():
+    """Process-wide client shared by the agents, so they share one connection pool."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
+
+
+if __name__ == "__main__":
+    client = get_http_client()
+    try:
+        client.get("https://api.openpatent.com/health", timeout=5, retries=1)
+    except requests.exceptions.RequestException as e:
+        print(f"Request failed: {e}")
+    print(client.stats())
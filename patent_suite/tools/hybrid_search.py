@@ -0,0 +1,93 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from patent_suite.tools.prior_art_index import PriorArtHit
+from patent_suite.tools.patents_search import search_prior_art, semantic_search_prior_art
+
+# Reciprocal-rank fusion constant (Cormack et al.): damps the influence of top ranks
+RRF_K = 60
+
+# Per-retriever latency budgets in seconds. A retriever that misses its budget
+# is left to finish in the background and the response is fused without it.
+DEFAULT_BUDGETS = {"bm25": 0.5, "vector": 0.5}
+
+# One pool per retriever kind, shared across requests and never shut down, so
+# a late retriever never blocks a response. A slow kind only queues its own
+# later calls: stragglers from a stalled vector index cannot make the next
+# requests' BM25 calls miss their budgets.
+_RETRIEVER_POOLS = {
+    name: ThreadPoolExecutor(max_workers=8, thread_name_prefix=f"hybrid-{name}")
+    for name in DEFAULT_BUDGETS
+}
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    return fn(), round((time.perf_counter() - started) * 1000, 1)
+
+
+def reciprocal_rank_fusion(ranked_lists, top_k=10, k=RRF_K, weights=None):
+    """
+    Fuses {signal: [hit, ...]} ranked lists (best first, hits keyed by "id")
+    into one ranking scored by sum(weight / (k + rank)). Because only ranks
+    are used, BM25 and cosine scores never need to be calibrated against each
+    other. Each fused hit carries a "signals" dict with its rank and raw score
+    per retriever, so the UI can explain why it was returned.
+    """
+    fused = {}
+    for signal, hits in ranked_lists.items():
+        weight = (weights or {}).get(signal, 1.0)
+        for rank, hit in enumerate(hits, start=1):
+            entry = fused.get(hit["id"])
+            if entry is None:
+                entry = fused[hit["id"]] = {"doc": hit, "score": 0.0, "signals": {}}
+            entry["score"] += weight / (k + rank)
+            entry["signals"][signal] = {
+                "rank": rank,
+                "score": hit.get("relevance_score", hit.get("similarity_score"))
+            }
+
+    ranked = sorted(fused.values(), key=lambda e: e["score"], reverse=True)[:top_k]
+    results = []
+    for entry in ranked:
+        doc = {key: value for key, value in entry["doc"].items() if key not in ("relevance_score", "similarity_score")}
+        results.append(PriorArtHit(doc, relevance_score=round(entry["score"], 6), signals=entry["signals"]))
+    return results
+
+
+def hybrid_search_prior_art(keywords, text=None, date_cutoff=None, top_k=10, budgets=None,
+                            index_dir=None, vector_index_dir=None):
+    """
+    Runs BM25 (on the keyword / boolean query) and vector search (on text,
+    e.g. the disclosure; defaults to keywords) concurrently and fuses them
+    with reciprocal-rank fusion.
+
+    Returns {"results": [PriorArtHit], "signals": {name: {"status", "ms", "count"}}}.
+    A retriever that fails or exceeds its budget is reported with status
+    "error" / "timeout" and the results come from the remaining retrievers.
+    """
+    budgets = dict(DEFAULT_BUDGETS, **(budgets or {}))
+    depth = max(top_k * 3, 30)
+    retrievers = {
+        "bm25": lambda: search_prior_art(keywords, date_cutoff, top_k=depth, index_dir=index_dir),
+        "vector": lambda: semantic_search_prior_art(text or keywords, date_cutoff, top_k=depth, index_dir=vector_index_dir)
+    }
+
+    started = time.perf_counter()
+    futures = {name: _RETRIEVER_POOLS[name].submit(_timed, fn) for name, fn in retrievers.items()}
+    ranked_lists, signals = {}, {}
+    for name, future in futures.items():
+        remaining = max(0.0, started + budgets[name] - time.perf_counter())
+        try:
+            ranked_lists[name], elapsed_ms = future.result(timeout=remaining)
+            signals[name] = {"status": "ok", "ms": elapsed_ms, "count": len(ranked_lists[name])}
+        except FutureTimeout:
+            signals[name] = {"status": "timeout", "ms": budgets[name] * 1000, "count": 0}
+            print(f"HybridSearch: {name} retriever exceeded its {budgets[name]:.2f}s budget; continuing without it")
+        except Exception as e:
+            signals[name] = {"status": "error", "ms": round((time.perf_counter() - started) * 1000, 1), "count": 0, "message": str(e)}
+            print(f"HybridSearch: {name} retriever failed: {e}")
+
+    return {
+        "results": reciprocal_rank_fusion(ranked_lists, top_k=top_k),
+        "signals": signals
+    }
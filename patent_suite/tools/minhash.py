@@ -0,0 +1,97 @@
+import hashlib
+import zlib
+from array import array
+
+# MinHash sketch: NUM_HASHES 32-bit minima. LSH splits it into BANDS bands of
+# ROWS values; two documents share a bucket in a band if all its rows match,
+# which for Jaccard similarity J happens in at least one band with
+# probability 1 - (1 - J**ROWS)**BANDS (~0.9998 at J=0.8, ~0.64 at J=0.5).
+NUM_HASHES = 64
+BANDS = 16
+ROWS = NUM_HASHES // BANDS
+SHINGLE_SIZE = 3
+# Estimated Jaccard similarity above which two documents count as one family
+FAMILY_THRESHOLD = 0.8
+# Candidates fetched per requested result so collapsing can still fill top_k
+FAMILY_OVERFETCH = 3
+
+EMPTY = 0xFFFFFFFF
+
+
+def shingles(terms, size=SHINGLE_SIZE):
+    """Word n-grams of an analyzed document (the terms themselves if it is shorter)."""
+    if len(terms) < size:
+        return set(terms)
+    return {" ".join(terms[i:i + size]) for i in range(len(terms) - size + 1)}
+
+
+def minhash_signature(terms):
+    """
+    One-permutation MinHash: each shingle is hashed once, the low bits pick
+    one of NUM_HASHES bins and the high 32 bits compete for that bin's
+    minimum. Empty bins borrow from the next non-empty bin (rotation
+    densification). Costs one hash per shingle instead of NUM_HASHES.
+    Returns array('I'); all EMPTY for a document without terms.
+    """
+    bins = [EMPTY] * NUM_HASHES
+    for shingle in shingles(terms):
+        h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+        slot = h % NUM_HASHES
+        value = h >> 32
+        if value < bins[slot]:
+            bins[slot] = value
+    if any(v != EMPTY for v in bins):
+        for slot in range(NUM_HASHES):
+            offset = 1
+            while bins[slot] == EMPTY:
+                donor = bins[(slot + offset) % NUM_HASHES]
+                if donor != EMPTY:
+                    # Mix in the distance so borrowed values differ from the donor's own
+                    bins[slot] = (donor + offset * 0x9E3779B1) & 0xFFFFFFFF
+                offset += 1
+    return array('I', bins)
+
+
+def band_keys(signature):
+    """LSH bucket keys of a signature, one per band."""
+    raw = array('I', signature).tobytes()
+    return array('I', (zlib.crc32(raw[4 * ROWS * b:4 * ROWS * (b + 1)], b) for b in range(BANDS)))
+
+
+def estimated_jaccard(a, b):
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_HASHES
+
+
+def collapse_families(hits, top_k, threshold=FAMILY_THRESHOLD):
+    """
+    Collapses near-duplicate results (e.g. US, EP and JP members of one
+    patent family) into their best-ranked member.
+
+    hits are (score, doc, signature, band_keys) in rank order. Each hit costs
+    BANDS dict lookups plus a signature comparison per bucket collision, i.e.
+    microseconds. Returns up to top_k [(score, doc)] where each doc carries a
+    "family_members" list with the ids of the collapsed duplicates.
+    """
+    buckets = {}
+    families = []
+    for score, doc, signature, bands in hits:
+        family = None
+        # Densified signatures of non-empty documents have no EMPTY bins
+        if signature[0] != EMPTY:
+            for key in bands:
+                for candidate in buckets.get(key, ()):
+                    if estimated_jaccard(signature, candidate[2]) >= threshold:
+                        family = candidate
+                        break
+                if family is not None:
+                    break
+        if family is not None:
+            family[3].append(doc.get("id"))
+            continue
+        if len(families) >= top_k:
+            continue
+        entry = (score, doc, signature, [])
+        families.append(entry)
+        for key in bands:
+            buckets.setdefault(key, []).append(entry)
+    return [(score, dict(doc, family_members=members)) for score, doc, _, members in families]
@@ -1,6 +1,7 @@
 import os
 import json
 import time
+from patent_suite.tools.search_cache import NON_PATENT_CACHE, normalize_query, caching_enabled
 
 def search_non_patent_literature(query, session_id=None):
     """
@@ -8,7 +9,35 @@ def search_non_patent_literature(query, session_id=None):
     Follows a 2-step flow:
     1. Initiate research (Step 1: Follow-up Confirmation)
     2. Deep search based on confirmation (Step 2: JSON Response)
+    Research results are cached by normalized query; the session copy is
+    written on every call.
     """
+    results = None
+    cache_key = None
+    if caching_enabled():
+        cache_key = NON_PATENT_CACHE.make_key(normalize_query(query))
+        results = NON_PATENT_CACHE.get(cache_key)
+        if results is not None:
+            print(f"--- Qwen Deep Research: Cached result for '{query}' ---")
+
+    if results is None:
+        results = _run_deep_research(query)
+        if cache_key is not None:
+            NON_PATENT_CACHE.set(cache_key, results)
+
+    # Save results to session workspace if session_id is provided
+    if session_id:
+        from patent_suite.suite_app import WorkspaceManager
+        wm = WorkspaceManager()
+        session_dir = wm.init_session_workspace(session_id)
+        search_results_path = os.path.join(session_dir, 'references', 'qwen_non_patent.json')
+        with open(search_results_path, 'w') as f:
+            json.dump(results, f, indent=4)
+        print(f"Qwen Deep Research results saved to {search_results_path}")
+
+    return results
+
+def _run_deep_research(query):
     print(f"--- Qwen Deep Research: Initiating search for '{query}' ---")
     
     # Step 1: Simulate Qwen asking a follow-up question
@@ -62,16 +91,6 @@ def search_non_patent_literature(query, session_id=None):
         ],
         "novelty_risk_assessment": "Moderate. Several individual components (infrared grid, sensors) exist, but the specific combination for 'Rasterized Laser Bread Browning' has fewer direct non-patent hits."
     }
-    
-    # Save results to session workspace if session_id is provided
-    if session_id:
-        from patent_suite.suite_app import WorkspaceManager
-        wm = WorkspaceManager()
-        session_dir = wm.init_session_workspace(session_id)
-        search_results_path = os.path.join(session_dir, 'references', 'qwen_non_patent.json')
-        with open(search_results_path, 'w') as f:
-            json.dump(results, f, indent=4)
-        print(f"Qwen Deep Research results saved to {search_results_path}")
 
     return results
 
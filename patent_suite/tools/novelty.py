@@ -0,0 +1,111 @@
+import re
+from functools import lru_cache
+from patent_suite.tools.claim_mapper import split_into_elements
+from patent_suite.tools.text_analysis import tokenize
+
+# Disclosure features are split further on these connectives than claim elements are
+FEATURE_DELIMITERS = re.compile(r"\b(?:wherein|whereby|with|that|which|and)\b|[.!?\n]", re.IGNORECASE)
+
+# Bounds that keep the overlap stage O(features x tokens x references) small
+MAX_FEATURES = 50
+MAX_FEATURE_TOKENS = 32
+MAX_REFERENCES = 500
+
+# A feature counts as disclosed by a reference when this share of its terms appears there
+FEATURE_THRESHOLD = 0.6
+# A reference anticipates the disclosure when it discloses this share of the features
+ANTICIPATION_THRESHOLD = 1.0
+
+
+def _normalize(term):
+    # Folds simple plurals so "lasers" in a disclosure meets "laser" in a reference
+    return term[:-1] if len(term) > 3 and term.endswith("s") and not term.endswith("ss") else term
+
+
+def feature_terms(text):
+    return list(dict.fromkeys(_normalize(t) for t in tokenize(text)))
+
+
+def extract_features(disclosure_text, max_features=MAX_FEATURES):
+    """
+    Splits a disclosure into short feature phrases (sentences, then claim-style
+    elements, then connectives such as 'with' / 'wherein'). Features without
+    content terms are dropped and duplicates removed.
+    """
+    features = []
+    seen = set()
+    for element in split_into_elements(disclosure_text):
+        for part in FEATURE_DELIMITERS.split(element):
+            part = part.strip(" :")
+            terms = tuple(feature_terms(part))
+            if terms and terms not in seen:
+                seen.add(terms)
+                features.append(part)
+                if len(features) >= max_features:
+                    return features
+    return features
+
+
+@lru_cache(maxsize=4096)
+def _reference_terms(ref_id, text):
+    """Token set of a reference, computed once per reference and reused across runs."""
+    return frozenset(feature_terms(text))
+
+
+def score_novelty_overlap(features, references, feature_threshold=FEATURE_THRESHOLD,
+                          anticipation_threshold=ANTICIPATION_THRESHOLD):
+    """
+    Scores each disclosure feature against each retrieved reference.
+
+    References are indexed as token -> reference positions, so each feature
+    term costs one dict lookup plus one increment per reference containing
+    it. The whole stage is bounded by MAX_FEATURES x MAX_FEATURE_TOKENS x
+    MAX_REFERENCES increments, whatever the length of the references.
+
+    Returns:
+        matrix          - matrix[f][r]: share of feature f's terms found in reference r
+        references      - per reference: id, disclosed feature indexes, coverage score
+        best_reference  - the reference disclosing the most features (or None)
+        anticipated     - True if one reference discloses at least anticipation_threshold
+                          of the features (the single-reference, 102-style test)
+    """
+    features = list(features)[:MAX_FEATURES]
+    references = list(references)[:MAX_REFERENCES]
+
+    postings = {}
+    for r, ref in enumerate(references):
+        text = f"{ref.get('title', '')} {ref.get('abstract', '')}"
+        for term in _reference_terms(ref.get("id"), text):
+            postings.setdefault(term, []).append(r)
+
+    matrix = []
+    for feature in features:
+        terms = feature_terms(feature)[:MAX_FEATURE_TOKENS]
+        counts = [0] * len(references)
+        for term in terms:
+            for r in postings.get(term, ()):
+                counts[r] += 1
+        matrix.append([round(c / len(terms), 3) if terms else 0.0 for c in counts])
+
+    per_reference = []
+    for r, ref in enumerate(references):
+        disclosed = [f for f in range(len(features)) if matrix[f][r] >= feature_threshold]
+        per_reference.append({
+            "id": ref.get("id"),
+            "disclosed_features": disclosed,
+            "coverage": round(len(disclosed) / len(features), 3) if features else 0.0
+        })
+    best = max(per_reference, key=lambda p: p["coverage"], default=None)
+
+    return {
+        "features": features,
+        "matrix": matrix,
+        "references": per_reference,
+        "best_reference": best,
+        "anticipated": bool(features) and best is not None and best["coverage"] >= anticipation_threshold
+    }
+
+
+def assess_novelty(disclosure_text, references, **thresholds):
+    """Extracts the disclosure's features and scores them against the references."""
+    return score_novelty_overlap(extract_features(disclosure_text), references, **thresholds)
@@ -1,49 +1,115 @@
 import json
-import time
 import os
 import sys
 
 # Ensure non_patent_search can be imported
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from non_patent_search import search_non_patent_literature
+from patent_suite.tools.prior_art_index import get_prior_art_index, PriorArtHit, date_key
+from patent_suite.tools.search_cache import PRIOR_ART_CACHE, normalize_query, caching_enabled
+from patent_suite.tools.cpc_classifier import normalize_cpc
 
-def search_prior_art(keywords, date_cutoff=None):
+def search_prior_art(keywords, date_cutoff=None, top_k=10, index_dir=None, cpc=None, collapse_families=True):
     """
-    Search prior art (Refined Mock implementation).
-    Connects to mock Google Patents / USPTO data.
+    Search prior art against the local inverted index (BM25 ranking).
+    keywords may be a plain keyword list or a boolean query such as
+    "(laser AND toasting) OR (laser AND precision AND heating)".
+    Build the index once with `python -m patent_suite.tools.prior_art_index build`.
+    Only references published before date_cutoff (the priority date) are
+    considered; later ones are pruned before scoring. Sharded indexes are
+    searched in parallel, one worker process per shard.
+    cpc restricts the search to references classified under any of the given
+    CPC codes or prefixes, e.g. cpc=["A47J 37/08", "H01S 3/00"] (a group such
+    as "H01S 3/00" also covers its subgroups). The filter is applied before
+    scoring, so only documents in those classes are touched.
+    With collapse_families (the default), near-duplicate members of one patent
+    family (MinHash / LSH) take a single result slot and are listed in its
+    "family_members".
+    Repeated searches (same normalized query, cutoff and index) are served from
+    the two-tier search cache.
     Returns titles and abstracts of the top 10 matches.
     """
     print(f"Searching prior art for: {keywords} (Cutoff: {date_cutoff})")
-    time.sleep(1) # Simulate network lag
-    
-    # Expanded mock results to fulfill the "top 10" requirement
-    mock_registry = [
-        {"id": "US-1234567-A1", "title": "Infrared Toasting Apparatus", "abstract": "A method for toasting food items using a plurality of infrared emitters arranged in a grid.", "date": "2015-05-20"},
-        {"id": "US-7654321-B2", "title": "Laser-Based Material Processing", "abstract": "A system for rasterizing laser beams to heat substrates with high precision.", "date": "2018-11-12"},
-        {"id": "EP-9876543-A1", "title": "Non-Contact Heating Device", "abstract": "Device using electromagnetic radiation to heat organic materials without physical contact.", "date": "2010-01-05"},
-        {"id": "US-1111111-A1", "title": "Smart Toaster with Feedback Loop", "abstract": "A toaster equipped with optical sensors to monitor browning levels in real-time.", "date": "2020-03-15"},
-        {"id": "US-2222222-B1", "title": "Directed Energy Heating System", "abstract": "Apparatus for directing energy beams to specific coordinates on a food item.", "date": "2019-07-22"},
-        {"id": "US-3333333-A1", "title": "Automated Bread Browning Control", "abstract": "Computer-controlled heating elements for uniform bread toasting.", "date": "2017-12-01"},
-        {"id": "JP-4444444-B2", "title": "High-Efficiency Raster Heating", "abstract": "Method of scanning a surface with a heat source to achieve uniform temperature distribution.", "date": "2016-09-10"},
-        {"id": "US-5555555-A1", "title": "Precision Thermal Toaster", "abstract": "Toaster using micro-controller units to execute complex heating patterns.", "date": "2021-01-30"},
-        {"id": "US-6666666-B2", "title": "Laser Rastering for Culinary Applications", "abstract": "Using low-power lasers to brown or cook patterns onto dough-based products.", "date": "2022-05-14"},
-        {"id": "US-7777777-A1", "title": "Multi-Zone Infrared Cooker", "abstract": "Cooking device with independently controlled infrared zones for variable heating.", "date": "2014-08-08"},
-        {"id": "US-8888888-B1", "title": "Optical Sensor for Toaster Safety", "abstract": "Sensors that detect burning and automatically shut off power to avoid fires.", "date": "2013-11-25"}
+    index = get_prior_art_index(index_dir)
+
+    cache_key = None
+    if caching_enabled():
+        cpc_key = sorted({normalize_cpc(code) for code in cpc or []} - {None})
+        cache_key = PRIOR_ART_CACHE.make_key(normalize_query(keywords), date_key(date_cutoff), top_k, cpc_key, collapse_families, index.cache_token)
+        cached = PRIOR_ART_CACHE.get(cache_key)
+        if cached is not None:
+            return [PriorArtHit(hit) for hit in cached]
+
+    results = [
+        PriorArtHit(doc, relevance_score=round(score, 4))
+        for score, doc in index.search_documents(keywords, top_k=top_k, date_cutoff=date_cutoff, cpc=cpc, collapse=collapse_families)
     ]
-    
-    # Filter based on keywords (simple mock ranking)
-    keywords_list = keywords.lower().split()
-    results = []
-    for entry in mock_registry:
-        score = sum(1 for k in keywords_list if k in entry['title'].lower() or k in entry['abstract'].lower())
-        if score > 0:
-            entry['relevance_score'] = score
-            results.append(entry)
-    
-    # Sort by score and date
-    results.sort(key=lambda x: (x['relevance_score'], x['date']), reverse=True)
-    
-    return results[:10]
+    if cache_key is not None:
+        PRIOR_ART_CACHE.set(cache_key, results)
+    return results
+
+def search_prior_art_batch(queries, date_cutoff=None, top_k=10, index_dir=None, cpc=None, collapse_families=True):
+    """
+    search_prior_art() for many queries in one call, e.g. a portfolio review.
+    Each query is a keyword / boolean string or a dict with "query" and its
+    own "date_cutoff" / "cpc" (the arguments are the defaults). Cached queries
+    are answered from the search cache. The rest are parsed together, and
+    posting lists of terms shared between them are fetched once. Sharded
+    indexes run the batch in parallel, one worker process per shard.
+    Returns one result list per query, in input order.
+    """
+    specs = []
+    for query in queries:
+        spec = dict(query) if isinstance(query, dict) else {"query": query}
+        spec.setdefault("date_cutoff", date_cutoff)
+        spec.setdefault("cpc", cpc)
+        specs.append(spec)
+    print(f"Searching prior art for {len(specs)} queries")
+    index = get_prior_art_index(index_dir)
+
+    results = [None] * len(specs)
+    cache_keys = [None] * len(specs)
+    if caching_enabled():
+        for i, spec in enumerate(specs):
+            cpc_key = sorted({normalize_cpc(code) for code in spec["cpc"] or []} - {None})
+            cache_keys[i] = PRIOR_ART_CACHE.make_key(normalize_query(spec["query"]), date_key(spec["date_cutoff"]), top_k, cpc_key, collapse_families, index.cache_token)
+            cached = PRIOR_ART_CACHE.get(cache_keys[i])
+            if cached is not None:
+                results[i] = [PriorArtHit(hit) for hit in cached]
+
+    misses = [i for i, hits in enumerate(results) if hits is None]
+    batch = index.search_documents_batch([specs[i] for i in misses], top_k=top_k, collapse=collapse_families) if misses else []
+    for i, hits in zip(misses, batch):
+        results[i] = [PriorArtHit(doc, relevance_score=round(score, 4)) for score, doc in hits]
+        if cache_keys[i] is not None:
+            PRIOR_ART_CACHE.set(cache_keys[i], results[i])
+    return results
+
+def semantic_search_prior_art(text, date_cutoff=None, top_k=10, index_dir=None):
+    """
+    Finds prior art by meaning rather than keywords: nearest neighbours of the
+    embedded text (e.g. a claim or disclosure paragraph) in the IVF vector
+    index built with `python -m patent_suite.tools.vector_index build`.
+    Returns PriorArtHit dicts with a similarity_score (cosine similarity).
+    """
+    from patent_suite.tools.vector_index import get_vector_index
+    print(f"Semantic prior-art search (Cutoff: {date_cutoff})")
+    index = get_vector_index(index_dir)
+
+    cache_key = None
+    if caching_enabled():
+        cache_key = PRIOR_ART_CACHE.make_key("semantic", normalize_query(text), date_key(date_cutoff), top_k, index.cache_token)
+        cached = PRIOR_ART_CACHE.get(cache_key)
+        if cached is not None:
+            return [PriorArtHit(hit) for hit in cached]
+
+    results = [
+        PriorArtHit(doc, similarity_score=round(score, 4))
+        for score, doc in index.search_documents(text, top_k=top_k, date_cutoff=date_cutoff)
+    ]
+    if cache_key is not None:
+        PRIOR_ART_CACHE.set(cache_key, results)
+    return results
 
 if __name__ == "__main__":
     print("--- Patent Search ---")
@@ -0,0 +1,863 @@
+import argparse
+import copy
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import accumulate, repeat
+from patent_suite.tools.text_analysis import tokenize
+from patent_suite.tools.boolean_query import parse_query_or_terms, execute_query, is_term_disjunction, gallop
+from patent_suite.tools.bitmap import DocBitmap
+from patent_suite.tools.cpc_classifier import normalize_cpc, cpc_matches
+from patent_suite.tools.minhash import NUM_HASHES, BANDS, FAMILY_OVERFETCH, minhash_signature, band_keys, collapse_families
+
+# Default on-disk location of the prior-art index. Override with OPENPATENT_PRIOR_ART_INDEX.
+DEFAULT_INDEX_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'prior_art_index')
+
+INDEX_VERSION = 6
+
+# Postings are stored in blocks of this many entries, each with its own skip entry
+POSTING_BLOCK_SIZE = 128
+
+# Sort key for documents without a usable publication date: they sort last and
+# are excluded by any date cutoff, since their prior-art status is unknown.
+UNDATED = 99999999
+
+# BM25 parameters (Robertson/Sparck Jones defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Fields that contribute to the searchable text of a document
+TEXT_FIELDS = ("title", "abstract")
+
+# Small seed corpus used when no index has been built yet (formerly the inline mock registry)
+SAMPLE_CORPUS = [
+    {"id": "US-1234567-A1", "title": "Infrared Toasting Apparatus", "abstract": "A method for toasting food items using a plurality of infrared emitters arranged in a grid.", "date": "2015-05-20", "cpc": ["A47J 37/08", "H05B 3/00"]},
+    {"id": "US-7654321-B2", "title": "Laser-Based Material Processing", "abstract": "A system for rasterizing laser beams to heat substrates with high precision.", "date": "2018-11-12", "cpc": ["B23K 26/08", "H01S 3/00"]},
+    {"id": "EP-9876543-A1", "title": "Non-Contact Heating Device", "abstract": "Device using electromagnetic radiation to heat organic materials without physical contact.", "date": "2010-01-05", "cpc": ["H05B 6/64"]},
+    {"id": "US-1111111-A1", "title": "Smart Toaster with Feedback Loop", "abstract": "A toaster equipped with optical sensors to monitor browning levels in real-time.", "date": "2020-03-15", "cpc": ["A47J 37/0814", "G01N 21/84"]},
+    {"id": "US-2222222-B1", "title": "Directed Energy Heating System", "abstract": "Apparatus for directing energy beams to specific coordinates on a food item.", "date": "2019-07-22", "cpc": ["H05B 6/64", "A47J 36/00"]},
+    {"id": "US-3333333-A1", "title": "Automated Bread Browning Control", "abstract": "Computer-controlled heating elements for uniform bread toasting.", "date": "2017-12-01", "cpc": ["A47J 37/08", "H05B 1/02"]},
+    {"id": "JP-4444444-B2", "title": "High-Efficiency Raster Heating", "abstract": "Method of scanning a surface with a heat source to achieve uniform temperature distribution.", "date": "2016-09-10", "cpc": ["H05B 3/00", "B23K 26/08"]},
+    {"id": "US-5555555-A1", "title": "Precision Thermal Toaster", "abstract": "Toaster using micro-controller units to execute complex heating patterns.", "date": "2021-01-30", "cpc": ["A47J 37/08", "H05B 1/02"]},
+    {"id": "US-6666666-B2", "title": "Laser Rastering for Culinary Applications", "abstract": "Using low-power lasers to brown or cook patterns onto dough-based products.", "date": "2022-05-14", "cpc": ["A21B 1/00", "B23K 26/352"]},
+    {"id": "US-7777777-A1", "title": "Multi-Zone Infrared Cooker", "abstract": "Cooking device with independently controlled infrared zones for variable heating.", "date": "2014-08-08", "cpc": ["F24C 7/04", "H05B 3/00"]},
+    {"id": "US-8888888-B1", "title": "Optical Sensor for Toaster Safety", "abstract": "Sensors that detect burning and automatically shut off power to avoid fires.", "date": "2013-11-25", "cpc": ["A47J 37/0842", "G01N 21/84"]}
+]
+
+
+def document_text(doc):
+    return " ".join(str(doc.get(field, "")) for field in TEXT_FIELDS)
+
+
+def date_key(value):
+    """
+    Converts 'YYYY-MM-DD', 'YYYYMMDD', 'YYYY-MM' or 'YYYY' to a sortable YYYYMMDD int.
+    Missing components sort before any full date of that period ('2024' -> 20240000).
+    Returns None for empty or malformed values.
+    """
+    if value is None:
+        return None
+    digits = re.sub(r"\D", "", str(value))[:8]
+    if len(digits) < 4:
+        return None
+    return int(digits.ljust(8, "0"))
+
+
+def document_cpc_codes(doc):
+    """Normalized CPC codes of a document ("cpc" may be a list or a comma/semicolon separated string)."""
+    codes = doc.get("cpc") or []
+    if isinstance(codes, str):
+        codes = re.split(r"[;,]", codes)
+    return sorted({code for code in (normalize_cpc(c) for c in codes) if code})
+
+
+def top_k_hits(scored, k):
+    """
+    Streaming top-k over (doc_id, score) pairs with a bounded min-heap:
+    O(n log k) time and O(k) memory however many documents match.
+    Equal scores prefer the higher doc id, i.e. the more recent publication.
+    Returns [(score, doc_id)], best first.
+    """
+    if k <= 0:
+        return []
+    heap = []
+    for doc_id, score in scored:
+        entry = (score, doc_id)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+    heap.sort(reverse=True)
+    return heap
+
+
+# Integer widths for block-packed postings: 1, 2 or 4 bytes per value
+PACK_CODES = {1: 'B', 2: 'H', 4: 'I'}
+
+
+def _pack_width(values):
+    largest = max(values, default=0)
+    return 1 if largest < 0x100 else 2 if largest < 0x10000 else 4
+
+
+def encode_postings(doc_ids, tfs, block_size=POSTING_BLOCK_SIZE):
+    """
+    Encodes a posting list as a skip table followed by block-packed blocks.
+
+    Skip table: per block, (first doc id, byte offset of the block from the
+    start of the list), both uint32.
+    Block: doc id width, tf width (one byte each), then the doc id deltas
+    after the first doc id and the term frequencies, each packed at the
+    smallest of 1/2/4 bytes that fits the block's largest value.
+
+    Delta-encoded doc ids mostly fit in one byte, so a posting costs about
+    2 bytes instead of 8, and a reader can skip whole blocks using the table.
+    """
+    block_count = (len(doc_ids) + block_size - 1) // block_size
+    skips = array('I')
+    body = bytearray()
+    table_size = 8 * block_count
+    for start in range(0, len(doc_ids), block_size):
+        ids = doc_ids[start:start + block_size]
+        freqs = tfs[start:start + block_size]
+        deltas = [ids[i] - ids[i - 1] for i in range(1, len(ids))]
+        skips.append(ids[0])
+        skips.append(table_size + len(body))
+        id_width, tf_width = _pack_width(deltas), _pack_width(freqs)
+        body.append(id_width)
+        body.append(tf_width)
+        body += array(PACK_CODES[id_width], deltas).tobytes()
+        body += array(PACK_CODES[tf_width], freqs).tobytes()
+    return skips.tobytes() + bytes(body), block_count
+
+
+def encode_positions(tfs, positions, block_size=POSTING_BLOCK_SIZE):
+    """
+    Encodes the token positions of a posting list, aligned with its posting
+    blocks: a table of per-block byte offsets (uint32), then per block a width
+    byte and the packed position deltas (each document's positions start
+    from 0), tf values per posting.
+    """
+    block_count = (len(tfs) + block_size - 1) // block_size
+    table = array('I')
+    body = bytearray()
+    start = 0
+    for block_start in range(0, len(tfs), block_size):
+        deltas = []
+        for tf in tfs[block_start:block_start + block_size]:
+            previous = 0
+            for position in positions[start:start + tf]:
+                deltas.append(position - previous)
+                previous = position
+            start += tf
+        width = _pack_width(deltas)
+        table.append(4 * block_count + len(body))
+        body.append(width)
+        body += array(PACK_CODES[width], deltas).tobytes()
+    return table.tobytes() + bytes(body)
+
+
+def _map_file(path):
+    """Read-only mmap of a file (None if it is empty), shared through the OS page cache."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _map_array(path, typecode):
+    """Maps a file of fixed-width integers as a read-only sequence (memoryview over an mmap)."""
+    mapped = _map_file(path)
+    if mapped is None:
+        return None, array(typecode)
+    return mapped, memoryview(mapped).cast(typecode)
+
+
+class PriorArtHit(dict):
+    """
+    Read-only search result. Built fresh for every query from the stored
+    fields plus relevance_score, so ranking never writes into shared records.
+    Subclasses dict so results stay JSON-serialisable and subscriptable.
+    """
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("PriorArtHit is read-only; copy it with dict(hit) to modify")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (PriorArtHit, (dict(self),))
+
+
+class IndexWriter:
+    """
+    Builds an on-disk inverted index.
+
+    Layout of an index directory:
+        meta.json      - doc count, average length, format version
+        lexicon.json   - term -> [postings.bin offset, document frequency, block count, positions.bin offset]
+        postings.bin   - per term: skip table and block-packed doc id deltas / term frequencies
+                         (see encode_postings)
+        positions.bin  - per term: token positions for phrase / NEAR queries, one block per
+                         posting block (see encode_positions); only read by such queries
+        lengths.bin    - document lengths in terms (uint32), indexed by doc id
+        dates.bin      - publication date keys (uint32 YYYYMMDD), ascending by doc id
+        docs.jsonl     - stored fields, one document per line
+        docs.idx       - byte offset of each line in docs.jsonl (uint64)
+        cpc.json       - CPC code -> [byte offset into cpc.bin, byte length]
+        cpc.bin        - per CPC code: roaring-style bitmap of doc ids (see DocBitmap)
+        minhash.bin    - MinHash signature per doc id (NUM_HASHES x uint32), for family collapsing
+        lsh.bin        - LSH bucket key per band per doc id (BANDS x uint32)
+    """
+    def __init__(self, index_dir):
+        self.index_dir = index_dir
+        os.makedirs(self.index_dir, exist_ok=True)
+        self.postings = {}
+        self.lengths = array('I')
+        self.dates = array('I')
+        self.doc_offsets = array('Q')
+        self.cpc = {}
+        self.signatures = array('I')
+        self._docs_file = open(os.path.join(self.index_dir, 'docs.jsonl'), 'w', encoding='utf-8')
+        self._docs_pos = 0
+
+    def add_document(self, doc, terms=None):
+        """
+        Adds a document. terms may be passed pre-analyzed (e.g. by bulk-ingest
+        workers); otherwise the title and abstract are tokenized here.
+        """
+        doc_id = len(self.lengths)
+        if terms is None:
+            terms = tokenize(document_text(doc))
+
+        positions = {}
+        for position, term in enumerate(terms):
+            positions.setdefault(term, []).append(position)
+        for term, term_positions in positions.items():
+            entry = self.postings.get(term)
+            if entry is None:
+                entry = self.postings[term] = (array('I'), array('I'), array('I'))
+            entry[0].append(doc_id)
+            entry[1].append(len(term_positions))
+            entry[2].extend(term_positions)
+        for code in document_cpc_codes(doc):
+            self.cpc.setdefault(code, array('I')).append(doc_id)
+        self.signatures.extend(minhash_signature(terms))
+
+        self.lengths.append(len(terms))
+        key = date_key(doc.get("date"))
+        self.dates.append(UNDATED if key is None else key)
+        line = json.dumps(doc, ensure_ascii=False) + "\n"
+        encoded = line.encode('utf-8')
+        self.doc_offsets.append(self._docs_pos)
+        self._docs_file.write(line)
+        self._docs_pos += len(encoded)
+        return doc_id
+
+    def _renumber_by_date(self):
+        """
+        Reassigns doc ids in ascending publication-date order, so every posting
+        list is also date-ordered and a date cutoff becomes a doc id bound.
+        Bulk dumps usually arrive in date order, in which case this is a no-op.
+        """
+        dates = self.dates
+        if all(dates[i] <= dates[i + 1] for i in range(len(dates) - 1)):
+            return
+        order = sorted(range(len(dates)), key=lambda d: (dates[d], d))
+        new_ids = array('I', bytes(4 * len(order)))
+        for new_id, old_id in enumerate(order):
+            new_ids[old_id] = new_id
+
+        for term, (doc_ids, tfs, positions) in self.postings.items():
+            chunks = []
+            start = 0
+            for doc_id, tf in zip(doc_ids, tfs):
+                chunks.append((new_ids[doc_id], tf, positions[start:start + tf]))
+                start += tf
+            chunks.sort(key=lambda chunk: chunk[0])
+            self.postings[term] = (
+                array('I', (c[0] for c in chunks)),
+                array('I', (c[1] for c in chunks)),
+                array('I', (p for c in chunks for p in c[2]))
+            )
+        for code, doc_ids in self.cpc.items():
+            self.cpc[code] = array('I', sorted(new_ids[d] for d in doc_ids))
+        signatures = self.signatures
+        self.signatures = array('I', (v for d in order for v in signatures[d * NUM_HASHES:(d + 1) * NUM_HASHES]))
+        self.lengths = array('I', (self.lengths[d] for d in order))
+        self.dates = array('I', (dates[d] for d in order))
+        self.doc_offsets = array('Q', (self.doc_offsets[d] for d in order))
+
+    def close(self):
+        self._docs_file.close()
+        self._renumber_by_date()
+
+        lexicon = {}
+        with open(os.path.join(self.index_dir, 'postings.bin'), 'wb') as f, \
+                open(os.path.join(self.index_dir, 'positions.bin'), 'wb') as pf:
+            offset = pos_offset = 0
+            for term in sorted(self.postings):
+                doc_ids, tfs, positions = self.postings[term]
+                data, block_count = encode_postings(doc_ids, tfs)
+                lexicon[term] = [offset, len(doc_ids), block_count, pos_offset]
+                f.write(data)
+                offset += len(data)
+                pos_data = encode_positions(tfs, positions)
+                pf.write(pos_data)
+                pos_offset += len(pos_data)
+
+        with open(os.path.join(self.index_dir, 'lexicon.json'), 'w') as f:
+            json.dump(lexicon, f)
+
+        cpc_lexicon = {}
+        with open(os.path.join(self.index_dir, 'cpc.bin'), 'wb') as f:
+            offset = 0
+            for code in sorted(self.cpc):
+                data = DocBitmap.from_sorted(self.cpc[code]).to_bytes()
+                cpc_lexicon[code] = [offset, len(data)]
+                f.write(data)
+                offset += len(data)
+        with open(os.path.join(self.index_dir, 'cpc.json'), 'w') as f:
+            json.dump(cpc_lexicon, f)
+        with open(os.path.join(self.index_dir, 'lengths.bin'), 'wb') as f:
+            self.lengths.tofile(f)
+        with open(os.path.join(self.index_dir, 'dates.bin'), 'wb') as f:
+            self.dates.tofile(f)
+        with open(os.path.join(self.index_dir, 'docs.idx'), 'wb') as f:
+            self.doc_offsets.tofile(f)
+        with open(os.path.join(self.index_dir, 'minhash.bin'), 'wb') as f:
+            self.signatures.tofile(f)
+        with open(os.path.join(self.index_dir, 'lsh.bin'), 'wb') as f:
+            for start in range(0, len(self.signatures), NUM_HASHES):
+                band_keys(self.signatures[start:start + NUM_HASHES]).tofile(f)
+
+        doc_count = len(self.lengths)
+        meta = {
+            "version": INDEX_VERSION,
+            "byteorder": sys.byteorder,
+            "doc_count": doc_count,
+            "avg_doc_length": (sum(self.lengths) / doc_count) if doc_count else 0.0,
+            "term_count": len(lexicon),
+            "cpc_count": len(cpc_lexicon)
+        }
+        # meta.json is written last so a partially built directory is never loadable
+        with open(os.path.join(self.index_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=4)
+        return meta
+
+
+class PriorArtIndex:
+    """
+    Read-only view of an index built by IndexWriter.
+    Only the lexicon is loaded into process memory. Postings, stored documents,
+    document lengths and dates are memory-mapped, so every process serving the
+    same index (e.g. several Django workers) shares one copy through the OS
+    page cache, and query cost follows the posting blocks actually touched.
+    """
+    def __init__(self, index_dir):
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, 'meta.json'), 'r') as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported prior-art index version {self.meta.get('version')} in {index_dir}")
+        if self.meta.get("byteorder") != sys.byteorder:
+            raise ValueError(f"Prior-art index {index_dir} was built on a {self.meta.get('byteorder')}-endian machine")
+
+        with open(os.path.join(index_dir, 'lexicon.json'), 'r') as f:
+            self.lexicon = json.load(f)
+        with open(os.path.join(index_dir, 'cpc.json'), 'r') as f:
+            self.cpc_lexicon = json.load(f)
+        self.cpc_codes = sorted(self.cpc_lexicon)
+
+        self._maps = []
+        self.lengths = self._map_array('lengths.bin', 'I')
+        self.dates = self._map_array('dates.bin', 'I')
+        self.doc_offsets = self._map_array('docs.idx', 'Q')
+        self.signatures = self._map_array('minhash.bin', 'I')
+        self.band_keys = self._map_array('lsh.bin', 'I')
+        self._postings = _map_file(os.path.join(index_dir, 'postings.bin'))
+        self._docs = _map_file(os.path.join(index_dir, 'docs.jsonl'))
+        self._cpc = _map_file(os.path.join(index_dir, 'cpc.bin'))
+        # Mapped on the first phrase / NEAR query
+        self._positions = None
+
+        self.doc_count = self.meta["doc_count"]
+        self.avg_doc_length = self.meta["avg_doc_length"] or 1.0
+        # Collection statistics used for BM25 (doc_count, avg_doc_length, doc_freq).
+        # A multi-segment index points this at itself so every segment scores
+        # with corpus-wide statistics.
+        self.stats = self
+        # Tombstoned doc ids (set by SegmentedPriorArtIndex); never returned by searches
+        self.deleted = frozenset()
+        # Changes whenever the index is rebuilt; part of every search cache key
+        self.cache_token = f"{os.path.abspath(index_dir)}@{os.stat(os.path.join(index_dir, 'meta.json')).st_mtime_ns}"
+        # Posting lists decoded once for a whole query batch (see search_batch)
+        self._shared_postings = None
+        self._shared_limit = 0
+
+    def _map_positions(self):
+        if self._positions is None:
+            self._positions = _map_file(os.path.join(self.index_dir, 'positions.bin'))
+        return self._positions
+
+    def scoring_view(self, stats, deleted):
+        """
+        Shallow copy that scores with other collection statistics and
+        tombstones, leaving this index untouched. It shares the open files,
+        which this index still owns and closes.
+        """
+        self._map_positions()
+        view = copy.copy(self)
+        view.stats = stats
+        view.deleted = deleted
+        return view
+
+    def _map_array(self, name, typecode):
+        mapped, view = _map_array(os.path.join(self.index_dir, name), typecode)
+        if mapped is not None:
+            self._maps.append((mapped, view))
+        return view
+
+    def doc_freq(self, term):
+        entry = self.lexicon.get(term)
+        return entry[1] if entry else 0
+
+    def doc_limit(self, date_cutoff=None):
+        """
+        Doc id bound for a priority-date cutoff: ids below it were published
+        strictly before the cutoff. Because ids are assigned in date order,
+        everything at or past the bound is skipped without being read or scored.
+        """
+        key = date_key(date_cutoff)
+        if key is None:
+            if date_cutoff:
+                raise ValueError(f"Invalid date cutoff: {date_cutoff!r}")
+            return self.doc_count
+        return bisect_left(self.dates, key)
+
+    def _skips(self, entry):
+        offset, _, block_count = entry[:3]
+        skips = array('I', self._postings[offset:offset + 8 * block_count])
+        return skips, skips[0::2]
+
+    def _decode_block(self, entry, skips, block):
+        """Decodes one posting block to (doc_ids, term_frequencies)."""
+        offset, df = entry[:2]
+        data = self._postings
+        count = min(POSTING_BLOCK_SIZE, df - block * POSTING_BLOCK_SIZE)
+        pos = offset + skips[2 * block + 1]
+        id_width, tf_width = data[pos], data[pos + 1]
+        pos += 2
+        deltas = array(PACK_CODES[id_width], data[pos:pos + id_width * (count - 1)])
+        pos += id_width * (count - 1)
+        doc_ids = list(accumulate(deltas, initial=skips[2 * block]))
+        return doc_ids, array(PACK_CODES[tf_width], data[pos:pos + tf_width * count]).tolist()
+
+    @staticmethod
+    def _candidate_blocks(firsts, candidates, limit=None):
+        """Posting blocks that can contain any of the sorted candidate doc ids."""
+        blocks = []
+        for doc_id in candidates:
+            if limit is not None and doc_id >= limit:
+                break
+            block = bisect_left(firsts, doc_id + 1) - 1
+            if block >= 0 and (not blocks or blocks[-1] != block):
+                blocks.append(block)
+        return blocks
+
+    def postings(self, term, limit=None, candidates=None):
+        """
+        Returns (doc_ids, term_frequencies) for a term, both sorted by doc id.
+        If limit is given, only postings with doc_id < limit are returned.
+        If candidates (a sorted doc id array) is given, blocks that cannot
+        contain any of them are skipped without being decoded, so the result
+        holds every candidate posting but not necessarily the rest of the list.
+        """
+        shared = self._shared_postings.get(term) if self._shared_postings else None
+        bound = self.doc_count if limit is None else limit
+        if shared is not None and bound <= self._shared_limit:
+            count = bisect_left(shared[0], bound)
+            return shared[0][:count], shared[1][:count]
+
+        doc_ids, tfs = array('I'), array('I')
+        entry = self.lexicon.get(term)
+        if entry is None:
+            return doc_ids, tfs
+        skips, firsts = self._skips(entry)
+        if candidates is None:
+            blocks = range(entry[2] if limit is None else bisect_left(firsts, limit))
+        else:
+            blocks = self._candidate_blocks(firsts, candidates, limit)
+
+        for block in blocks:
+            block_ids, block_tfs = self._decode_block(entry, skips, block)
+            doc_ids.fromlist(block_ids)
+            tfs.fromlist(block_tfs)
+
+        if limit is not None and doc_ids and doc_ids[-1] >= limit:
+            count = bisect_left(doc_ids, limit)
+            del doc_ids[count:]
+            del tfs[count:]
+        return doc_ids, tfs
+
+    def positions(self, term, doc_ids):
+        """
+        Returns {doc_id: [token positions]} for the given sorted doc ids that
+        contain term. Only the position blocks of the posting blocks holding
+        those documents are decoded.
+        """
+        entry = self.lexicon.get(term)
+        if entry is None:
+            return {}
+        data = self._map_positions()
+        pos_offset = entry[3]
+        skips, firsts = self._skips(entry)
+        table = array('I', data[pos_offset:pos_offset + 4 * entry[2]])
+        wanted = set(doc_ids)
+
+        found = {}
+        for block in self._candidate_blocks(firsts, doc_ids):
+            block_ids, block_tfs = self._decode_block(entry, skips, block)
+            pos = pos_offset + table[block]
+            width = data[pos]
+            deltas = array(PACK_CODES[width], data[pos + 1:pos + 1 + width * sum(block_tfs)])
+            start = 0
+            for doc_id, tf in zip(block_ids, block_tfs):
+                if doc_id in wanted:
+                    found[doc_id] = list(accumulate(deltas[start:start + tf]))
+                start += tf
+        return found
+
+    def cpc_bitmap(self, code):
+        entry = self.cpc_lexicon.get(code)
+        if entry is None:
+            return DocBitmap()
+        offset, length = entry
+        return DocBitmap.from_bytes(self._cpc[offset:offset + length])
+
+    def cpc_filter(self, codes, limit=None):
+        """
+        Sorted doc ids (< limit) classified under any of the given CPC codes or
+        prefixes. A prefix ORs the bitmaps of every code beneath it, e.g.
+        'A47J 37' covers 'A47J 37/08' and 'A47J 37/10'.
+        """
+        bitmaps = []
+        for prefix in {normalize_cpc(code) for code in codes} - {None}:
+            start = bisect_left(self.cpc_codes, prefix.split("/")[0] if prefix.endswith("/00") else prefix)
+            for code in self.cpc_codes[start:]:
+                if not code.startswith(prefix.split(" ")[0]):
+                    break
+                if cpc_matches(code, prefix):
+                    bitmaps.append(self.cpc_bitmap(code))
+        return DocBitmap.union_all(bitmaps).to_array(limit)
+
+    def idf(self, term):
+        stats = self.stats
+        df = stats.doc_freq(term)
+        return math.log(1.0 + (stats.doc_count - df + 0.5) / (df + 0.5))
+
+    def _bm25(self, doc_id, tf, idf):
+        norm = BM25_K1 * (1.0 - BM25_B + BM25_B * self.lengths[doc_id] / self.stats.avg_doc_length)
+        return idf * tf * (BM25_K1 + 1.0) / (tf + norm)
+
+    def iter_scores(self, terms, candidates=None, limit=None):
+        """
+        Document-at-a-time BM25 scoring. Yields (doc_id, score) in doc id order
+        without materialising a score table, so ranking memory stays bounded.
+        Without candidates, the posting lists are k-way merged (disjunction).
+        With candidates (a sorted doc id array), only those documents are
+        scored, only the posting blocks that can hold them are decoded, and
+        each decoded list is probed by galloping.
+        Documents with doc_id >= limit are never scored.
+        """
+        lists = []
+        for term in dict.fromkeys(terms):
+            doc_ids, tfs = self.postings(term, limit, candidates)
+            if doc_ids:
+                lists.append((doc_ids, tfs, self.idf(term)))
+
+        if candidates is None:
+            current, score = None, 0.0
+            streams = [zip(doc_ids, tfs, repeat(idf)) for doc_ids, tfs, idf in lists]
+            for doc_id, tf, idf in heapq.merge(*streams):
+                if doc_id != current:
+                    if current is not None:
+                        yield current, score
+                    current, score = doc_id, 0.0
+                score += self._bm25(doc_id, tf, idf)
+            if current is not None:
+                yield current, score
+            return
+
+        cursors = [0] * len(lists)
+        for doc_id in candidates:
+            score = 0.0
+            for i, (doc_ids, tfs, idf) in enumerate(lists):
+                j = cursors[i] = gallop(doc_ids, doc_id, cursors[i])
+                if j < len(doc_ids) and doc_ids[j] == doc_id:
+                    score += self._bm25(doc_id, tfs[j], idf)
+            yield doc_id, score
+
+    def get_document(self, doc_id):
+        start = self.doc_offsets[doc_id]
+        end = self._docs.find(b"\n", start)
+        return json.loads(self._docs[start:end if end >= 0 else len(self._docs)].decode('utf-8'))
+
+    def find_doc_ids(self, publication_ids):
+        """
+        Maps publication numbers to local doc ids by scanning the doc store.
+        Linear in the index size; used for deletions, not on the query path.
+        """
+        wanted = set(publication_ids)
+        local_ids = {offset: doc_id for doc_id, offset in enumerate(self.doc_offsets)}
+        found = {}
+        offset = 0
+        with open(os.path.join(self.index_dir, 'docs.jsonl'), 'rb') as f:
+            for line in f:
+                pub_id = json.loads(line.decode('utf-8')).get("id")
+                if pub_id in wanted:
+                    found[pub_id] = local_ids[offset]
+                offset += len(line)
+        return found
+
+    def iter_matches(self, query, default_operator="OR", date_cutoff=None, cpc=None):
+        """
+        Parses a boolean query and yields (doc_id, bm25_score) for every matching
+        document published before date_cutoff. A query that does not parse is
+        matched as an OR of its terms. Plain keyword lists are merged
+        directly; structured queries are first reduced to a candidate set by the
+        planner. With cpc (a list of CPC codes or prefixes), the classification
+        bitmap is resolved first and only documents in it are matched and scored.
+        """
+        node = parse_query_or_terms(query, default_operator)
+        if node is None:
+            return iter(())
+        limit = self.doc_limit(date_cutoff)
+        if limit == 0:
+            return iter(())
+        terms = node.positive_terms()
+        if cpc:
+            allowed = self.cpc_filter(cpc, limit)
+            if is_term_disjunction(node):
+                # Candidate scoring yields every allowed doc; keep those matching a term
+                scored = ((doc_id, score) for doc_id, score in self.iter_scores(terms, allowed, limit) if score > 0)
+            else:
+                scored = self.iter_scores(terms, execute_query(node, self, limit, allowed), limit)
+        elif is_term_disjunction(node):
+            scored = self.iter_scores(terms, limit=limit)
+        else:
+            scored = self.iter_scores(terms, execute_query(node, self, limit), limit)
+        deleted = self.deleted
+        if deleted:
+            scored = ((doc_id, score) for doc_id, score in scored if doc_id not in deleted)
+        return scored
+
+    def match(self, query, default_operator="OR", date_cutoff=None, cpc=None):
+        """Returns {doc_id: bm25_score} for every matching document."""
+        return dict(self.iter_matches(query, default_operator, date_cutoff, cpc))
+
+    def search(self, query, top_k=10, date_cutoff=None, cpc=None):
+        """
+        Ranks documents matching a boolean query with BM25, restricted to
+        documents published before date_cutoff (and classified under cpc, if given).
+        Returns a list of (score, doc_id), best first.
+        """
+        return top_k_hits(self.iter_matches(query, date_cutoff=date_cutoff, cpc=cpc), top_k)
+
+    def search_documents(self, query, top_k=10, date_cutoff=None, cpc=None, collapse=False):
+        """
+        Like search(), but returns [(score, stored_fields)]. This is the interface
+        shared with ShardedPriorArtIndex, whose doc ids are only meaningful per shard.
+        With collapse=True, near-duplicate family members are folded into their
+        best-ranked member's "family_members" list (see collapse_families).
+        """
+        if collapse:
+            return collapse_families(self.search_signed(query, top_k * FAMILY_OVERFETCH, date_cutoff, cpc), top_k)
+        return [(score, self.get_document(doc_id)) for score, doc_id in self.search(query, top_k, date_cutoff, cpc)]
+
+    def search_signed(self, query, top_k=10, date_cutoff=None, cpc=None):
+        """Like search_documents(), but each hit also carries its MinHash signature and LSH band keys."""
+        return [
+            (score, self.get_document(doc_id),
+             self.signatures[doc_id * NUM_HASHES:(doc_id + 1) * NUM_HASHES].tolist(),
+             self.band_keys[doc_id * BANDS:(doc_id + 1) * BANDS].tolist())
+            for score, doc_id in self.search(query, top_k, date_cutoff, cpc)
+        ]
+
+    def search_batch(self, specs, top_k=10, signed=False):
+        """
+        Runs many searches at once. specs are dicts with "query" and optional
+        "date_cutoff" / "cpc". All queries are parsed up front and every term
+        used by more than one of them is decoded once, up to the latest cutoff;
+        the queries then run one after another against those shared posting
+        lists. Scoring is pure Python, so threads would not add throughput;
+        a ShardedPriorArtIndex spreads a batch over one process per shard.
+        Returns one search_documents() (or search_signed()) list per spec, in order.
+        """
+        specs = list(specs)
+        limits, term_counts = [], Counter()
+        for spec in specs:
+            node = parse_query_or_terms(spec["query"])
+            limits.append(self.doc_limit(spec.get("date_cutoff")))
+            if node is not None:
+                term_counts.update(set(node.positive_terms()))
+
+        view = copy.copy(self)
+        view._shared_limit = max(limits, default=0)
+        view._shared_postings = {
+            term: self.postings(term, view._shared_limit) for term, count in term_counts.items() if count > 1
+        }
+        search = view.search_signed if signed else view.search_documents
+
+        results = [search(spec["query"], top_k, spec.get("date_cutoff"), spec.get("cpc")) for spec in specs]
+        if self._positions is None and view._positions is not None:
+            # Keep the positions mapped by the batch so close() releases it
+            self._positions = view._positions
+        return results
+
+    def search_documents_batch(self, specs, top_k=10, collapse=False):
+        """search_documents() for many specs (see search_batch); one result list per spec, in order."""
+        if collapse:
+            signed = self.search_batch(specs, top_k * FAMILY_OVERFETCH, signed=True)
+            return [collapse_families(hits, top_k) for hits in signed]
+        return self.search_batch(specs, top_k)
+
+    def close(self):
+        # Views must be released before their mmap can be closed
+        for mapped, view in self._maps:
+            view.release()
+            mapped.close()
+        self._maps = []
+        for mapped in (self._postings, self._docs, self._cpc, self._positions):
+            if mapped is not None:
+                mapped.close()
+        self._postings = self._docs = self._cpc = self._positions = None
+
+
+def build_index(docs, index_dir):
+    """
+    Builds an index from an iterable of document dicts (id, title, abstract, date, ...).
+    """
+    writer = IndexWriter(index_dir)
+    for doc in docs:
+        writer.add_document(doc)
+    return writer.close()
+
+
+def iter_documents(path):
+    """
+    Yields documents from a JSON list file or a JSON-lines file.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first == '[':
+            for doc in json.load(f):
+                yield doc
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+_OPEN_INDEXES = {}
+
+def get_prior_art_index(index_dir=None):
+    """
+    Returns a cached index for index_dir (default: OPENPATENT_PRIOR_ART_INDEX or
+    DEFAULT_INDEX_DIR): a ShardedPriorArtIndex with warm shard workers if the
+    directory holds a sharded layout, a SegmentedPriorArtIndex for bulk-ingested
+    segments, otherwise a PriorArtIndex. If no index has been built there, a
+    temporary index over the sample corpus is built so the tool keeps working
+    out of the box.
+    """
+    from patent_suite.tools.sharded_index import ShardedPriorArtIndex, is_sharded_index
+    from patent_suite.tools.segments import open_index, is_index_dir
+
+    if index_dir is None:
+        index_dir = os.getenv("OPENPATENT_PRIOR_ART_INDEX", DEFAULT_INDEX_DIR)
+    index = _OPEN_INDEXES.get(index_dir)
+    if index is not None:
+        return index
+
+    if is_sharded_index(index_dir):
+        index = ShardedPriorArtIndex(index_dir, keep_warm=True)
+    elif is_index_dir(index_dir):
+        index = open_index(index_dir)
+    else:
+        print(f"PriorArtIndex: No index at {index_dir}. Building a sample index (run 'prior_art_index build' for a real corpus).")
+        sample_dir = tempfile.mkdtemp(prefix="prior_art_index_")
+        build_index(SAMPLE_CORPUS, sample_dir)
+        index = PriorArtIndex(sample_dir)
+    _OPEN_INDEXES[index_dir] = index
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and query the local prior-art index.")
+    parser.add_argument("--index", default=os.getenv("OPENPATENT_PRIOR_ART_INDEX", DEFAULT_INDEX_DIR), help="Index directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build_cmd = sub.add_parser("build", help="Build an index from JSON / JSON-lines documents")
+    build_cmd.add_argument("inputs", nargs="*", help="Input files (default: built-in sample corpus)")
+    build_cmd.add_argument("--shards", type=int, default=1, help="Split the index into N shards searched in parallel")
+
+    search_cmd = sub.add_parser("search", help="Run a BM25 query against the index")
+    search_cmd.add_argument("query", help="Keywords or a boolean query, e.g. \"(laser AND toasting) OR heating\"")
+    search_cmd.add_argument("--top-k", type=int, default=10)
+    search_cmd.add_argument("--cutoff", help="Priority date (YYYY-MM-DD); only earlier art is returned")
+    search_cmd.add_argument("--cpc", action="append", help="Restrict to a CPC code or prefix (repeatable), e.g. \"A47J 37\"")
+
+    batch_cmd = sub.add_parser("batch", help="Run many queries in one batch (e.g. overnight portfolio reviews)")
+    batch_cmd.add_argument("queries", help="Text file with one query per line, or JSON lines with \"query\" and optional \"date_cutoff\" / \"cpc\" / \"id\"")
+    batch_cmd.add_argument("--out", help="Write JSON-lines results here (default: stdout)")
+    batch_cmd.add_argument("--top-k", type=int, default=10)
+    batch_cmd.add_argument("--cutoff", help="Default priority date for queries without their own")
+    batch_cmd.add_argument("--cpc", action="append", help="Default CPC restriction (repeatable)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        if args.inputs:
+            docs = (doc for path in args.inputs for doc in iter_documents(path))
+        else:
+            docs = iter(SAMPLE_CORPUS)
+        if args.shards > 1:
+            from patent_suite.tools.sharded_index import build_sharded_index
+            meta = build_sharded_index(docs, args.index, args.shards)
+        else:
+            meta = build_index(docs, args.index)
+        print(f"PriorArtIndex: Indexed {meta['doc_count']} documents ({meta['term_count']} terms) into {args.index}")
+    elif args.command == "search":
+        index = get_prior_art_index(args.index)
+        for score, doc in index.search_documents(args.query, top_k=args.top_k, date_cutoff=args.cutoff, cpc=args.cpc):
+            print(f"{score:8.4f}  {doc.get('id')}  {doc.get('title')}")
+    elif args.command == "batch":
+        from patent_suite.tools.patents_search import search_prior_art_batch
+        with open(args.queries, 'r', encoding='utf-8') as f:
+            lines = [line.strip() for line in f if line.strip()]
+        queries = [json.loads(line) if line.startswith("{") else {"query": line} for line in lines]
+        results = search_prior_art_batch(queries, date_cutoff=args.cutoff, top_k=args.top_k, index_dir=args.index, cpc=args.cpc)
+        out = open(args.out, 'w', encoding='utf-8') if args.out else sys.stdout
+        try:
+            for query, hits in zip(queries, results):
+                out.write(json.dumps({"id": query.get("id"), "query": query["query"], "results": hits}) + "\n")
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        print(f"PriorArtIndex: Answered {len(queries)} queries", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import threading
+import zlib
+
+# Blobs live under the workspaces directory. Override with OPENPATENT_RESPONSE_CACHE_DIR;
+# set OPENPATENT_RESPONSE_CACHE=0 to bypass caching entirely.
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'workspaces', '.response_cache')
+
+# Clients send this header (or Cache-Control: no-cache) to force a fresh response
+NO_CACHE_HEADER = "X-OpenPatent-No-Cache"
+
+
+def caching_enabled():
+    return os.getenv("OPENPATENT_RESPONSE_CACHE", "1").lower() not in ("0", "false", "no", "off")
+
+
+def canonical_payload(payload):
+    """Key order and whitespace between JSON tokens never change the cache key."""
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def wants_fresh_response(headers):
+    """True if a request's headers opt out of the response cache."""
+    if str(headers.get(NO_CACHE_HEADER, "")).lower() in ("1", "true", "yes"):
+        return True
+    return "no-cache" in str(headers.get("Cache-Control", "")).lower()
+
+
+class ResponseCache:
+    """
+    Content-addressed cache of agent responses: the key is a SHA-256 of the
+    agent name and canonical payload, the value a zlib-compressed JSON blob at
+    <cache_dir>/<key[:2]>/<key>.json.z. Entries never expire (the same payload
+    gets the same answer); once the blobs exceed max_bytes, the least recently
+    read ones are removed. Only successful responses should be stored.
+    """
+    def __init__(self, cache_dir=None, max_bytes=128 * 1024 * 1024):
+        self.cache_dir = cache_dir or os.getenv("OPENPATENT_RESPONSE_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bytes = None
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(agent_name, payload):
+        return hashlib.sha256(f"{agent_name}\0{canonical_payload(payload)}".encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".json.z")
+
+    def get(self, key):
+        """Returns the cached response or None."""
+        path = self._path(key)
+        with self._lock:
+            try:
+                with open(path, 'rb') as f:
+                    value = json.loads(zlib.decompress(f.read()))
+            except (OSError, ValueError, zlib.error):
+                self.counters["misses"] += 1
+                return None
+            # Refresh mtime so eviction is least-recently-used rather than oldest-written
+            os.utime(path, None)
+            self.counters["hits"] += 1
+            return value
+
+    def set(self, key, value):
+        path = self._path(key)
+        data = zlib.compress(canonical_payload(value).encode('utf-8'), 6)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+
+            if self._bytes is None:
+                self._bytes = sum(size for _, size, _ in self._entries())
+            else:
+                self._bytes += len(data) - old_size
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json.z"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, st.st_size, st.st_mtime
+
+    def _evict(self):
+        """Drops the least recently used blobs until the cache is back under 90% of max_bytes."""
+        target = int(self.max_bytes * 0.9)
+        for path, size, _ in sorted(self._entries(), key=lambda e: e[2]):
+            if self._bytes <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._bytes -= size
+            self.counters["evictions"] += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return dict(self.counters, hit_rate=(self.counters["hits"] / lookups) if lookups else 0.0)
+
+
+# Shared instance used by the remote agents
+RESPONSE_CACHE = ResponseCache()
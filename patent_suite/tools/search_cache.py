@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Default location of the on-disk tier. Override with OPENPATENT_SEARCH_CACHE_DIR;
+# set OPENPATENT_SEARCH_CACHE=0 to bypass caching entirely.
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'search_cache')
+
+
+def normalize_query(query):
+    """Case- and whitespace-insensitive form of a search query, used in cache keys."""
+    return " ".join(str(query).lower().split())
+
+
+def caching_enabled():
+    return os.getenv("OPENPATENT_SEARCH_CACHE", "1").lower() not in ("0", "false", "no", "off")
+
+
+class SearchCache:
+    """
+    Two-tier cache for search results: an in-memory LRU in front of a directory
+    of JSON files. Both tiers expire entries after ttl seconds; the memory tier
+    holds at most max_entries and the disk tier at most max_disk_bytes (least
+    recently used files are evicted first). Values must be JSON-serialisable.
+    """
+    def __init__(self, name, max_entries=256, ttl=24 * 3600, cache_dir=None, max_disk_bytes=64 * 1024 * 1024):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+        base_dir = cache_dir or os.getenv("OPENPATENT_SEARCH_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.disk_dir = os.path.join(base_dir, name) if base_dir else None
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = None
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(*parts):
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key + ".json")
+
+    def get(self, key):
+        """Returns the cached value or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.counters["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            record = self._read_disk(key, now)
+            if record is not None:
+                self.counters["disk_hits"] += 1
+                # Promoted with the disk entry's own expiry, not a fresh ttl
+                self._remember(key, record["value"], record["expires_at"])
+                return record["value"]
+
+            self.counters["misses"] += 1
+            return None
+
+    def set(self, key, value):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+            self._write_disk(key, value, expires_at)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self.disk_dir and os.path.isdir(self.disk_dir):
+                for path, _, _ in self._disk_entries():
+                    self._remove_disk(path)
+            self._disk_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.counters["memory_hits"] + self.counters["disk_hits"] + self.counters["misses"]
+            hits = lookups - self.counters["misses"]
+            return dict(self.counters, entries=len(self._memory), hit_rate=(hits / lookups) if lookups else 0.0)
+
+    # --- memory tier ---
+
+    def _remember(self, key, value, expires_at):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    # --- disk tier ---
+
+    def _read_disk(self, key, now):
+        """The unexpired {"expires_at", "value"} record for key, or None."""
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if record.get("expires_at", 0) <= now or record.get("value") is None:
+            self._remove_disk(path)
+            return None
+        # Refresh mtime so eviction is least-recently-used rather than oldest-written
+        os.utime(path, None)
+        return record
+
+    def _write_disk(self, key, value, expires_at):
+        if not self.disk_dir:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps({"expires_at": expires_at, "value": value}).encode('utf-8')
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp_path, path)
+
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+        else:
+            self._disk_bytes += len(data) - old_size
+        if self._disk_bytes > self.max_disk_bytes:
+            self._evict_disk()
+
+    def _disk_entries(self):
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, st.st_size, st.st_mtime
+
+    def _remove_disk(self, path):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        if self._disk_bytes is not None:
+            self._disk_bytes -= size
+
+    def _evict_disk(self):
+        """Drops the least recently used files until the tier is back under 90% of its budget."""
+        entries = sorted(self._disk_entries(), key=lambda e: e[2])
+        target = int(self.max_disk_bytes * 0.9)
+        for path, _, _ in entries:
+            if self._disk_bytes <= target:
+                break
+            self._remove_disk(path)
+            self.counters["evictions"] += 1
+
+
+# Shared instances used by the search tools
+PRIOR_ART_CACHE = SearchCache("prior_art", ttl=24 * 3600)
+NON_PATENT_CACHE = SearchCache("non_patent", ttl=7 * 24 * 3600)
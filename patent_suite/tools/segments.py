@@ -0,0 +1,470 @@
+import argparse
+import json
+import math
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from patent_suite.tools.prior_art_index import IndexWriter, PriorArtIndex, DEFAULT_INDEX_DIR, iter_documents
+from patent_suite.tools.sharded_index import merge_shard_results
+from patent_suite.tools.minhash import FAMILY_OVERFETCH, collapse_families
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the in-process lock only
+    fcntl = None
+
+# LSM-style layout: immutable segment directories plus a manifest naming the
+# live ones. Writers add segments, the merger replaces groups of segments with
+# one merged segment, and deletions are tombstones (per-segment deleted doc
+# ids) until a merge drops the documents for good. Every change publishes a
+# new manifest generation atomically; readers switch to it on refresh.
+SEGMENTS_MANIFEST = 'segments.json'
+SEGMENTS_VERSION = 1
+LOCK_FILE = 'write.lock'
+
+# Tiered merge policy defaults
+MERGE_FACTOR = 10
+MIN_SEGMENT_DOCS = 1000
+MAX_SEGMENT_DOCS = 5000000
+MAX_DELETED_RATIO = 0.3
+
+_PROCESS_LOCK = threading.RLock()
+
+
+def is_segmented_index(index_dir):
+    return os.path.exists(os.path.join(index_dir, SEGMENTS_MANIFEST))
+
+
+def is_index_dir(index_dir):
+    return is_segmented_index(index_dir) or os.path.exists(os.path.join(index_dir, 'meta.json'))
+
+
+def open_index(index_dir):
+    """Opens a segmented index directory or a single PriorArtIndex directory."""
+    if is_segmented_index(index_dir):
+        return SegmentedPriorArtIndex(index_dir)
+    return PriorArtIndex(index_dir)
+
+
+def new_segment_name():
+    return f"segment-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def live_doc_count(entry):
+    return entry["doc_count"] - len(entry.get("deleted", ()))
+
+
+@contextmanager
+def manifest_lock(index_dir):
+    """Serialises manifest read-modify-write cycles across threads and processes."""
+    with _PROCESS_LOCK:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(index_dir, exist_ok=True)
+        with open(os.path.join(index_dir, LOCK_FILE), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def read_manifest(index_dir):
+    path = os.path.join(index_dir, SEGMENTS_MANIFEST)
+    if not os.path.exists(path):
+        return {"version": SEGMENTS_VERSION, "generation": 0, "segments": []}
+    with open(path, 'r') as f:
+        manifest = json.load(f)
+    if manifest.get("version") != SEGMENTS_VERSION:
+        raise ValueError(f"Unsupported segment manifest version {manifest.get('version')} in {index_dir}")
+    return manifest
+
+
+def write_manifest(index_dir, manifest):
+    """
+    Publishes a new manifest generation atomically (write + rename), so readers
+    see either the old or the new segment list, never a partial one.
+    Call with manifest_lock held.
+    """
+    manifest["generation"] = manifest.get("generation", 0) + 1
+    manifest["doc_count"] = sum(live_doc_count(seg) for seg in manifest["segments"])
+    path = os.path.join(index_dir, SEGMENTS_MANIFEST)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(tmp_path, path)
+    return manifest
+
+
+def _tombstone(index_dir, manifest, publication_ids):
+    """Marks every live copy of the given publication numbers deleted. Returns the count."""
+    remaining = set(publication_ids)
+    deleted = 0
+    for entry in manifest["segments"]:
+        if not remaining:
+            break
+        segment = PriorArtIndex(os.path.join(index_dir, entry["name"]))
+        try:
+            found = segment.find_doc_ids(remaining)
+        finally:
+            segment.close()
+        already = set(entry.get("deleted", ()))
+        new_ids = set(found.values()) - already
+        if new_ids:
+            entry["deleted"] = sorted(already | new_ids)
+            deleted += len(new_ids)
+    return deleted
+
+
+def delete_documents(index_dir, publication_ids):
+    """Tombstones documents by publication number. They disappear from searches on the next refresh."""
+    with manifest_lock(index_dir):
+        manifest = read_manifest(index_dir)
+        count = _tombstone(index_dir, manifest, publication_ids)
+        if count:
+            write_manifest(index_dir, manifest)
+    return count
+
+
+class SegmentWriter:
+    """
+    Writes documents into a series of immutable segments of at most
+    segment_size documents each, so building an index of any size needs only
+    one segment's worth of postings in memory. New segments become visible when
+    commit() publishes them in the manifest.
+    """
+    def __init__(self, index_dir, segment_size=50000):
+        if os.path.exists(os.path.join(index_dir, 'meta.json')):
+            raise ValueError(f"{index_dir} holds a single-segment index; ingest into a new directory")
+        self.index_dir = index_dir
+        self.segment_size = segment_size
+        os.makedirs(index_dir, exist_ok=True)
+        self.pending = []
+        self._writer = None
+        self._segment_name = None
+
+    def add_document(self, doc, terms=None):
+        if self._writer is None:
+            self._segment_name = new_segment_name()
+            self._writer = IndexWriter(os.path.join(self.index_dir, self._segment_name))
+        self._writer.add_document(doc, terms)
+        if len(self._writer.lengths) >= self.segment_size:
+            self.flush()
+
+    def flush(self):
+        """Closes the current segment (if any) and queues it for the next commit."""
+        if self._writer is None:
+            return
+        meta = self._writer.close()
+        self.pending.append({"name": self._segment_name, "doc_count": meta["doc_count"]})
+        self._writer = None
+
+    def commit(self, replace_ids=None):
+        """
+        Flushes and publishes all pending segments in one manifest generation.
+        Existing copies of replace_ids are tombstoned in the same generation, so
+        an updated publication is never missing or duplicated in search results.
+        """
+        self.flush()
+        with manifest_lock(self.index_dir):
+            manifest = read_manifest(self.index_dir)
+            if not self.pending and not replace_ids:
+                return manifest
+            if replace_ids:
+                _tombstone(self.index_dir, manifest, replace_ids)
+            manifest["segments"].extend(self.pending)
+            manifest = write_manifest(self.index_dir, manifest)
+        self.pending = []
+        return manifest
+
+
+def add_documents(index_dir, docs, replace=False):
+    """
+    Adds a batch of new publications as one small segment, searchable as soon
+    as readers refresh. With replace=True, older copies with the same
+    publication numbers are tombstoned.
+    """
+    docs = list(docs)
+    writer = SegmentWriter(index_dir, segment_size=max(len(docs), 1))
+    for doc in docs:
+        writer.add_document(doc)
+    return writer.commit(replace_ids=[doc.get("id") for doc in docs] if replace else None)
+
+
+# --- Merging ---
+
+def plan_merge(manifest, merge_factor=MERGE_FACTOR, min_segment_docs=MIN_SEGMENT_DOCS,
+               max_segment_docs=MAX_SEGMENT_DOCS, max_deleted_ratio=MAX_DELETED_RATIO):
+    """
+    Tiered merge policy. Segments are bucketed by live size into tiers that
+    grow by merge_factor (tier 0: < min_segment_docs * merge_factor, ...); once
+    a tier holds merge_factor segments, its smallest merge_factor segments are
+    merged. Each document is therefore rewritten O(log N) times and the segment
+    count stays O(merge_factor * log N). Segments that are mostly tombstones are
+    rewritten on their own. Returns segment names to merge, or None.
+    """
+    tiers = {}
+    for entry in manifest["segments"]:
+        live = live_doc_count(entry)
+        if live >= max_segment_docs:
+            continue
+        tier = int(math.log(max(live, min_segment_docs) / min_segment_docs, merge_factor))
+        tiers.setdefault(tier, []).append(entry)
+    for tier in sorted(tiers):
+        group = sorted(tiers[tier], key=live_doc_count)
+        if len(group) >= merge_factor:
+            return [entry["name"] for entry in group[:merge_factor]]
+
+    for entry in manifest["segments"]:
+        if entry["doc_count"] and len(entry.get("deleted", ())) / entry["doc_count"] > max_deleted_ratio:
+            return [entry["name"]]
+    return None
+
+
+def merge_segments(index_dir, names):
+    """
+    Rewrites the live documents of the named segments into one new segment and
+    swaps it into the manifest. Searches keep using the old segments until they
+    refresh; deletions that land while the merge runs are carried over.
+    Returns the new segment name, or None if the sources changed underneath.
+    """
+    snapshot = {entry["name"]: entry for entry in read_manifest(index_dir)["segments"]}
+    if any(name not in snapshot for name in names):
+        return None
+
+    merged_name = new_segment_name()
+    merged_dir = os.path.join(index_dir, merged_name)
+    writer = IndexWriter(merged_dir)
+    for name in names:
+        deleted = set(snapshot[name].get("deleted", ()))
+        segment = PriorArtIndex(os.path.join(index_dir, name))
+        try:
+            for doc_id in range(segment.doc_count):
+                if doc_id not in deleted:
+                    writer.add_document(segment.get_document(doc_id))
+        finally:
+            segment.close()
+    meta = writer.close()
+
+    with manifest_lock(index_dir):
+        manifest = read_manifest(index_dir)
+        current = {entry["name"]: entry for entry in manifest["segments"]}
+        if any(name not in current for name in names):
+            shutil.rmtree(merged_dir, ignore_errors=True)
+            return None
+
+        late_ids = []
+        for name in names:
+            late = set(current[name].get("deleted", ())) - set(snapshot[name].get("deleted", ()))
+            if late:
+                segment = PriorArtIndex(os.path.join(index_dir, name))
+                late_ids.extend(segment.get_document(doc_id)["id"] for doc_id in late)
+                segment.close()
+
+        merged_entry = {"name": merged_name, "doc_count": meta["doc_count"]}
+        position = min(i for i, entry in enumerate(manifest["segments"]) if entry["name"] in names)
+        segments = [entry for entry in manifest["segments"] if entry["name"] not in names]
+        segments.insert(position, merged_entry)
+        manifest["segments"] = segments
+        if late_ids:
+            _tombstone(index_dir, {"segments": [merged_entry]}, late_ids)
+        write_manifest(index_dir, manifest)
+
+    # Open readers keep working on unlinked files; new readers never see these
+    for name in names:
+        shutil.rmtree(os.path.join(index_dir, name), ignore_errors=True)
+    return merged_name
+
+
+def merge_until_stable(index_dir, **policy):
+    """Applies the merge policy until it has nothing left to do. Returns the number of merges."""
+    merges = 0
+    while True:
+        names = plan_merge(read_manifest(index_dir), **policy)
+        if not names or merge_segments(index_dir, names) is None:
+            return merges
+        merges += 1
+
+
+class SegmentMerger(threading.Thread):
+    """
+    Background compaction: every interval seconds, merges segments according
+    to the tiered policy. Searches are never blocked; they pick up the merged
+    segment on their next refresh.
+    """
+    def __init__(self, index_dir, interval=30.0, **policy):
+        super().__init__(name=f"SegmentMerger({index_dir})", daemon=True)
+        self.index_dir = index_dir
+        self.interval = interval
+        self.policy = policy
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                merges = merge_until_stable(self.index_dir, **self.policy)
+                if merges:
+                    print(f"SegmentMerger: Completed {merges} merge(s) in {self.index_dir}")
+            except Exception as e:
+                print(f"SegmentMerger: Merge failed in {self.index_dir}: {e}")
+
+    def stop(self):
+        self._stopped.set()
+
+
+# --- Reading ---
+
+class _Snapshot:
+    """One manifest generation: its open segments plus corpus-wide BM25 statistics."""
+    def __init__(self, generation, segments):
+        self.generation = generation
+        self.segments = segments
+        self.doc_count = sum(seg.doc_count for seg in segments)
+        total_length = sum(seg.avg_doc_length * seg.doc_count for seg in segments)
+        self.avg_doc_length = (total_length / self.doc_count) if self.doc_count else 1.0
+
+    def doc_freq(self, term):
+        return sum(seg.doc_freq(term) for seg in self.segments)
+
+
+class SegmentedPriorArtIndex:
+    """
+    Searches every segment listed in segments.json and merges the per-segment
+    top-k lists. Segments share corpus-wide BM25 statistics, so a small fresh
+    segment scores on the same scale as a large one.
+
+    Each search runs against an immutable snapshot of the segment list. The
+    manifest is re-checked at most every refresh_interval seconds; segments
+    that survive a refresh stay open, so picking up new or merged segments
+    only opens what changed and searches in flight are unaffected.
+    """
+    def __init__(self, index_dir, refresh_interval=1.0):
+        self.index_dir = index_dir
+        self.refresh_interval = refresh_interval
+        self._snapshot = None
+        self._open_segments = {}
+        self._checked_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self.refresh(force=True)
+
+    def refresh(self, force=False):
+        """Switches to the latest manifest generation if it changed."""
+        now = time.time()
+        if not force and now - self._checked_at < self.refresh_interval:
+            return self._snapshot
+        with self._refresh_lock:
+            self._checked_at = now
+            manifest = read_manifest(self.index_dir)
+            if self._snapshot is not None and manifest["generation"] == self._snapshot.generation:
+                return self._snapshot
+            segments = []
+            opened = {}
+            for entry in manifest["segments"]:
+                segment = self._open_segments.get(entry["name"]) or PriorArtIndex(os.path.join(self.index_dir, entry["name"]))
+                opened[entry["name"]] = segment
+                segments.append((segment, frozenset(entry.get("deleted", ()))))
+            snapshot = _Snapshot(manifest["generation"], [segment for segment, _ in segments])
+            # Each snapshot scores through views of its own: searches still on the
+            # previous snapshot keep its statistics and tombstones.
+            snapshot.segments = [segment.scoring_view(snapshot, deleted) for segment, deleted in segments]
+            # Segments dropped by a merge are left to the garbage collector, so a
+            # search still holding the previous snapshot can finish on them.
+            self._open_segments = opened
+            self._snapshot = snapshot
+            return snapshot
+
+    @property
+    def doc_count(self):
+        return self.refresh().doc_count
+
+    @property
+    def cache_token(self):
+        return f"{os.path.abspath(self.index_dir)}#{self.refresh().generation}"
+
+    def doc_freq(self, term):
+        return self.refresh().doc_freq(term)
+
+    def search_documents(self, query, top_k=10, date_cutoff=None, cpc=None, collapse=False):
+        """
+        Returns [(score, stored_fields)] for the top_k across all segments, best first.
+        With collapse=True, patent families are collapsed across segments.
+        """
+        if collapse:
+            return collapse_families(self.search_signed(query, top_k * FAMILY_OVERFETCH, date_cutoff, cpc), top_k)
+        snapshot = self.refresh()
+        results = [seg.search_documents(query, top_k, date_cutoff, cpc) for seg in snapshot.segments]
+        return merge_shard_results(results, top_k)
+
+    def search_signed(self, query, top_k=10, date_cutoff=None, cpc=None):
+        snapshot = self.refresh()
+        return merge_shard_results([seg.search_signed(query, top_k, date_cutoff, cpc) for seg in snapshot.segments], top_k)
+
+    def search_batch(self, specs, top_k=10, signed=False):
+        """Batch search per segment (shared posting fetches within each), merged per spec."""
+        snapshot = self.refresh()
+        specs = list(specs)
+        per_segment = [seg.search_batch(specs, top_k, signed) for seg in snapshot.segments]
+        return [merge_shard_results([results[i] for results in per_segment], top_k) for i in range(len(specs))]
+
+    def search_documents_batch(self, specs, top_k=10, collapse=False):
+        if collapse:
+            signed = self.search_batch(specs, top_k * FAMILY_OVERFETCH, signed=True)
+            return [collapse_families(hits, top_k) for hits in signed]
+        return self.search_batch(specs, top_k)
+
+    def close(self):
+        for segment in self._open_segments.values():
+            segment.close()
+        self._open_segments = {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain a segmented prior-art index.")
+    parser.add_argument("--index", default=os.getenv("OPENPATENT_PRIOR_ART_INDEX", DEFAULT_INDEX_DIR), help="Index directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    add_cmd = sub.add_parser("add", help="Add new publications (JSON / JSON-lines) as a new segment")
+    add_cmd.add_argument("inputs", nargs="+")
+    add_cmd.add_argument("--replace", action="store_true", help="Tombstone older copies of the same publication numbers")
+
+    delete_cmd = sub.add_parser("delete", help="Tombstone publications by number")
+    delete_cmd.add_argument("ids", nargs="+")
+
+    sub.add_parser("merge", help="Run the tiered merge policy until it has nothing to do")
+
+    merger_cmd = sub.add_parser("merger", help="Run the background merger in the foreground")
+    merger_cmd.add_argument("--interval", type=float, default=30.0)
+
+    sub.add_parser("stats", help="Show segments and tombstones")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "add":
+        docs = [doc for path in args.inputs for doc in iter_documents(path)]
+        manifest = add_documents(args.index, docs, replace=args.replace)
+        print(f"Segments: Added {len(docs)} documents; {len(manifest['segments'])} segments, generation {manifest['generation']}")
+    elif args.command == "delete":
+        print(f"Segments: Tombstoned {delete_documents(args.index, args.ids)} documents")
+    elif args.command == "merge":
+        print(f"Segments: Completed {merge_until_stable(args.index)} merge(s)")
+    elif args.command == "merger":
+        merger = SegmentMerger(args.index, interval=args.interval)
+        merger.start()
+        try:
+            while merger.is_alive():
+                merger.join(1.0)
+        except KeyboardInterrupt:
+            merger.stop()
+    elif args.command == "stats":
+        manifest = read_manifest(args.index)
+        print(f"Generation {manifest['generation']}: {manifest.get('doc_count', 0)} live documents")
+        for entry in manifest["segments"]:
+            print(f"  {entry['name']}  docs={entry['doc_count']}  deleted={len(entry.get('deleted', ()))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import atexit
+import heapq
+import json
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from patent_suite.tools.prior_art_index import IndexWriter, date_key
+from patent_suite.tools.minhash import FAMILY_OVERFETCH, collapse_families
+
+SHARDS_MANIFEST = 'shards.json'
+SHARDS_VERSION = 1
+
+
+def shard_for(doc_id, shard_count):
+    """Stable shard assignment by publication number, so re-ingested documents land in the same shard."""
+    return zlib.crc32(str(doc_id).encode('utf-8')) % shard_count
+
+
+def is_sharded_index(index_dir):
+    return os.path.exists(os.path.join(index_dir, SHARDS_MANIFEST))
+
+
+def build_sharded_index(docs, index_dir, shard_count):
+    """
+    Builds shard_count independent PriorArtIndex directories under index_dir
+    (shard-000, shard-001, ...) plus a shards.json manifest.
+    """
+    if shard_count < 1:
+        raise ValueError("shard_count must be at least 1")
+    os.makedirs(index_dir, exist_ok=True)
+    names = [f"shard-{i:03d}" for i in range(shard_count)]
+    writers = [IndexWriter(os.path.join(index_dir, name)) for name in names]
+    for doc in docs:
+        writers[shard_for(doc.get("id"), shard_count)].add_document(doc)
+    metas = [writer.close() for writer in writers]
+
+    doc_count = sum(m["doc_count"] for m in metas)
+    manifest = {
+        "version": SHARDS_VERSION,
+        "shards": names,
+        "doc_count": doc_count,
+        "term_count": max((m["term_count"] for m in metas), default=0)
+    }
+    with open(os.path.join(index_dir, SHARDS_MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=4)
+    return manifest
+
+
+# --- Shard worker side ---
+# Each worker process opens its shard once (in the pool initializer) and keeps
+# it open for as long as the process lives.
+_WORKER_SHARDS = {}
+
+def _open_shard(shard_dir):
+    from patent_suite.tools.segments import open_index
+    index = _WORKER_SHARDS.get(shard_dir)
+    if index is None:
+        index = _WORKER_SHARDS[shard_dir] = open_index(shard_dir)
+    return index
+
+
+def _search_shard(shard_dir, query, top_k, date_cutoff, cpc=None, signed=False):
+    """Runs in a shard worker: local top-k with stored fields (and MinHash data if signed), best first."""
+    index = _open_shard(shard_dir)
+    if signed:
+        return index.search_signed(query, top_k, date_cutoff, cpc)
+    return index.search_documents(query, top_k, date_cutoff, cpc)
+
+
+def _search_shard_batch(shard_dir, specs, top_k, signed=False):
+    """Runs in a shard worker: one local top-k list per spec (see PriorArtIndex.search_batch)."""
+    return _open_shard(shard_dir).search_batch(specs, top_k, signed)
+
+
+def merge_shard_results(shard_results, top_k):
+    """
+    k-way heap merge of per-shard [(score, doc)] lists (each already sorted best
+    first). Ties go to the more recent publication, as within a single shard.
+    """
+    def rank_key(hit):
+        return (hit[0], date_key(hit[1].get("date")) or 0)
+    return list(islice(heapq.merge(*shard_results, key=rank_key, reverse=True), top_k))
+
+
+class ShardedPriorArtIndex:
+    """
+    Fans a query out to one worker process per shard and merges the local
+    top-k lists. BM25 statistics are shard-local (as in query-then-fetch
+    search engines); with hash-based sharding they are near-identical to the
+    global statistics.
+
+    keep_warm=True keeps one single-process pool per shard alive between
+    queries, so each shard stays open in its own worker (and its pages stay
+    hot). With keep_warm=False the workers are started for each query and
+    torn down afterwards. parallel=False searches the shards in-process.
+    """
+    def __init__(self, index_dir, keep_warm=True, parallel=True):
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, SHARDS_MANIFEST), 'r') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != SHARDS_VERSION:
+            raise ValueError(f"Unsupported shard manifest version {self.manifest.get('version')} in {index_dir}")
+        self.shard_dirs = [os.path.join(index_dir, name) for name in self.manifest["shards"]]
+        self.doc_count = self.manifest["doc_count"]
+        self.cache_token = f"{os.path.abspath(index_dir)}@{os.stat(os.path.join(index_dir, SHARDS_MANIFEST)).st_mtime_ns}"
+        self.keep_warm = keep_warm
+        self.parallel = parallel
+        self._pools = None
+        if self.parallel and self.keep_warm:
+            self._pools = self._start_pools()
+            atexit.register(self.close)
+
+    def _start_pools(self):
+        return [
+            ProcessPoolExecutor(max_workers=1, initializer=_open_shard, initargs=(shard_dir,))
+            for shard_dir in self.shard_dirs
+        ]
+
+    def search_documents(self, query, top_k=10, date_cutoff=None, cpc=None, collapse=False):
+        """
+        Returns [(score, stored_fields)] for the global top_k, best first.
+        With collapse=True, patent families are collapsed across shards.
+        """
+        if collapse:
+            return collapse_families(self.search_signed(query, top_k * FAMILY_OVERFETCH, date_cutoff, cpc), top_k)
+        return self._search(query, top_k, date_cutoff, cpc, False)
+
+    def search_signed(self, query, top_k=10, date_cutoff=None, cpc=None):
+        return self._search(query, top_k, date_cutoff, cpc, True)
+
+    def _search(self, query, top_k, date_cutoff, cpc, signed):
+        if not self.parallel:
+            shard_results = [_search_shard(d, query, top_k, date_cutoff, cpc, signed) for d in self.shard_dirs]
+            return merge_shard_results(shard_results, top_k)
+
+        pools = self._pools or self._start_pools()
+        try:
+            futures = [
+                pool.submit(_search_shard, shard_dir, query, top_k, date_cutoff, cpc, signed)
+                for pool, shard_dir in zip(pools, self.shard_dirs)
+            ]
+            shard_results = [future.result() for future in futures]
+        finally:
+            if pools is not self._pools:
+                for pool in pools:
+                    pool.shutdown(wait=False)
+        return merge_shard_results(shard_results, top_k)
+
+    def search_documents_batch(self, specs, top_k=10, collapse=False):
+        """
+        One search_documents() list per spec. Each shard worker receives the
+        whole batch in a single call and runs it with shared posting fetches.
+        """
+        specs = list(specs)
+        if collapse:
+            signed = self._search_batch(specs, top_k * FAMILY_OVERFETCH, True)
+            return [collapse_families(hits, top_k) for hits in signed]
+        return self._search_batch(specs, top_k, False)
+
+    def _search_batch(self, specs, top_k, signed):
+        if not self.parallel:
+            per_shard = [_search_shard_batch(d, specs, top_k, signed) for d in self.shard_dirs]
+        else:
+            pools = self._pools or self._start_pools()
+            try:
+                futures = [
+                    pool.submit(_search_shard_batch, shard_dir, specs, top_k, signed)
+                    for pool, shard_dir in zip(pools, self.shard_dirs)
+                ]
+                per_shard = [future.result() for future in futures]
+            finally:
+                if pools is not self._pools:
+                    for pool in pools:
+                        pool.shutdown(wait=False)
+        return [merge_shard_results([results[i] for results in per_shard], top_k) for i in range(len(specs))]
+
+    def close(self):
+        if self._pools:
+            for pool in self._pools:
+                pool.shutdown(wait=True)
+            self._pools = None
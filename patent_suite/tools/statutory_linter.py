@@ -1,35 +1,57 @@
 import json
 import os
 import re
+from bisect import bisect_right
+from functools import lru_cache
+from patent_suite.tools.claim_parser import parse_claims
+
+BANNED_WORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets', 'banned_words.json')
+
+@lru_cache(maxsize=4)
+def _banned_patterns(asset_path, mtime):
+    # Reloaded only when the asset file changes
+    with open(asset_path, 'r') as f:
+        banned_words = json.load(f)
+    return [
+        (word, suggestion, re.compile(r'\b' + re.escape(word) + r'\b', re.IGNORECASE))
+        for word, suggestion in banned_words.items()
+    ]
 
 def check_indefiniteness(text):
     """
     Scans generated text for a blocklist of dangerous patent words (Definiteness Check).
+    Each error also names the claim it falls in (None outside numbered claims).
     """
     print("Statutory Linter: Scanning for vague language (§112 compliance)...")
-    
-    asset_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets', 'banned_words.json')
-    
+
+    asset_path = BANNED_WORDS_PATH
+
     if not os.path.exists(asset_path):
         print(f"Warning: Banned words asset not found at {asset_path}")
         return []
 
-    with open(asset_path, 'r') as f:
-        banned_words = json.load(f)
+    patterns = _banned_patterns(asset_path, os.path.getmtime(asset_path))
+    claim_set = parse_claims(text)
+    line_starts = [0] + [m.end() for m in re.finditer('\n', text)]
+
+    # One pass over the text per word; a word is reported once per line
+    hits = {}
+    for order, (word, suggestion, pattern) in enumerate(patterns):
+        for match in pattern.finditer(text):
+            line = bisect_right(line_starts, match.start())
+            hits.setdefault((line, order), match.start())
 
     errors = []
-    lines = text.split('\n')
-    
-    for i, line in enumerate(lines, 1):
-        for word, suggestion in banned_words.items():
-            # Case-insensitive word boundary match
-            if re.search(r'\b' + re.escape(word) + r'\b', line, re.IGNORECASE):
-                errors.append({
-                    "line": i,
-                    "word": word,
-                    "error": f"Line {i} uses '{word}'. {suggestion}"
-                })
-                
+    for (i, order), offset in sorted(hits.items()):
+        word, suggestion, _ = patterns[order]
+        claim = claim_set.claim_at(offset)
+        errors.append({
+            "line": i,
+            "claim": claim.number if claim else None,
+            "word": word,
+            "error": f"Line {i} uses '{word}'. {suggestion}"
+        })
+
     return errors
 
 if __name__ == "__main__":
@@ -1,46 +1,117 @@
-import re
+from patent_suite.tools.claim_parser import parse_claims
+
+INTRODUCING_ARTICLES = ("a", "an")
+REFERRING_ARTICLES = ("the", "said")
+
+def article_terms(claim, articles):
+    r"""
+    Words following one of articles in a parsed claim, as written.
+    Same matches as re.findall(r'\b(?:the|said)\s+([a-zA-Z]+)\b', ...): the
+    next token must be purely alphabetic and separated by whitespace only,
+    and a matched word cannot start another match.
+    """
+    terms = []
+    text, tokens, starts = claim.text, claim.tokens, claim.token_starts
+    i = 0
+    while i < len(tokens) - 1:
+        token = tokens[i]
+        if token in articles:
+            gap = text[starts[i] + len(token):starts[i + 1]]
+            word = tokens[i + 1]
+            if gap.isspace() and word.isascii() and word.isalpha():
+                terms.append(text[starts[i + 1]:starts[i + 1] + len(word)])
+                i += 2
+                continue
+        i += 1
+    return terms
+
+def _introduced(claim):
+    return frozenset(term.lower() for term in article_terms(claim, INTRODUCING_ARTICLES))
+
+def _check_claim(claim, claim_set, results):
+    """
+    Checks one claim against the terms introduced along its dependency chain.
+    Ancestors are read from results when already checked; in a dependency
+    cycle some are not, and their terms are collected directly.
+    """
+    introduced = _introduced(claim)
+    available = set(introduced)
+    chain = claim_set.chain(claim.number)
+    for ancestor in chain[:-1]:
+        checked = results.get(ancestor.number)
+        available |= checked["introduced"] if checked else _introduced(ancestor)
+
+    errors = []
+    # chain stops where it loops; the loop is through this claim if the root points back to it
+    if chain[0].depends_on == claim.number:
+        errors.append(f"Error: Circular Dependency - Claim {claim.number} depends on itself")
+    # We simplify to single words for this mock, but real tools use phrase parsing.
+    for term in article_terms(claim, REFERRING_ARTICLES):
+        term_lower = term.lower()
+        # Special case: 'Claim' as in 'Claim 1' is often exempt or handled differently
+        if term_lower == 'claim':
+            continue
+        if term_lower not in available:
+            errors.append(f"Error: Lacks Antecedent Basis - 'the {term}'")
+    return {"introduced": introduced, "errors": errors}
+
+def _check_claims(claim_set, results, numbers):
+    # Ancestors before descendants: chains are checked root first
+    for claim in claim_set.claims:
+        if claim.number not in numbers or claim.number in results:
+            continue
+        for link in claim_set.chain(claim.number):
+            if link.number not in results:
+                results[link.number] = _check_claim(link, claim_set, results)
+
+def _summary(claim_set, results):
+    errors = [error for claim in claim_set.claims for error in results[claim.number]["errors"]]
+    return {
+        "errors_count": len(errors),
+        "errors": list(dict.fromkeys(errors)), # Deduplicate
+        "claims": results
+    }
 
 def check_antecedent_basis(claims_text):
     """
     Check for antecedent basis errors in a set of claims.
     Logic: If 'the [noun]' or 'said [noun]' is used, 'a [noun]' or 'an [noun]' 
     must have been used previously in the claim or parent chain.
+    Per-claim results are returned under "claims" for recheck_antecedent_basis.
     """
     print("Checking antecedent basis...")
-    errors = []
-    
-    # Split by claim numbers (e.g., '1. ', '2. ')
-    claims = re.split(r'\n\s*\d+\.\s+', "\n" + claims_text)
-    claims = [c.strip() for c in claims if c.strip()]
-    
-    introduced_terms = set()
-    
-    for i, claim in enumerate(claims, 1):
-        # Normalize whitespace
-        claim_clean = re.sub(r'\s+', ' ', claim)
-        
-        # 1. Mark terms introduced with 'a' or 'an' in the CURRENT claim first
-        introductions = re.findall(r'\ba(?:n)?\s+([a-zA-Z]+)\b', claim_clean, re.IGNORECASE)
-        for term in introductions:
-            introduced_terms.add(term.lower())
-
-        # 2. Find all instances of 'the [word]' or 'said [word]'
-        # We simplify to single words for this mock, but real tools use phrase parsing.
-        references = re.findall(r'\b(?:the|said)\s+([a-zA-Z]+)\b', claim_clean, re.IGNORECASE)
-        
-        for term in references:
-            term_lower = term.lower()
-            # Special case: 'Claim' as in 'Claim 1' is often exempt or handled differently
-            if term_lower == 'claim':
-                continue
-                
-            if term_lower not in introduced_terms:
-                errors.append(f"Error: Lacks Antecedent Basis - 'the {term}'")
-            
-    return {
-        "errors_count": len(errors),
-        "errors": list(dict.fromkeys(errors)) # Deduplicate
+    claim_set = parse_claims(claims_text)
+    results = {}
+    _check_claims(claim_set, results, {claim.number for claim in claim_set.claims})
+    return _summary(claim_set, results)
+
+def recheck_antecedent_basis(claims_text, previous, changed_claims):
+    """
+    Incremental check after an edit: only the changed claims, their
+    descendants and claims previous has no result for are scanned again;
+    every other claim reuses its result from previous. Dependents of
+    deleted claims are rechecked as well.
+    """
+    claim_set = parse_claims(claims_text)
+    stale = set(changed_claims) | {c.number for c in claim_set.claims if c.number not in previous["claims"]}
+    children = {}
+    for claim in claim_set.claims:
+        if claim.depends_on is not None:
+            children.setdefault(claim.depends_on, []).append(claim.number)
+    deleted = set(previous["claims"]) - set(claim_set.by_number)
+    pending = list(stale | deleted)
+    while pending:
+        for child in children.get(pending.pop(), []):
+            if child not in stale:
+                stale.add(child)
+                pending.append(child)
+
+    results = {
+        claim.number: previous["claims"][claim.number]
+        for claim in claim_set.claims if claim.number not in stale
     }
+    _check_claims(claim_set, results, stale)
+    return _summary(claim_set, results)
 
 if __name__ == "__main__":
     sample_claims = """
@@ -48,4 +119,6 @@ if __name__ == "__main__":
     2. The system of Claim 1, where the lever is activated.
     """
     results = check_antecedent_basis(sample_claims)
-    print(results)
+    print(results["errors"])
+    edited = sample_claims.replace("activated", "pulled by a lever")
+    print(recheck_antecedent_basis(edited, results, [2])["errors"])
@@ -0,0 +1,14 @@
+import re
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset([
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is",
+    "it", "of", "on", "or", "that", "the", "to", "with", "without", "using"
+])
+
+def tokenize(text):
+    """
+    Lowercases text and splits it into alphanumeric terms, dropping stopwords.
+    The same analyzer is used at index time and query time.
+    """
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
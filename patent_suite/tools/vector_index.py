@@ -0,0 +1,288 @@
+import argparse
+import json
+import math
+import os
+import tempfile
+import numpy as np
+from patent_suite.tools.embeddings import get_embedder, save_embedder, load_embedder
+from patent_suite.tools.prior_art_index import SAMPLE_CORPUS, UNDATED, _map_file, date_key, document_text, iter_documents
+
+# Default on-disk location of the semantic index. Override with OPENPATENT_VECTOR_INDEX.
+DEFAULT_VECTOR_INDEX_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'vector_index')
+
+VECTOR_INDEX_VERSION = 1
+
+# Lists searched per query; more lists trade speed for recall
+DEFAULT_NPROBE = 8
+# Below this many vectors a single list (exact search) is fast enough
+MIN_IVF_VECTORS = 4096
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_LIST = 64
+CHUNK_ROWS = 8192
+
+
+def default_nlist(count):
+    return 1 if count < MIN_IVF_VECTORS else int(4 * math.sqrt(count))
+
+
+def _assign(vectors, centroids):
+    """Nearest centroid (by dot product) for every row, computed in chunks to bound memory."""
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), CHUNK_ROWS):
+        block = np.asarray(vectors[start:start + CHUNK_ROWS])
+        labels[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+
+def train_centroids(vectors, nlist, iterations=KMEANS_ITERATIONS, seed=0):
+    """Spherical k-means on a sample of the (unit) vectors. Returns (nlist, dim) unit centroids."""
+    rng = np.random.default_rng(seed)
+    count = len(vectors)
+    sample_size = min(count, nlist * KMEANS_SAMPLE_PER_LIST)
+    sample = np.asarray(vectors[np.sort(rng.choice(count, sample_size, replace=False))])
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        empty = ~sums.any(axis=1)
+        # Reseed empty lists from random sample points
+        sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = sums / np.maximum(norms, 1e-12)
+    return centroids.astype(np.float32)
+
+
+def build_vector_index(docs, index_dir, embedder=None, nlist=None, batch_size=1024):
+    """
+    Builds an IVF (inverted file) vector index over document dicts.
+
+    Layout of an index directory:
+        meta.json          - vector count, dimensions, list count, format version
+        embedder.json      - embedder name and settings (+ its own files, e.g. idf.npy)
+        centroids.npy      - (nlist, dim) list centroids
+        vectors.npy        - (count, dim) float32 unit vectors, grouped by list
+        list_offsets.npy   - row range of each list in vectors.npy (nlist + 1)
+        dates.npy          - publication date key per row (uint32 YYYYMMDD)
+        rows.npy           - stored-document number per row
+        docs.jsonl/docs.idx - stored fields and their byte offsets
+
+    docs may be any iterable and is read once. Stored fields are spooled to
+    docs.jsonl (fitting the embedder's IDF on the way), then embedded from
+    that spool chunk by chunk into a raw file on disk, so apart from the
+    per-document offsets and dates only the k-means sample and one chunk of
+    vectors are held in memory.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    embedder = embedder or get_embedder()
+    docs_path = os.path.join(index_dir, 'docs.jsonl')
+    offsets, dates = [], []
+    with open(docs_path, 'wb') as docs_file:
+        def spool():
+            for doc in docs:
+                offsets.append(docs_file.tell())
+                docs_file.write((json.dumps(doc, ensure_ascii=False) + "\n").encode('utf-8'))
+                key = date_key(doc.get("date"))
+                dates.append(UNDATED if key is None else key)
+                yield document_text(doc)
+        if hasattr(embedder, "fit"):
+            embedder.fit(spool())
+        else:
+            for _ in spool():
+                pass
+    np.save(os.path.join(index_dir, 'docs.idx.npy'), np.array(offsets, dtype=np.uint64))
+    save_embedder(embedder, index_dir)
+    dim = embedder.dim
+
+    raw_path = os.path.join(index_dir, 'vectors.raw')
+    with open(docs_path, 'rb') as docs_file, open(raw_path, 'wb') as raw_file:
+        batch = []
+        for line in docs_file:
+            batch.append(document_text(json.loads(line)))
+            if len(batch) == batch_size:
+                raw_file.write(embedder.embed(batch).astype(np.float32).tobytes())
+                batch = []
+        if batch:
+            raw_file.write(embedder.embed(batch).astype(np.float32).tobytes())
+
+    count = len(offsets)
+    raw = np.memmap(raw_path, dtype=np.float32, mode='r', shape=(count, dim)) if count else np.zeros((0, dim), np.float32)
+    nlist = min(nlist or default_nlist(count), max(count, 1))
+    if count:
+        centroids = train_centroids(raw, nlist)
+        labels = _assign(raw, centroids)
+    else:
+        centroids = np.zeros((1, dim), dtype=np.float32)
+        labels = np.zeros(0, dtype=np.int32)
+    order = np.argsort(labels, kind='stable')
+    list_offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+    list_offsets[1:] = np.cumsum(np.bincount(labels, minlength=len(centroids)))
+
+    vectors = np.lib.format.open_memmap(os.path.join(index_dir, 'vectors.npy'), mode='w+', dtype=np.float32, shape=(count, dim))
+    for start in range(0, count, CHUNK_ROWS):
+        vectors[start:start + CHUNK_ROWS] = raw[order[start:start + CHUNK_ROWS]]
+    vectors.flush()
+    del vectors, raw
+    os.remove(raw_path)
+
+    np.save(os.path.join(index_dir, 'centroids.npy'), centroids)
+    np.save(os.path.join(index_dir, 'list_offsets.npy'), list_offsets)
+    np.save(os.path.join(index_dir, 'rows.npy'), order.astype(np.int64))
+    np.save(os.path.join(index_dir, 'dates.npy'), np.array(dates, dtype=np.uint32)[order])
+
+    meta = {"version": VECTOR_INDEX_VERSION, "count": count, "dim": dim, "nlist": len(centroids)}
+    # meta.json is written last so a partially built directory is never loadable
+    with open(os.path.join(index_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=4)
+    return meta
+
+
+class VectorIndex:
+    """
+    Approximate nearest-neighbour search over an index built by
+    build_vector_index. Queries are compared with the list centroids, and only
+    the nprobe closest lists are scanned, so a query touches about
+    nprobe * count / nlist vectors instead of all of them. The vector matrix
+    is memory-mapped and shared between processes through the page cache.
+    """
+    def __init__(self, index_dir, nprobe=DEFAULT_NPROBE):
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, 'meta.json'), 'r') as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != VECTOR_INDEX_VERSION:
+            raise ValueError(f"Unsupported vector index version {self.meta.get('version')} in {index_dir}")
+        self.nprobe = nprobe
+        self.embedder = load_embedder(index_dir)
+        self.centroids = np.load(os.path.join(index_dir, 'centroids.npy'))
+        self.list_offsets = np.load(os.path.join(index_dir, 'list_offsets.npy'))
+        self.vectors = np.load(os.path.join(index_dir, 'vectors.npy'), mmap_mode='r')
+        self.dates = np.load(os.path.join(index_dir, 'dates.npy'), mmap_mode='r')
+        self.rows = np.load(os.path.join(index_dir, 'rows.npy'), mmap_mode='r')
+        self.doc_offsets = np.load(os.path.join(index_dir, 'docs.idx.npy'), mmap_mode='r')
+        # Read-only mmap: get_document is safe to call from several threads at once
+        self._docs = _map_file(os.path.join(index_dir, 'docs.jsonl'))
+        self.count = self.meta["count"]
+        self.cache_token = f"{os.path.abspath(index_dir)}@{os.stat(os.path.join(index_dir, 'meta.json')).st_mtime_ns}"
+
+    def search_vectors(self, queries, top_k=10, date_cutoff=None, nprobe=None):
+        """
+        Batch search for an (m, dim) matrix of unit query vectors.
+        Returns one [(score, row)] list per query, best first. Each probed list
+        is read once per batch and scored against all queries probing it.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        results = [[] for _ in range(len(queries))]
+        if self.count == 0 or top_k <= 0:
+            return results
+        key = date_key(date_cutoff)
+        if key is None and date_cutoff:
+            raise ValueError(f"Invalid date cutoff: {date_cutoff!r}")
+
+        nlist = len(self.centroids)
+        nprobe = min(nprobe or self.nprobe, nlist)
+        if nprobe == nlist:
+            probes = np.tile(np.arange(nlist), (len(queries), 1))
+        else:
+            probes = np.argpartition(-(queries @ self.centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+
+        by_list = {}
+        for q, lists in enumerate(probes):
+            for list_id in lists:
+                by_list.setdefault(int(list_id), []).append(q)
+
+        candidates = [[] for _ in range(len(queries))]
+        for list_id, query_ids in by_list.items():
+            start, end = int(self.list_offsets[list_id]), int(self.list_offsets[list_id + 1])
+            if start == end:
+                continue
+            scores = np.asarray(self.vectors[start:end]) @ queries[query_ids].T
+            if key is not None:
+                scores[np.asarray(self.dates[start:end]) >= key] = -np.inf
+            k = min(top_k, end - start)
+            best = np.argpartition(-scores, k - 1, axis=0)[:k]
+            for column, q in enumerate(query_ids):
+                for row in best[:, column]:
+                    if scores[row, column] > -np.inf:
+                        candidates[q].append((float(scores[row, column]), start + int(row)))
+
+        for q, hits in enumerate(candidates):
+            hits.sort(reverse=True)
+            results[q] = hits[:top_k]
+        return results
+
+    def get_document(self, row):
+        start = int(self.doc_offsets[int(self.rows[row])])
+        end = self._docs.find(b"\n", start)
+        return json.loads(self._docs[start:end if end >= 0 else len(self._docs)].decode('utf-8'))
+
+    def search_documents_batch(self, queries, top_k=10, date_cutoff=None):
+        """Embeds a batch of query texts and returns one [(score, stored_fields)] list per query."""
+        results = self.search_vectors(self.embedder.embed(list(queries)), top_k, date_cutoff)
+        return [[(score, self.get_document(row)) for score, row in hits] for hits in results]
+
+    def search_documents(self, query, top_k=10, date_cutoff=None):
+        """Returns [(cosine_similarity, stored_fields)] for the top_k nearest documents, best first."""
+        return self.search_documents_batch([query], top_k, date_cutoff)[0]
+
+    def close(self):
+        if self._docs is not None:
+            self._docs.close()
+
+
+_OPEN_VECTOR_INDEXES = {}
+
+def get_vector_index(index_dir=None):
+    """
+    Returns a cached VectorIndex for index_dir (default: OPENPATENT_VECTOR_INDEX
+    or DEFAULT_VECTOR_INDEX_DIR), building a temporary one over the sample
+    corpus if none has been built there.
+    """
+    if index_dir is None:
+        index_dir = os.getenv("OPENPATENT_VECTOR_INDEX", DEFAULT_VECTOR_INDEX_DIR)
+    index = _OPEN_VECTOR_INDEXES.get(index_dir)
+    if index is not None:
+        return index
+    if not os.path.exists(os.path.join(index_dir, 'meta.json')):
+        print(f"VectorIndex: No index at {index_dir}. Building a sample index (run 'vector_index build' for a real corpus).")
+        sample_dir = tempfile.mkdtemp(prefix="vector_index_")
+        build_vector_index(SAMPLE_CORPUS, sample_dir)
+        index = VectorIndex(sample_dir)
+    else:
+        index = VectorIndex(index_dir)
+    _OPEN_VECTOR_INDEXES[index_dir] = index
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and query the semantic (vector) prior-art index.")
+    parser.add_argument("--index", default=os.getenv("OPENPATENT_VECTOR_INDEX", DEFAULT_VECTOR_INDEX_DIR), help="Index directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build_cmd = sub.add_parser("build", help="Embed JSON / JSON-lines documents into an IVF index")
+    build_cmd.add_argument("inputs", nargs="*", help="Input files (default: built-in sample corpus)")
+    build_cmd.add_argument("--embedder", default=None, help="Registered embedder name (default: hashing)")
+    build_cmd.add_argument("--dim", type=int, default=256, help="Embedding dimensions for the hashing embedder")
+    build_cmd.add_argument("--nlist", type=int, default=None, help="Number of IVF lists (default: 4 * sqrt(count))")
+
+    search_cmd = sub.add_parser("search", help="Nearest-neighbour search; several queries are run as one batch")
+    search_cmd.add_argument("queries", nargs="+")
+    search_cmd.add_argument("--top-k", type=int, default=10)
+    search_cmd.add_argument("--cutoff", help="Priority date (YYYY-MM-DD); only earlier art is returned")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        docs = (doc for path in args.inputs for doc in iter_documents(path)) if args.inputs else iter(SAMPLE_CORPUS)
+        embedder = get_embedder(args.embedder, dim=args.dim)
+        meta = build_vector_index(docs, args.index, embedder=embedder, nlist=args.nlist)
+        print(f"VectorIndex: Embedded {meta['count']} documents into {meta['nlist']} lists in {args.index}")
+    elif args.command == "search":
+        index = get_vector_index(args.index)
+        for query, hits in zip(args.queries, index.search_documents_batch(args.queries, args.top_k, args.cutoff)):
+            print(f"== {query}")
+            for score, doc in hits:
+                print(f"{score:8.4f}  {doc.get('id')}  {doc.get('title')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -102,25 +102,6 @@ def transcribe_audio(audio_file_path):
     # Simple mock transcription result
     return "A laser-based toaster that uses a micro-rasterizer for precise bread patterns."
 
-def get_style_examples(query, count=3):
-    """
-    Retrieves high-quality 'Gold Standard' patent examples from the local dataset.
-    In a real app, this would use vector search. Here we simulate it by reading 
-    the harvested files.
-    """
-    base_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'gold_standard_patents')
-    if not os.path.exists(base_dir):
-        return []
-    
-    examples = []
-    # Simplified mock retrieval: just take the first few files
-    files = [f for f in os.listdir(base_dir) if f.endswith('.txt')]
-    for file_name in files[:count]:
-        with open(os.path.join(base_dir, file_name), 'r') as f:
-            examples.append(f.read())
-            
-    return examples
-
 def get_safe_file_manager(session_id):
     """
     Returns a SafeFileManager instance for the given session.
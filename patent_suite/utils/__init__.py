@@ -0,0 +1,2 @@
+# The utils/ package shadows utils.py, so helpers imported as patent_suite.utils live here
+from .style_examples import get_style_examples
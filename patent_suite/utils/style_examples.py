@@ -0,0 +1,24 @@
+import os
+
+def get_style_examples(query, count=3):
+    """
+    Retrieves high-quality 'Gold Standard' patent examples from the local dataset,
+    ranked by semantic similarity to the query (hashing-trick TF-IDF embeddings,
+    no network needed).
+    """
+    base_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'gold_standard_patents')
+    if not os.path.exists(base_dir):
+        return []
+
+    texts = []
+    for file_name in sorted(f for f in os.listdir(base_dir) if f.endswith('.txt')):
+        with open(os.path.join(base_dir, file_name), 'r') as f:
+            texts.append(f.read())
+    if not texts:
+        return []
+
+    from patent_suite.tools.embeddings import get_embedder
+    embedder = get_embedder().fit(texts)
+    scores = embedder.embed(texts) @ embedder.embed([query])[0]
+    ranked = sorted(range(len(texts)), key=lambda i: scores[i], reverse=True)
+    return [texts[i] for i in ranked[:count]]